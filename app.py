@@ -1,7 +1,11 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import re
+
+from utils.ingest import format_load_info
+from utils.fingerprint import content_fingerprint
+from utils.dtypes import format_bytes
+from utils.loaders import load_dataset, NoScoreColumnsError
+from utils.session import load_session_dataset, get_session_dataset
 
 # Set page config
 st.set_page_config(
@@ -13,159 +17,40 @@ st.set_page_config(
 
 # --- Data Loading Functions ---
 
-def detect_score_columns(df):
-    """Auto-detect score columns and their max values from assessment data."""
-    score_columns = {}
-    
-    for col in df.columns:
-        col_lower = col.lower()
-        if any(keyword in col_lower for keyword in ['quants', 'logical', 'verbal', 'english', 'technical', 'coding', 'mcq']):
-            # Check if column has any valid (non-NaN) data
-            col_data = pd.to_numeric(df[col], errors='coerce')
-            if col_data.isna().all():
-                # Skip columns that are entirely empty/NaN
-                continue
-            
-            match = re.search(r'\((\d+)\)', col)
-            if match:
-                max_score = int(match.group(1))
-            else:
-                max_val = col_data.max()
-                # Handle case where max_val might still be NaN
-                if pd.isna(max_val):
-                    continue
-                if max_val <= 100:
-                    max_score = 100
-                elif max_val <= 160:
-                    max_score = 160
-                else:
-                    max_score = int(np.ceil(max_val / 10) * 10)
-            score_columns[col] = max_score
-    
-    return score_columns
-
-
-@st.cache_data(show_spinner="Loading assessment data...")
-def load_assessment_data(uploaded_file):
-    """Load and process assessment/test results data."""
+def load_upload(kind, uploaded_file, fingerprint):
+    """Load an upload into a Dataset, reporting problems on the page instead of raising."""
     try:
-        uploaded_file.seek(0)
-        df = None
-        
-        for encoding in ['utf-8', 'latin1', 'cp1252']:
-            try:
-                uploaded_file.seek(0)
-                df = pd.read_csv(uploaded_file, encoding=encoding)
-                break
-            except:
-                continue
-        
-        if df is None:
-            st.error("Could not read the CSV file with any encoding.")
-            return None, None
-        
-        # Detect score columns
-        score_columns = detect_score_columns(df)
-        
-        if not score_columns:
-            st.warning("No score columns detected. Looking for columns with 'Quants', 'Logical', 'Verbal', etc.")
-            return None, None
-        
-        # Convert score columns to numeric and fill NaN with 0
-        for col in score_columns.keys():
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        # Calculate total score
-        total_max = sum(score_columns.values())
-        df['Score'] = df[list(score_columns.keys())].sum(axis=1).fillna(0)
-        df['Total_Max'] = total_max
-        
-        # Calculate percentages (handle division safely)
-        for col, max_val in score_columns.items():
-            pct_col = col.split('(')[0].strip().replace(' ', '_') + '_Percentage'
-            df[pct_col] = (df[col] / max_val * 100).fillna(0).round(2)
-        
-        df['Total_Percentage'] = (df['Score'] / total_max * 100).fillna(0).round(2)
-        
-        # Calculate rank - handle NaN by filling with 0 first, then rank
-        df['Rank'] = df['Score'].rank(method='dense', ascending=False).fillna(0).astype(int)
-        
-        # Clean student names if column exists
-        if 'Student_Name' in df.columns:
-            df['Student_Name'] = df['Student_Name'].fillna('Unknown').astype(str).str.title()
-        
-        return df, score_columns
-        
+        return load_dataset(kind, uploaded_file, fingerprint)
+    except NoScoreColumnsError as e:
+        st.warning(str(e))
     except Exception as e:
-        st.error(f"Error loading assessment data: {e}")
-        return None, None
+        st.error(f"Error loading {kind} data: {e}")
+    return None
 
 
-@st.cache_data(show_spinner="Loading course data...")
-def load_course_data(uploaded_file):
-    """Load and process LMS course progress data."""
-    try:
-        uploaded_file.seek(0)
-        
-        # Check file type
-        if uploaded_file.name.endswith('.xlsx'):
-            df = pd.read_excel(uploaded_file)
-        else:
-            for encoding in ['utf-8', 'latin1', 'cp1252']:
-                try:
-                    uploaded_file.seek(0)
-                    df = pd.read_csv(uploaded_file, encoding=encoding)
-                    break
-                except:
-                    continue
-        
-        # Convert numeric columns
-        numeric_cols = ['Courses Started', 'Overall Completion %', 'Courses Completed']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        # Get course columns first for recalculation
-        course_cols = []
-        if 'Overall Completion %' in df.columns:
-            idx = df.columns.get_loc('Overall Completion %')
-            course_cols = df.columns[idx + 1:].tolist()
-        else:
-            course_cols = df.columns[11:].tolist()
-        
-        # Convert course columns to numeric
-        for col in course_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        # Recalculate Courses Started (>=10%) and Courses Completed (>=90%)
-        if course_cols:
-            df['Courses Started'] = (df[course_cols] >= 10).sum(axis=1).astype(int)
-            df['Courses Completed'] = (df[course_cols] >= 90).sum(axis=1).astype(int)
-        
-        # Get course columns (columns after standard metadata)
-        course_columns = []
-        if 'Overall Completion %' in df.columns:
-            idx = df.columns.get_loc('Overall Completion %')
-            course_columns = df.columns[idx + 1:].tolist()
-        else:
-            # Fallback: assume columns after index 11 are courses
-            course_columns = df.columns[11:].tolist()
-        
-        # Convert course columns to numeric
-        for col in course_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        # Recalculate Courses Started (>=10%) and Courses Completed (>=90%)
-        if course_columns:
-            df['Courses Started'] = (df[course_columns] >= 10).sum(axis=1).astype(int)
-            df['Courses Completed'] = (df[course_columns] >= 90).sum(axis=1).astype(int)
-        
-        return df, course_columns
-        
-    except Exception as e:
-        st.error(f"Error loading course data: {e}")
-        return None, None
+def get_upload_fingerprint(uploaded_file):
+    """Content fingerprint of an upload, hashed once per uploaded file rather than on every rerun."""
+    upload_id = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+    if st.session_state.get("upload_id") != upload_id:
+        st.session_state["upload_id"] = upload_id
+        st.session_state["upload_fingerprint"] = content_fingerprint(uploaded_file)
+    return st.session_state["upload_fingerprint"]
+
+
+def show_memory_report(load_info):
+    """Sidebar memory footprint of the loaded frame, before/after the dtype plan."""
+    report = (load_info or {}).get('memory')
+    if not report:
+        return
+    before, after = report['bytes_before'], report['bytes_after']
+    saved_pct = (1 - after / before) * 100 if before else 0
+    st.metric("Memory", format_bytes(after), f"-{saved_pct:.0f}% vs {format_bytes(before)}", delta_color="inverse")
+    with st.expander("Memory by column"):
+        mem_df = pd.DataFrame(report['columns'])
+        mem_df['Before'] = mem_df['bytes_before'].apply(format_bytes)
+        mem_df['After'] = mem_df['bytes_after'].apply(format_bytes)
+        mem_df = mem_df.sort_values('bytes_before', ascending=False)
+        st.dataframe(mem_df[['column', 'Before', 'After']], use_container_width=True, hide_index=True)
 
 
 # --- Sidebar ---
@@ -195,25 +80,22 @@ with st.sidebar:
         )
         
         if assessment_file is not None:
-            df, score_columns = load_assessment_data(assessment_file)
-            if df is not None:
-                st.session_state["assessment_df"] = df
-                st.session_state["score_columns"] = score_columns
-                st.session_state["data_mode"] = "assessment"
-                
-                # Clear course data if exists
-                if "df" in st.session_state:
-                    del st.session_state["df"]
-                if "course_columns" in st.session_state:
-                    del st.session_state["course_columns"]
-                
+            fingerprint = get_upload_fingerprint(assessment_file)
+            # Shared across sessions: the file is processed once per server process
+            with st.spinner("Loading assessment data..."):
+                dataset = load_session_dataset(
+                    "assessment", fingerprint, lambda: load_upload("assessment", assessment_file, fingerprint))
+            if dataset is not None:
+                df, score_columns, load_info = dataset.df, dataset.columns, dataset.load_info
                 st.success("✅ Assessment data loaded!")
+                st.caption(format_load_info(load_info))
                 
                 st.write("### Quick Stats")
                 st.metric("Total Students", len(df))
                 if 'Score' in df.columns:
                     st.metric("Average Score", f"{df['Score'].mean():.1f}/{df['Total_Max'].iloc[0]}")
                     st.metric("Highest Score", f"{df['Score'].max()}/{df['Total_Max'].iloc[0]}")
+                show_memory_report(load_info)
                 
                 st.write("### Detected Sections")
                 for col, max_val in score_columns.items():
@@ -230,25 +112,22 @@ with st.sidebar:
         )
         
         if course_file is not None:
-            df, course_columns = load_course_data(course_file)
-            if df is not None:
-                st.session_state["df"] = df
-                st.session_state["course_columns"] = course_columns
-                st.session_state["data_mode"] = "course"
-                
-                # Clear assessment data if exists
-                if "assessment_df" in st.session_state:
-                    del st.session_state["assessment_df"]
-                if "score_columns" in st.session_state:
-                    del st.session_state["score_columns"]
-                
+            fingerprint = get_upload_fingerprint(course_file)
+            # Shared across sessions: the file is processed once per server process
+            with st.spinner("Loading course data..."):
+                dataset = load_session_dataset(
+                    "course", fingerprint, lambda: load_upload("course", course_file, fingerprint))
+            if dataset is not None:
+                df, course_columns, load_info = dataset.df, dataset.columns, dataset.load_info
                 st.success("✅ Course data loaded!")
+                st.caption(format_load_info(load_info))
                 
                 st.write("### Quick Stats")
                 st.metric("Total Students", len(df))
                 st.metric("Total Courses", len(course_columns))
                 if 'Overall Completion %' in df.columns:
                     st.metric("Avg Completion", f"{df['Overall Completion %'].mean():.1f}%")
+                show_memory_report(load_info)
     
     st.write("---")
     
@@ -330,41 +209,38 @@ if current_mode is None:
         """)
 
 elif current_mode == "assessment":
-    df = st.session_state.get("assessment_df")
-    score_columns = st.session_state.get("score_columns", {})
+    dataset = get_session_dataset("assessment")
+    summary = dataset.summary()
+    total_max = summary['total_max']
     
     st.success("✅ Assessment data loaded! Navigate using the sidebar.")
     
     # Metrics
     col1, col2, col3, col4 = st.columns(4)
     
-    total_max = df['Total_Max'].iloc[0] if 'Total_Max' in df.columns else 480
-    
     with col1:
-        st.metric("Total Students", len(df))
+        st.metric("Total Students", summary['total_students'])
     
     with col2:
-        avg_score = df['Score'].mean()
+        avg_score = summary['avg_score']
         st.metric("Average Score", f"{avg_score:.1f}/{total_max}", f"{(avg_score/total_max*100):.1f}%")
     
     with col3:
-        top_score = df['Score'].max()
-        st.metric("Highest Score", f"{top_score}/{total_max}")
+        st.metric("Highest Score", f"{summary['top_score']}/{total_max}")
     
     with col4:
-        pass_rate = len(df[df['Total_Percentage'] >= 50]) / len(df) * 100
-        st.metric("Pass Rate (≥50%)", f"{pass_rate:.1f}%")
+        st.metric("Pass Rate (≥50%)", f"{summary['pass_rate']:.1f}%")
     
     st.write("---")
     
     # Detected sections
     st.subheader("📊 Detected Score Categories")
-    cols = st.columns(len(score_columns))
-    for i, (col_name, max_val) in enumerate(score_columns.items()):
+    sections = dataset.section_averages()
+    cols = st.columns(len(sections))
+    for i, section in enumerate(sections.to_dict('records')):
         with cols[i]:
-            display_name = col_name.split('(')[0].strip()
-            avg = df[col_name].mean()
-            st.metric(display_name, f"Avg: {avg:.1f}/{max_val}", f"{(avg/max_val*100):.1f}%")
+            st.metric(section['Section'], f"Avg: {section['Average Score']:.1f}/{section['Max Score']}",
+                      f"{section['Average %']:.1f}%")
     
     st.write("---")
     st.subheader("📋 Available Pages")
@@ -378,8 +254,8 @@ elif current_mode == "assessment":
     """)
 
 elif current_mode == "course":
-    df = st.session_state.get("df")
-    course_columns = st.session_state.get("course_columns", [])
+    dataset = get_session_dataset("course")
+    df, course_columns = dataset.df, dataset.columns
     
     st.success("✅ Course data loaded! Navigate using the sidebar.")
     
@@ -0,0 +1 @@
+# Synthetic data and benchmark suite for Student Analytics Dashboard
@@ -0,0 +1,102 @@
+"""
+Compare the Excel export engines on synthetic data: wall time and peak memory.
+
+    python -m benchmarks.excel_memory                      # 50,000 students, 300 courses
+    python -m benchmarks.excel_memory --students 10000 --courses 100
+
+Every (workbook, engine) pair is built in a fresh process, so each peak RSS
+is its own. 'Peak RSS' is the process peak while building; 'build RSS' is how
+far it rose above the peak after loading the data, i.e. the writer's own cost.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.run import DATA_DIR, ensure_data, max_rss_mb
+from utils.excel_reports import (create_excel_report, create_student_assessment_report,
+                                 create_full_student_report, create_recommendations_report)
+from utils.loaders import LocalFile, load_assessment_data, load_course_data
+
+ENGINES = ['openpyxl', 'xlsxwriter']
+
+# Workbook -> (data kind, builder taking (dataset, top_k, path))
+WORKBOOKS = {
+    'excel_report': ('assessment', lambda d, k, path: create_excel_report(d.df, d.columns, path=path)),
+    'student_assessment_report': ('assessment',
+                                  lambda d, k, path: create_student_assessment_report(d.df, d.columns, path=path)),
+    'full_student_report': ('course', lambda d, k, path: create_full_student_report(d, d.top_k_courses(k), path=path)),
+    'recommendations_report': ('course', lambda d, k, path: create_recommendations_report(d, 5, path=path)),
+}
+
+
+def build_one(workbook, data_path, top_k):
+    """Child process: load the data, build one workbook with the engine in the environment, print JSON."""
+    kind, builder = WORKBOOKS[workbook]
+    loader = load_assessment_data if kind == 'assessment' else load_course_data
+    with LocalFile(data_path) as f:
+        dataset = loader(f, None)
+    if kind == 'course':
+        # Derived tables the report reads are not part of the writer's cost
+        dataset.master_report(dataset.top_k_courses(top_k))
+        dataset.summary_tables()
+        dataset.batch_recommendations(5)
+    loaded_rss = max_rss_mb()
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        builder(dataset, top_k, path)
+        seconds = time.perf_counter() - start
+        size = os.path.getsize(path)
+    finally:
+        os.remove(path)
+    peak_rss = max_rss_mb()
+    print(json.dumps({'seconds': round(seconds, 3), 'bytes': size, 'peak_rss_mb': peak_rss,
+                      'build_rss_mb': round(peak_rss - loaded_rss, 1) if peak_rss is not None else None}))
+
+
+def measure(workbook, engine, data_path, top_k):
+    env = dict(os.environ, DASHBOARD_EXCEL_ENGINE=engine)
+    out = subprocess.run([sys.executable, '-m', 'benchmarks.excel_memory', '--child', workbook, data_path,
+                          '--top-k', str(top_k)], env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare Excel export engines: time and peak memory.")
+    parser.add_argument('--students', type=int, default=50_000, help="synthetic students (default: 50000)")
+    parser.add_argument('--courses', type=int, default=300, help="synthetic course columns (default: 300)")
+    parser.add_argument('--top-k', type=int, default=5, help="top-k courses in the full student report (default: 5)")
+    parser.add_argument('--only', help=f"comma-separated workbooks (default: all of {', '.join(WORKBOOKS)})")
+    parser.add_argument('--seed', type=int, default=0, help="synthetic data seed (default: 0)")
+    parser.add_argument('--data-dir', default=DATA_DIR, help=f"synthetic data cache (default: {DATA_DIR})")
+    parser.add_argument('--child', nargs=2, metavar=('WORKBOOK', 'DATA'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        build_one(args.child[0], args.child[1], args.top_k)
+        return 0
+
+    selected = [w.strip() for w in args.only.split(',')] if args.only else list(WORKBOOKS)
+    unknown = [w for w in selected if w not in WORKBOOKS]
+    if unknown:
+        parser.error(f"unknown workbook(s): {', '.join(unknown)}")
+
+    print(f"{args.students:,} students, {args.courses:,} courses")
+    assessment_path, course_path = ensure_data(args.data_dir, args.students, args.courses, args.seed)
+    for workbook in selected:
+        data_path = assessment_path if WORKBOOKS[workbook][0] == 'assessment' else course_path
+        for engine in ENGINES:
+            r = measure(workbook, engine, data_path, args.top_k)
+            print(f"  {workbook:<26} {engine:<10} {r['seconds']:8.2f}s  {r['bytes'] / 1e6:7.1f} MB  "
+                  f"peak RSS {r['peak_rss_mb']} MB (+{r['build_rss_mb']} MB building)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
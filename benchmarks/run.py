@@ -0,0 +1,363 @@
+"""
+Benchmark the load / analytics / report paths on synthetic data at several scales.
+
+    python -m benchmarks.run                          # small and medium
+    python -m benchmarks.run --scales large --repeat 1
+    python -m benchmarks.run --students 50000 --courses 300
+    python -m benchmarks.run --compare benchmarks/results/abc1234.json
+
+Synthetic files are generated once per (scale, seed) into --data-dir and reused.
+Results are written as JSON (default: benchmarks/results/<git revision>.json)
+so two versions can be compared with --compare; a benchmark whose median time
+grew by more than --tolerance is reported as a regression and the run exits 1.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.smtp_sink import SmtpSink
+from benchmarks.synthetic import write_assessment_csv, write_course_export
+from utils.analytics import Dataset, course_stats, co_enrollment, top_courses_by_branch
+from utils.excel_reports import create_full_student_report
+from utils.loaders import LocalFile, load_assessment_data, load_course_data
+from utils.dispatcher import EmailDispatcher
+from utils.pdf_report import StudentReportRenderer, generate_student_pdf_report
+from utils.smtp_pool import SmtpPool, build_message
+
+# Scale name -> (students, courses)
+SCALES = {
+    'small': (1_000, 20),
+    'medium': (10_000, 100),
+    'large': (100_000, 500),
+    'xlarge': (1_000_000, 1_000),
+}
+DEFAULT_SCALES = ['small', 'medium']
+
+RESULTS_DIR = os.path.join('benchmarks', 'results')
+DATA_DIR = os.path.join('benchmarks', '.data')
+
+
+def git_revision():
+    """Short revision of the working tree ('+dirty' if modified), or None outside a git checkout."""
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return f"{rev}+dirty" if dirty else rev
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def max_rss_mb():
+    """Peak resident memory of this process so far, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def time_call(fn, repeat):
+    """Run fn repeat times. Returns (wall times in seconds, result of the last run)."""
+    times, result = [], None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return times, result
+
+
+def ensure_data(data_dir, students, courses, seed):
+    """Generate (or reuse) the synthetic assessment CSV and course export for one scale."""
+    os.makedirs(data_dir, exist_ok=True)
+    assessment_path = os.path.join(data_dir, f"assessment_{students}_s{seed}.csv")
+    course_path = os.path.join(data_dir, f"course_{students}x{courses}_s{seed}.csv")
+
+    for path, write in ((assessment_path, lambda: write_assessment_csv(assessment_path, students, seed)),
+                        (course_path, lambda: write_course_export(course_path, students, courses, seed))):
+        if not os.path.exists(path):
+            start = time.perf_counter()
+            write()
+            print(f"  generated {os.path.basename(path)} in {time.perf_counter() - start:.1f}s")
+    return assessment_path, course_path
+
+
+# ============================================
+# BENCHMARKS
+# ============================================
+# Each benchmark takes the per-scale context and returns (callable, calls per run).
+# A fingerprint of None bypasses the snapshot store, so the loaders always parse.
+
+def bench_load_assessment_data(ctx):
+    def run():
+        with LocalFile(ctx['assessment_path']) as f:
+            return load_assessment_data(f, None)
+    return run, 1
+
+
+def bench_load_course_data(ctx):
+    def run():
+        with LocalFile(ctx['course_path']) as f:
+            return load_course_data(f, None)
+    return run, 1
+
+
+def bench_course_stats(ctx):
+    course = ctx['course']
+    return (lambda: course_stats(course.df, course.columns)), 1
+
+
+def bench_co_enrollment(ctx):
+    course = ctx['course']
+    return (lambda: co_enrollment(course.df, course.columns)), 1
+
+
+def bench_top_courses_by_branch(ctx):
+    course = ctx['course']
+    return (lambda: top_courses_by_branch(course.df, course.columns)), 1
+
+
+def bench_create_full_student_report(ctx):
+    course = ctx['course']
+    top_k = course.top_k_courses(ctx['top_k'])
+
+    def run():
+        # A fresh Dataset per run, so its cached summaries are rebuilt and timed
+        dataset = Dataset('course', course.df, course.columns, course.load_info)
+        return create_full_student_report(dataset, top_k)
+    return run, 1
+
+
+def bench_generate_student_pdf_report(ctx):
+    assessment = ctx['assessment']
+    df, score_columns = assessment.df, assessment.columns
+    # Evenly spaced students, so the sample covers the whole score range
+    positions = np.linspace(0, len(df) - 1, min(ctx['pdf_samples'], len(df))).astype(int)
+
+    def run():
+        return [generate_student_pdf_report(df.iloc[pos], df, score_columns, ctx['logo']) for pos in positions]
+    return run, len(positions)
+
+
+def bench_render_student_pdf(ctx):
+    # Bulk path: one renderer per dataset, as in the PDF render pool's workers
+    assessment = ctx['assessment']
+    df = assessment.df
+    renderer = StudentReportRenderer(df, assessment.columns, ctx['logo'])
+    positions = np.linspace(0, len(df) - 1, min(ctx['pdf_samples'], len(df))).astype(int)
+
+    def run():
+        return [renderer.render(df.iloc[pos]) for pos in positions]
+    return run, len(positions)
+
+
+def _bulk_email(ctx, max_messages, connections=1):
+    # One sink per run of the suite, with the configured reply latency
+    if 'smtp_sink' not in ctx:
+        ctx['smtp_sink'] = SmtpSink(latency=ctx['smtp_latency']).__enter__()
+    sink = ctx['smtp_sink']
+    assessment = ctx['assessment']
+    pdf = generate_student_pdf_report(assessment.df.iloc[0], assessment.df, assessment.columns, ctx['logo'])
+
+    def send(dispatcher, i):
+        dispatcher.send(build_message('bench@localhost', 'Benchmark', f"student{i}@localhost",
+                                      "Your Assessment Performance Report", "Report attached.", pdf, "report.pdf"))
+
+    def run():
+        pool = SmtpPool('localhost', sink.port, 'bench', 'bench', starttls=False,
+                        connections=connections, max_messages=max_messages)
+        dispatcher = EmailDispatcher(pool)
+        # One sender thread per connection, as in a bulk send job
+        with ThreadPoolExecutor(max_workers=connections) as senders:
+            list(senders.map(lambda i: send(dispatcher, i), range(ctx['emails'])))
+        dispatcher.close()
+        return pool.opened
+    return run, ctx['emails']
+
+
+def bench_smtp_send_per_message(ctx):
+    # A new connection and login for every email, as before connection pooling
+    return _bulk_email(ctx, max_messages=1)
+
+
+def bench_smtp_send_pooled(ctx):
+    return _bulk_email(ctx, max_messages=100)
+
+
+def bench_smtp_send_concurrent(ctx):
+    return _bulk_email(ctx, max_messages=100, connections=4)
+
+
+BENCHMARKS = {
+    'load_assessment_data': bench_load_assessment_data,
+    'load_course_data': bench_load_course_data,
+    'course_stats': bench_course_stats,
+    'co_enrollment': bench_co_enrollment,
+    'top_courses_by_branch': bench_top_courses_by_branch,
+    'create_full_student_report': bench_create_full_student_report,
+    'generate_student_pdf_report': bench_generate_student_pdf_report,
+    'render_student_pdf': bench_render_student_pdf,
+    'smtp_send_per_message': bench_smtp_send_per_message,
+    'smtp_send_pooled': bench_smtp_send_pooled,
+    'smtp_send_concurrent': bench_smtp_send_concurrent,
+}
+
+
+def run_scale(scale, students, courses, args, selected):
+    """Run the selected benchmarks at one scale. Returns a list of result records."""
+    print(f"\n{scale}: {students:,} students, {courses:,} courses")
+    assessment_path, course_path = ensure_data(args.data_dir, students, courses, args.seed)
+    ctx = {
+        'assessment_path': assessment_path,
+        'course_path': course_path,
+        'pdf_samples': args.pdf_samples,
+        'top_k': args.top_k,
+        'logo': args.logo,
+        'emails': args.emails,
+        'smtp_latency': args.smtp_latency,
+    }
+
+    # Loaded datasets for the analytics benchmarks, timed themselves when selected
+    with LocalFile(assessment_path) as f:
+        ctx['assessment'] = load_assessment_data(f, None)
+    with LocalFile(course_path) as f:
+        ctx['course'] = load_course_data(f, None)
+
+    results = []
+    for name in selected:
+        fn, calls = BENCHMARKS[name](ctx)
+        times, _ = time_call(fn, args.repeat)
+        per_call = [t / calls for t in times]
+        record = {
+            'scale': scale,
+            'students': students,
+            'courses': courses,
+            'benchmark': name,
+            'calls': calls,
+            'runs': [round(t, 6) for t in per_call],
+            'min': round(min(per_call), 6),
+            'median': round(float(np.median(per_call)), 6),
+            'max_rss_mb': max_rss_mb(),
+        }
+        results.append(record)
+        unit = '/call' if calls > 1 else ''
+        print(f"  {name:<28} {record['median']:9.3f}s{unit}  (min {record['min']:.3f}s, {args.repeat} runs)")
+
+    if 'smtp_sink' in ctx:
+        ctx['smtp_sink'].__exit__(None, None, None)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print median time ratios against a baseline results file. Returns the regressed (scale, benchmark) pairs."""
+    old = {(r['scale'], r['students'], r['courses'], r['benchmark']): r for r in baseline['results']}
+    regressions = []
+
+    print(f"\nCompared with {baseline['meta'].get('revision') or 'baseline'} (ratio = new / old median):")
+    for r in results:
+        before = old.get((r['scale'], r['students'], r['courses'], r['benchmark']))
+        if before is None or not before['median']:
+            continue
+        ratio = r['median'] / before['median']
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  REGRESSION'
+            regressions.append((r['scale'], r['benchmark']))
+        elif ratio < 1 - tolerance:
+            flag = '  faster'
+        print(f"  {r['scale']:<8} {r['benchmark']:<28} {before['median']:9.3f}s -> {r['median']:9.3f}s  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard on synthetic data.")
+    parser.add_argument('--scales', default=','.join(DEFAULT_SCALES),
+                        help=f"comma-separated scales from {', '.join(SCALES)} (default: {','.join(DEFAULT_SCALES)})")
+    parser.add_argument('--students', type=int, help="custom scale: number of students (overrides --scales)")
+    parser.add_argument('--courses', type=int, default=100, help="custom scale: course columns (default: 100)")
+    parser.add_argument('--only', help=f"comma-separated benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per benchmark (default: 3)")
+    parser.add_argument('--pdf-samples', type=int, default=5, help="PDF reports rendered per run (default: 5)")
+    parser.add_argument('--top-k', type=int, default=5, help="top-k courses in the full student report (default: 5)")
+    parser.add_argument('--emails', type=int, default=200, help="emails sent per run to the local SMTP sink (default: 200)")
+    parser.add_argument('--smtp-latency', type=float, default=0.005,
+                        help="simulated SMTP reply latency in seconds (default: 0.005)")
+    parser.add_argument('--seed', type=int, default=0, help="synthetic data seed (default: 0)")
+    parser.add_argument('--data-dir', default=DATA_DIR, help=f"synthetic data cache (default: {DATA_DIR})")
+    parser.add_argument('--logo', default='logo.png', help="logo for PDF headers (default: logo.png)")
+    parser.add_argument('--out', help=f"results file (default: {RESULTS_DIR}/<git revision>.json)")
+    parser.add_argument('--compare', metavar='BASELINE', help="results file of an earlier run to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="median slowdown reported as a regression (default: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.students:
+        args.scales = {'custom': (args.students, args.courses)}
+    else:
+        names = [s.strip() for s in args.scales.split(',') if s.strip()]
+        unknown = [s for s in names if s not in SCALES]
+        if unknown:
+            parser.error(f"unknown scale(s): {', '.join(unknown)}")
+        args.scales = {s: SCALES[s] for s in names}
+
+    args.only = [b.strip() for b in args.only.split(',')] if args.only else list(BENCHMARKS)
+    unknown = [b for b in args.only if b not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    args.repeat = max(1, args.repeat)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    revision = git_revision()
+    meta = {
+        'revision': revision,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+    }
+
+    results = []
+    for scale, (students, courses) in args.scales.items():
+        results.extend(run_scale(scale, students, courses, args, args.only))
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{revision or 'local'}.json")
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2)
+    print(f"\nResults written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Local stand-in SMTP server that accepts and discards mail, for measuring bulk
+email throughput offline.
+
+    python -m benchmarks.smtp_sink --port 1025 --latency 0.02
+
+Point the Email page (or SmtpPool) at localhost:1025 with STARTTLS off. Every
+reply can be delayed by --latency seconds to mimic the round trip to a real
+provider, --drop-after N closes each connection after N messages to
+exercise reconnects, and --tempfail-every N answers every Nth message with a
+451 "try again later" to exercise retries. Any AUTH PLAIN credentials are
+accepted.
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """One SMTP session: just enough of RFC 5321 for smtplib."""
+
+    def reply(self, *lines):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.wfile.write(b"".join(line.encode('ascii') + b"\r\n" for line in lines))
+
+    def handle(self):
+        sink = self.server
+        sink.count('connections')
+        accepted = 0
+        self.reply("220 localhost SMTP sink ready")
+
+        for raw in self.rfile:
+            command = raw.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if sink.drop_after and accepted >= sink.drop_after:
+                # Simulate the provider hanging up on a long-lived session
+                return
+            if verb == 'EHLO':
+                self.reply("250-localhost", "250-AUTH PLAIN", "250 SIZE 52428800")
+            elif verb == 'HELO':
+                self.reply("250 localhost")
+            elif verb == 'AUTH':
+                self.reply("235 Authentication successful")
+            elif verb == 'MAIL' and sink.tempfail():
+                self.reply("451 4.3.0 Temporary failure, try again later")
+            elif verb in ('MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self.reply("250 OK")
+            elif verb == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                for line in self.rfile:
+                    if line in (b".\r\n", b".\n"):
+                        break
+                    size += len(line)
+                accepted += 1
+                sink.count('messages', size)
+                self.reply("250 OK queued")
+            elif verb == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    """
+    Threaded SMTP sink on host:port (port 0 picks a free one). Use as a
+    context manager to serve in a background thread; counts connections,
+    messages and message bytes.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='localhost', port=0, latency=0.0, drop_after=None, tempfail_every=None):
+        super().__init__((host, port), _SmtpHandler)
+        self.latency = latency
+        self.drop_after = drop_after
+        self.tempfail_every = tempfail_every
+        self.connections = 0
+        self.messages = 0
+        self.bytes = 0
+        self.tempfails = 0
+        self._mail_commands = 0
+        self._counter_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def count(self, what, size=0):
+        with self._counter_lock:
+            if what == 'connections':
+                self.connections += 1
+            else:
+                self.messages += 1
+                self.bytes += size
+
+    def tempfail(self):
+        """Whether to reject the current MAIL command with a transient error."""
+        if not self.tempfail_every:
+            return False
+        with self._counter_lock:
+            self._mail_commands += 1
+            if self._mail_commands % self.tempfail_every:
+                return False
+            self.tempfails += 1
+            return True
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local SMTP server that accepts and discards mail.")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=1025)
+    parser.add_argument('--latency', type=float, default=0.0, help="delay before every reply, in seconds")
+    parser.add_argument('--drop-after', type=int, help="close each connection after this many messages")
+    parser.add_argument('--tempfail-every', type=int, help="reject every Nth message with a transient 451")
+    args = parser.parse_args(argv)
+
+    with SmtpSink(args.host, args.port, args.latency, args.drop_after, args.tempfail_every) as sink:
+        print(f"SMTP sink listening on {args.host}:{sink.port} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(5)
+                print(f"  {sink.connections} connections, {sink.messages} messages, {sink.bytes / 1e6:.1f} MB")
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Deterministic synthetic datasets in the two upload formats.
+
+    python -m benchmarks.synthetic assessment data/assess_10k.csv --students 10000
+    python -m benchmarks.synthetic course data/lms_100k.csv --students 100000 --courses 500
+
+Rows are generated in fixed blocks of BLOCK_ROWS students, each from its own
+generator seeded by (seed, block index), and written to disk block by block.
+The same arguments always produce the same file, and a 1M x 1000 course export
+never has to fit in memory at once.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BLOCK_ROWS = 10_000
+
+BRANCHES = ['CSE', 'ECE', 'EEE', 'ME', 'CE', 'IT', 'AIML', 'CSD']
+BRANCH_WEIGHTS = [0.28, 0.18, 0.1, 0.1, 0.07, 0.12, 0.1, 0.05]
+YEARS = [2025, 2026, 2027, 2028]
+
+FIRST_NAMES = ['aarav', 'ananya', 'arjun', 'diya', 'ishaan', 'kavya', 'krishna', 'meera',
+               'nikhil', 'priya', 'rahul', 'riya', 'rohan', 'sanjana', 'siddharth', 'tanvi']
+LAST_NAMES = ['sharma', 'reddy', 'iyer', 'patel', 'nair', 'gupta', 'rao', 'das', 'singh', 'menon']
+
+# Section column -> max marks, in the 'Quants (160)' form detect_score_columns expects
+SECTIONS = {
+    'Quants (160)': 160,
+    'Logical (160)': 160,
+    'Verbal (160)': 160,
+}
+
+# Share of students who skipped a section (left blank in the export)
+ABSENT_RATE = 0.01
+
+# Average number of courses a student starts, before capping at the course count
+AVG_COURSES_STARTED = 12
+
+
+def _blocks(n_rows):
+    """(block index, start, stop) for every BLOCK_ROWS-sized block of n_rows."""
+    for index, start in enumerate(range(0, n_rows, BLOCK_ROWS)):
+        yield index, start, min(start + BLOCK_ROWS, n_rows)
+
+
+def _names(rng, n):
+    first = rng.choice(FIRST_NAMES, n)
+    last = rng.choice(LAST_NAMES, n)
+    return first, last
+
+
+def assessment_block(start, stop, seed=0, sections=SECTIONS):
+    """Assessment rows start..stop-1 as a frame."""
+    rng = np.random.default_rng([seed, start // BLOCK_ROWS])
+    n = stop - start
+    ids = np.arange(start, stop)
+    first, last = _names(rng, n)
+
+    frame = {
+        # Lower-case names, as the loaders title-case them
+        'Student_Name': [f"{f} {l}" for f, l in zip(first, last)],
+        'Email': [f"student{i}@example.edu" for i in ids],
+        'College_Reg': [f"REG{i:07d}" for i in ids],
+        'Batch': rng.choice(YEARS, n),
+        'Branch': rng.choice(BRANCHES, n, p=BRANCH_WEIGHTS),
+    }
+
+    # One latent ability per student keeps the sections correlated
+    ability = rng.normal(0.55, 0.17, n)
+    total = np.zeros(n, dtype=np.int64)
+    for col, max_val in sections.items():
+        marks = np.rint(np.clip(ability + rng.normal(0, 0.1, n), 0, 1) * max_val).astype(np.int64)
+        absent = rng.random(n) < ABSENT_RATE
+        total += np.where(absent, 0, marks)
+        frame[col] = pd.array(marks, dtype='Int64')
+        frame[col][absent] = pd.NA
+    frame['Score'] = total
+
+    return pd.DataFrame(frame)
+
+
+def _course_probabilities(n_courses, seed):
+    """Per-branch enrollment probability of every course: skewed popularity times a branch affinity."""
+    # A child stream of the seed, independent of the per-block generators
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(1,)))
+    popularity = 1.0 / np.arange(1, n_courses + 1) ** 0.8
+    rng.shuffle(popularity)
+    popularity *= min(AVG_COURSES_STARTED, n_courses / 2) / popularity.sum()
+    affinity = rng.lognormal(0, 0.5, size=(len(BRANCHES), n_courses))
+    return np.clip(popularity * affinity, 0, 0.95).astype(np.float32)
+
+
+def course_block(start, stop, n_courses, seed=0, probabilities=None):
+    """LMS export rows start..stop-1 as a frame with n_courses course columns."""
+    if probabilities is None:
+        probabilities = _course_probabilities(n_courses, seed)
+    rng = np.random.default_rng([seed, start // BLOCK_ROWS])
+    n = stop - start
+    ids = np.arange(start, stop)
+    first, last = _names(rng, n)
+    branch = rng.choice(len(BRANCHES), n, p=BRANCH_WEIGHTS)
+
+    # Started courses: 40% finished (90-100, mostly exactly 100), the rest in progress (10-90)
+    started = rng.random((n, n_courses), dtype=np.float32) < probabilities[branch]
+    finished = rng.random((n, n_courses), dtype=np.float32) < 0.4
+    progress = np.where(finished,
+                        np.minimum(100, rng.uniform(90, 110, (n, n_courses))),
+                        rng.uniform(10, 90, (n, n_courses)))
+    # A few opened-but-not-started courses below the 10% threshold
+    browsed = rng.random((n, n_courses), dtype=np.float32) < 0.03
+    values = np.where(started, progress, np.where(browsed, rng.uniform(0, 10, (n, n_courses)), 0)).round(2)
+
+    started_count = (values >= 10).sum(axis=1)
+    completed_count = (values >= 90).sum(axis=1)
+    started_sum = np.where(values >= 10, values, 0).sum(axis=1)
+    overall = np.divide(started_sum, started_count, out=np.zeros(n), where=started_count > 0).round(2)
+
+    meta = pd.DataFrame({
+        'Registration Number': [f"REG{i:07d}" for i in ids],
+        'First Name': np.char.title(first),
+        'Last Name': np.char.title(last),
+        'Email': [f"student{i}@example.edu" for i in ids],
+        'Branch Name': np.array(BRANCHES)[branch],
+        'Year of Passing': rng.choice(YEARS, n),
+        'Courses Started': started_count,
+        'Courses Completed': completed_count,
+        'Overall Completion %': overall,
+    })
+    courses = pd.DataFrame(values, columns=course_names(n_courses))
+    return pd.concat([meta, courses], axis=1)
+
+
+def course_names(n_courses):
+    return [f"Course {i:04d}" for i in range(n_courses)]
+
+
+def make_assessment(n_students, seed=0):
+    """A whole synthetic assessment frame in memory."""
+    return pd.concat([assessment_block(start, stop, seed) for _, start, stop in _blocks(n_students)],
+                     ignore_index=True)
+
+
+def make_course_export(n_students, n_courses, seed=0):
+    """A whole synthetic LMS course export in memory."""
+    probabilities = _course_probabilities(n_courses, seed)
+    return pd.concat([course_block(start, stop, n_courses, seed, probabilities)
+                      for _, start, stop in _blocks(n_students)], ignore_index=True)
+
+
+def _write_blocks(path, blocks):
+    """Write frames to a CSV one block at a time (atomically, via a temp file)."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        for i, block in enumerate(blocks):
+            block.to_csv(f, index=False, header=(i == 0))
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_assessment_csv(path, n_students, seed=0):
+    """Write a synthetic assessment CSV. Returns the path."""
+    return _write_blocks(path, (assessment_block(start, stop, seed) for _, start, stop in _blocks(n_students)))
+
+
+def write_course_export(path, n_students, n_courses, seed=0):
+    """Write a synthetic LMS export; CSV is streamed, .xlsx is built in memory. Returns the path."""
+    if path.endswith('.xlsx'):
+        make_course_export(n_students, n_courses, seed).to_excel(path, index=False)
+        return path
+    probabilities = _course_probabilities(n_courses, seed)
+    return _write_blocks(path, (course_block(start, stop, n_courses, seed, probabilities)
+                                for _, start, stop in _blocks(n_students)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic assessment or LMS course file.")
+    parser.add_argument('kind', choices=['assessment', 'course'])
+    parser.add_argument('path', help="output file (.csv, or .xlsx for course exports)")
+    parser.add_argument('--students', type=int, default=1_000, help="number of students (default: 1000)")
+    parser.add_argument('--courses', type=int, default=20, help="course columns in a course export (default: 20)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default: 0)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    if args.kind == 'assessment':
+        write_assessment_csv(args.path, args.students, args.seed)
+    else:
+        write_course_export(args.path, args.students, args.courses, args.seed)
+    size_mb = os.path.getsize(args.path) / 1024 / 1024
+    print(f"Wrote {args.path} ({size_mb:.1f} MB) in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
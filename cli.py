@@ -0,0 +1,158 @@
+"""
+Command-line batch mode: build the Downloads-page workbooks and the per-student
+PDF reports for an assessment or course file, without a browser.
+
+    python cli.py assessment results.csv --out reports/
+    python cli.py course lms_export.xlsx --out reports/ --top-k 5
+
+Workbooks and PDFs are rendered across a process pool; wall time per stage is
+printed and written to run_summary.json in the output directory.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.excel_reports import (create_excel_report, create_student_assessment_report,
+                                 create_full_student_report, create_recommendations_report)
+from utils.fingerprint import content_fingerprint
+from utils.loaders import LocalFile, load_dataset
+from utils.pdf_archive import pdf_tasks
+from utils.pdf_pool import PdfRenderPool
+from utils.throughput import ThroughputMeter
+
+PDF_CHUNK_SIZE = 25
+
+# Seconds between progress updates: a redrawn line on a terminal, a new log line otherwise
+PROGRESS_INTERVAL_TTY = 1.0
+PROGRESS_INTERVAL_LOG = 30.0
+
+
+@contextmanager
+def stage(timings, name):
+    """Time one stage of the run and print its wall time."""
+    start = time.perf_counter()
+    yield
+    timings[name] = round(time.perf_counter() - start, 3)
+    print(f"  {name:<10} {timings[name]:8.2f}s")
+
+
+def _write_workbook(path, builder, *args):
+    """Build one workbook straight into path. Returns (path, size in bytes)."""
+    builder(*args, path=path)
+    return path, os.path.getsize(path)
+
+
+def build_workbooks(pool, dataset, out_dir, top_k, recommendations=5):
+    """Write the Downloads-page workbooks in parallel. Returns {file name: size in bytes}."""
+    date = datetime.now().strftime('%Y%m%d')
+    if dataset.kind == 'assessment':
+        jobs = [
+            (f"Assessment_Report_{date}.xlsx", create_excel_report, dataset.df, dataset.columns),
+            (f"Student_Assessment_Report_{date}.xlsx", create_student_assessment_report, dataset.df, dataset.columns),
+        ]
+    else:
+        jobs = [
+            (f"Full_Student_Report_Top_{top_k}.xlsx", create_full_student_report, dataset, dataset.top_k_courses(top_k)),
+        ]
+        if recommendations:
+            jobs.append((f"Course_Recommendations_Top_{recommendations}.xlsx", create_recommendations_report,
+                         dataset, recommendations))
+
+    futures = [pool.submit(_write_workbook, os.path.join(out_dir, name), builder, *args)
+               for name, builder, *args in jobs]
+    return {os.path.basename(path): size for path, size in (f.result() for f in futures)}
+
+
+def build_pdfs(dataset, pdf_dir, workers, logo_path):
+    """Render every student's PDF report across a process pool. Returns (rendered, errors)."""
+    os.makedirs(pdf_dir, exist_ok=True)
+    filenames = dict(pdf_tasks(dataset.df))
+    meter = ThroughputMeter(len(filenames))
+
+    interactive = sys.stdout.isatty()
+    interval = PROGRESS_INTERVAL_TTY if interactive else PROGRESS_INTERVAL_LOG
+    last_progress = time.perf_counter()
+
+    errors = []
+    with PdfRenderPool(dataset.df, dataset.columns, workers, logo_path, chunk_size=PDF_CHUNK_SIZE) as pool:
+        for result in pool.render(filenames):
+            filename = filenames[result.position]
+            if result.error:
+                errors.append(f"{filename} (worker {result.worker}): {result.error}")
+            else:
+                with open(os.path.join(pdf_dir, filename), 'wb') as f:
+                    f.write(result.pdf)
+            meter.record(ok=not result.error)
+            if time.perf_counter() - last_progress >= interval:
+                last_progress = time.perf_counter()
+                if interactive:
+                    print(f"\r  pdf        {meter.summary('PDFs')}", end='', flush=True)
+                else:
+                    print(f"  pdf        {meter.summary('PDFs')}", flush=True)
+    # Final state, whatever the last update showed
+    prefix = '\r' if interactive else ''
+    print(f"{prefix}  pdf        {meter.summary('PDFs')}", flush=True)
+    return meter.succeeded, errors
+
+
+def run(args):
+    os.makedirs(args.out, exist_ok=True)
+    timings = {}
+    summary = {'kind': args.kind, 'input': args.input, 'workers': args.workers}
+
+    print(f"Processing {args.input} ({args.kind}) with {args.workers} workers")
+
+    try:
+        with stage(timings, 'load'):
+            with LocalFile(args.input) as f:
+                dataset = load_dataset(args.kind, f, content_fingerprint(f))
+    except Exception as e:
+        print(f"Error loading {args.kind} data: {e}", file=sys.stderr)
+        return 2
+    summary['students'] = len(dataset.df)
+
+    with stage(timings, 'workbooks'):
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            summary['workbooks'] = build_workbooks(pool, dataset, args.out, args.top_k, args.recommendations)
+
+    if args.kind == 'assessment' and not args.no_pdf:
+        with stage(timings, 'pdfs'):
+            rendered, errors = build_pdfs(dataset, os.path.join(args.out, 'pdfs'), args.workers, args.logo)
+        summary['pdfs'] = {'rendered': rendered, 'failed': len(errors), 'errors': errors}
+        if errors:
+            print(f"  {len(errors)} PDF(s) failed, see run_summary.json", file=sys.stderr)
+        if rendered:
+            print(f"  {rendered / timings['pdfs']:.1f} PDFs/s")
+
+    summary['timings'] = timings
+    with open(os.path.join(args.out, 'run_summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"  {'total':<10} {sum(timings.values()):8.2f}s")
+    return 1 if summary.get('pdfs', {}).get('failed') else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate dashboard reports from an assessment or course file.")
+    parser.add_argument('kind', choices=['assessment', 'course'], help="type of the input file")
+    parser.add_argument('input', help="assessment CSV or LMS course export (CSV/Excel)")
+    parser.add_argument('--out', default='reports', help="output directory (default: reports)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument('--top-k', type=int, default=5, help="top-k courses in the course report (default: 5)")
+    parser.add_argument('--recommendations', type=int, default=5,
+                        help="course recommendations per student, 0 to skip (default: 5)")
+    parser.add_argument('--no-pdf', action='store_true', help="skip the per-student PDF reports")
+    parser.add_argument('--logo', default='logo.png', help="logo for PDF headers (default: logo.png)")
+    args = parser.parse_args(argv)
+    args.workers = max(1, args.workers)
+    return args
+
+
+if __name__ == '__main__':
+    sys.exit(run(parse_args()))
@@ -1,9 +1,11 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import altair as alt
 
+from utils.analytics import performance_categories
+from utils.session import get_session_dataset
+
 st.set_page_config(page_title="Overview", page_icon="📊", layout="wide")
 
 data_mode = st.session_state.get("data_mode", None)
@@ -19,29 +21,30 @@ if data_mode is None:
 if data_mode == "assessment":
     st.title("📊 Assessment Overview Dashboard")
     
-    if "assessment_df" not in st.session_state:
+    dataset = get_session_dataset("assessment")
+    if dataset is None:
         st.warning("Please upload assessment data on the Home page.")
         st.stop()
+    df, score_columns = dataset.df, dataset.columns
     
-    df = st.session_state["assessment_df"]
-    score_columns = st.session_state.get("score_columns", {})
     
     # Key Metrics Row
     st.subheader("📈 Key Performance Metrics")
     
-    total_max = df['Total_Max'].iloc[0] if 'Total_Max' in df.columns else 480
+    summary = dataset.summary()
+    total_max = summary['total_max']
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        st.metric("Total Students", len(df))
+        st.metric("Total Students", summary['total_students'])
     
     with col2:
-        avg_score = df['Score'].mean()
+        avg_score = summary['avg_score']
         st.metric("Average Score", f"{avg_score:.1f}/{total_max}", f"{(avg_score/total_max*100):.1f}%")
     
     with col3:
-        top_score = df['Score'].max()
+        top_score = summary['top_score']
         if 'Student_Name' in df.columns:
             top_student = df[df['Score'] == top_score]['Student_Name'].iloc[0]
             st.metric("Highest Score", f"{top_score}/{total_max}", f"by {top_student}")
@@ -49,14 +52,10 @@ if data_mode == "assessment":
             st.metric("Highest Score", f"{top_score}/{total_max}")
     
     with col4:
-        pass_students = len(df[df['Total_Percentage'] >= 50])
-        pass_rate = (pass_students / len(df)) * 100
-        st.metric("Pass Rate (≥50%)", f"{pass_rate:.1f}%", f"{pass_students} students")
+        st.metric("Pass Rate (≥50%)", f"{summary['pass_rate']:.1f}%", f"{summary['pass_count']} students")
     
     with col5:
-        excellent_students = len(df[df['Total_Percentage'] >= 80])
-        excellent_rate = (excellent_students / len(df)) * 100
-        st.metric("Excellence (≥80%)", f"{excellent_rate:.1f}%", f"{excellent_students} students")
+        st.metric("Excellence (≥80%)", f"{summary['excellent_rate']:.1f}%", f"{summary['excellent_count']} students")
     
     st.write("---")
     
@@ -66,13 +65,7 @@ if data_mode == "assessment":
     with col1:
         st.subheader("📊 Section-wise Performance")
         
-        section_data = {'Section': [], 'Average Score': [], 'Max Score': []}
-        
-        for col_name, max_val in score_columns.items():
-            display_name = col_name.split('(')[0].strip()
-            section_data['Section'].append(display_name)
-            section_data['Average Score'].append(df[col_name].mean())
-            section_data['Max Score'].append(max_val)
+        section_data = dataset.section_averages()
         
         fig = go.Figure()
         
@@ -98,10 +91,9 @@ if data_mode == "assessment":
     with col2:
         st.subheader("🎯 Section Summary")
         
-        for col_name, max_val in score_columns.items():
-            display_name = col_name.split('(')[0].strip()
-            avg_pct = (df[col_name].mean() / max_val) * 100
-            st.metric(f"{display_name}", f"{avg_pct:.1f}%", f"Avg: {df[col_name].mean():.1f}/{max_val}")
+        for section in dataset.section_averages().to_dict('records'):
+            st.metric(f"{section['Section']}", f"{section['Average %']:.1f}%",
+                      f"Avg: {section['Average Score']:.1f}/{section['Max Score']}")
     
     st.write("---")
     
@@ -119,14 +111,7 @@ if data_mode == "assessment":
     with col2:
         st.subheader("🎯 Performance Categories")
         
-        def categorize(pct):
-            if pct >= 80: return "Excellent (≥80%)"
-            elif pct >= 65: return "Good (65-79%)"
-            elif pct >= 50: return "Average (50-64%)"
-            else: return "Below Average (<50%)"
-        
-        df['Category'] = df['Total_Percentage'].apply(categorize)
-        category_counts = df['Category'].value_counts()
+        category_counts = performance_categories(df['Total_Percentage'])
         
         fig = px.pie(values=category_counts.values, names=category_counts.index,
                      title="Students by Performance Category")
@@ -147,18 +132,7 @@ if data_mode == "assessment":
     
     with col2:
         st.subheader("🎯 Section Toppers")
-        toppers_data = []
-        for col_name, max_val in score_columns.items():
-            display_name = col_name.split('(')[0].strip()
-            top_idx = df[col_name].idxmax()
-            top_row = df.loc[top_idx]
-            toppers_data.append({
-                'Section': display_name,
-                'Student': top_row.get('Student_Name', 'N/A'),
-                'Score': f"{top_row[col_name]}/{max_val}",
-                'Percentage': f"{(top_row[col_name]/max_val*100):.1f}%"
-            })
-        st.dataframe(pd.DataFrame(toppers_data), use_container_width=True)
+        st.dataframe(dataset.section_toppers(), use_container_width=True)
 
 # ============================================
 # COURSE OVERVIEW DASHBOARD
@@ -166,12 +140,12 @@ if data_mode == "assessment":
 elif data_mode == "course":
     st.title("📊 Course Progress Dashboard")
     
-    if "df" not in st.session_state:
+    dataset = get_session_dataset("course")
+    if dataset is None:
         st.warning("Please upload course data on the Home page.")
         st.stop()
+    df, course_columns = dataset.df, dataset.columns
     
-    df = st.session_state["df"]
-    course_columns = st.session_state.get("course_columns", [])
     
     # Key Metrics
     st.subheader("📈 Key Metrics")
@@ -203,8 +177,8 @@ elif data_mode == "course":
         
         with col1:
             st.write("**Course Started Status by Branch (≥10%)**")
-            df['Started_Status'] = df['Courses Started'].apply(lambda x: 'Started' if x > 0 else 'Not Started')
-            started_by_branch = df.groupby(['Branch Name', 'Started_Status']).size().reset_index(name='Count')
+            started_status = df['Courses Started'].apply(lambda x: 'Started' if x > 0 else 'Not Started').rename('Started_Status')
+            started_by_branch = df.groupby([df['Branch Name'], started_status], observed=True).size().reset_index(name='Count')
             
             chart = alt.Chart(started_by_branch).mark_bar().encode(
                 x=alt.X('Branch Name', sort=None),
@@ -217,8 +191,8 @@ elif data_mode == "course":
         with col2:
             st.write("**Course Completed Status by Branch (≥90%)**")
             if 'Courses Completed' in df.columns:
-                df['Completed_Status'] = df['Courses Completed'].apply(lambda x: 'Completed' if x > 0 else 'Not Completed')
-                completed_by_branch = df.groupby(['Branch Name', 'Completed_Status']).size().reset_index(name='Count')
+                completed_status = df['Courses Completed'].apply(lambda x: 'Completed' if x > 0 else 'Not Completed').rename('Completed_Status')
+                completed_by_branch = df.groupby([df['Branch Name'], completed_status], observed=True).size().reset_index(name='Count')
                 
                 chart = alt.Chart(completed_by_branch).mark_bar().encode(
                     x=alt.X('Branch Name', sort=None),
@@ -245,7 +219,7 @@ elif data_mode == "course":
     st.subheader("📚 Top 10 Enrolled Courses (≥10%)")
     
     if course_columns:
-        enrollment = (df[course_columns] >= 10).sum().sort_values(ascending=False).head(10)
+        enrollment = dataset.course_enrollment().sort_values(ascending=False).head(10)
         
         fig = px.bar(x=enrollment.index, y=enrollment.values,
                     labels={'x': 'Course', 'y': 'Students Enrolled'},
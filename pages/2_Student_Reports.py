@@ -4,6 +4,9 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
+from utils.analytics import student_name as get_student_name, started_courses
+from utils.session import get_session_dataset
+
 st.set_page_config(page_title="Student Reports", page_icon="🧑‍🎓", layout="wide")
 
 data_mode = st.session_state.get("data_mode", None)
@@ -18,12 +21,12 @@ if data_mode is None:
 if data_mode == "assessment":
     st.title("🧑‍🎓 Individual Student Reports")
     
-    if "assessment_df" not in st.session_state:
+    dataset = get_session_dataset("assessment")
+    if dataset is None:
         st.warning("Please upload assessment data on the Home page.")
         st.stop()
+    df, score_columns = dataset.df, dataset.columns
     
-    df = st.session_state["assessment_df"]
-    score_columns = st.session_state.get("score_columns", {})
     
     # Student Selection
     st.subheader("🔍 Select Student")
@@ -105,12 +108,12 @@ if data_mode == "assessment":
             st.metric("Rank", f"{rank}/{len(df)}", f"Top {(rank/len(df)*100):.1f}%")
         
         with col3:
-            avg_score = df['Score'].mean()
+            avg_score = dataset.class_stats().mean('Score')
             diff = student_data['Score'] - avg_score
             st.metric("vs Class Average", f"{diff:+.1f}", f"Avg: {avg_score:.1f}")
         
         with col4:
-            percentile = (df['Score'] < student_data['Score']).sum() / len(df) * 100
+            percentile = dataset.score_index().percentile(student_data['Score'])
             st.metric("Percentile", f"{percentile:.1f}th")
         
         st.write("---")
@@ -129,7 +132,7 @@ if data_mode == "assessment":
                 display_name = col_name.split('(')[0].strip()
                 sections.append(display_name)
                 student_scores.append((student_data[col_name] / max_val) * 100)
-                class_averages.append((df[col_name].mean() / max_val) * 100)
+                class_averages.append(dataset.class_stats().mean_pct(col_name))
             
             fig = go.Figure()
             
@@ -169,7 +172,8 @@ if data_mode == "assessment":
                 section_data.append({
                     'Section': display_name,
                     'Score': f"{int(score)}/{max_val}",
-                    'Percentage': f"{pct:.1f}%"
+                    'Percentage': f"{pct:.1f}%",
+                    'Percentile': f"{dataset.score_index(col_name).percentile(score):.0f}th"
                 })
             
             st.dataframe(pd.DataFrame(section_data), use_container_width=True)
@@ -185,7 +189,7 @@ if data_mode == "assessment":
             for col_name, max_val in score_columns.items():
                 display_name = col_name.split('(')[0].strip()
                 student_pct = (student_data[col_name] / max_val) * 100
-                class_avg = (df[col_name].mean() / max_val) * 100
+                class_avg = dataset.class_stats().mean_pct(col_name)
                 if student_pct > class_avg:
                     st.success(f"**{display_name}**: {student_pct:.1f}% (Class avg: {class_avg:.1f}%)")
                     has_strength = True
@@ -198,7 +202,7 @@ if data_mode == "assessment":
             for col_name, max_val in score_columns.items():
                 display_name = col_name.split('(')[0].strip()
                 student_pct = (student_data[col_name] / max_val) * 100
-                class_avg = (df[col_name].mean() / max_val) * 100
+                class_avg = dataset.class_stats().mean_pct(col_name)
                 if student_pct < class_avg:
                     gap = class_avg - student_pct
                     st.warning(f"**{display_name}**: {gap:.1f}% below class average")
@@ -219,7 +223,15 @@ if data_mode == "assessment":
             st.info(f"**Batch:** {student_data.get('Batch', 'N/A')}\n\n**Branch:** {student_data.get('Branch', 'N/A')}")
         
         with col3:
-            st.info(f"**Overall:** {total_pct:.1f}%\n\n**Rank:** {rank}/{len(df)}")
+            cohort_lines = []
+            # Percentile within the student's own batch / branch
+            if 'Batch' in df.columns and pd.notna(student_data.get('Batch')):
+                batch_index = dataset.score_index(batch=str(student_data['Batch']))
+                cohort_lines.append(f"**Batch Percentile:** {batch_index.percentile(student_data['Score']):.1f}th")
+            if 'Branch' in df.columns and pd.notna(student_data.get('Branch')):
+                branch_index = dataset.score_index(branch=student_data['Branch'])
+                cohort_lines.append(f"**Branch Percentile:** {branch_index.percentile(student_data['Score']):.1f}th")
+            st.info("\n\n".join([f"**Overall:** {total_pct:.1f}%", f"**Rank:** {rank}/{len(df)}"] + cohort_lines))
 
 # ============================================
 # COURSE STUDENT ANALYTICS
@@ -227,12 +239,12 @@ if data_mode == "assessment":
 elif data_mode == "course":
     st.title("🧑‍🎓 Student-Level Analytics")
     
-    if "df" not in st.session_state:
+    dataset = get_session_dataset("course")
+    if dataset is None:
         st.warning("Please upload course data on the Home page.")
         st.stop()
+    df, course_columns = dataset.df, dataset.columns
     
-    df = st.session_state["df"]
-    course_columns = st.session_state.get("course_columns", [])
     
     tab1, tab2 = st.tabs(["**Student Portfolio**", "**Top Performers Leaderboard**"])
     
@@ -253,18 +265,7 @@ elif data_mode == "course":
         if selected_reg_num:
             student_data = df[df['Registration Number'] == selected_reg_num].iloc[0]
             
-            # Get student name - handle different column formats
-            if 'First Name' in df.columns and 'Last Name' in df.columns:
-                student_name = f"{student_data.get('First Name', '')} {student_data.get('Last Name', '')}"
-            elif 'Full Name' in df.columns:
-                student_name = student_data.get('Full Name', 'N/A')
-            else:
-                # Find any name-like column
-                student_name = 'N/A'
-                for col in df.columns:
-                    if 'name' in col.lower() and col.lower() not in ['branch name']:
-                        student_name = student_data.get(col, 'N/A')
-                        break
+            student_name = get_student_name(student_data, df.columns)
             
             col1, col2, col3 = st.columns(3)
             col1.metric("Student Name", student_name)
@@ -278,41 +279,30 @@ elif data_mode == "course":
             col3.metric("Overall Completion %", f"{student_data.get('Overall Completion %', 0):.2f}%")
             
             completion_pct = student_data.get('Overall Completion %', 0)
-            st.progress(min(completion_pct / 100, 1.0))
+            st.progress(min(float(completion_pct) / 100, 1.0))
             
             st.subheader("Course Progress Details")
             
             if course_columns:
-                student_courses = student_data[course_columns]
-                courses_started = student_courses[student_courses >= 10]  # >=10% considered as started
+                courses_df = started_courses(student_data, course_columns)  # >=10% considered as started
                 
-                if courses_started.empty:
+                if courses_df.empty:
                     st.info("This student has not started any courses yet (≥10%).")
                 else:
-                    courses_df = courses_started.reset_index()
-                    courses_df.columns = ["Course Name", "Completion %"]
-                    courses_df['Status'] = courses_df['Completion %'].apply(lambda x: 'Completed' if x >= 90 else 'In Progress')
-                    courses_df = courses_df.sort_values(by="Completion %", ascending=False)
                     st.dataframe(courses_df, use_container_width=True)
             
             st.subheader("Recommended Courses")
             
             if 'Branch Name' in df.columns and course_columns:
-                branch_df = df[df['Branch Name'] == student_data['Branch Name']]
-                branch_course_counts = (branch_df[course_columns] >= 10).sum().sort_values(ascending=False)  # >=10% as started
-                top_10_branch_courses = branch_course_counts.head(10).index
-                
-                student_courses = student_data[course_columns]
-                courses_not_started = student_courses[student_courses < 10].index  # <10% as not started
-                
-                recommendations = list(set(top_10_branch_courses) & set(courses_not_started))
+                # Top 10 branch courses (>=10%) the student has not started
+                recommendations = dataset.recommendations(selected_reg_num)
                 
-                if not recommendations:
+                if recommendations.empty:
                     st.info("This student is already taking most of the popular courses for their branch!")
                 else:
                     st.write("Based on popular courses in their branch, here are some recommendations:")
-                    for course in recommendations[:5]:
-                        st.markdown(f"- **{course}** (*Taken by {branch_course_counts[course]} students in {student_data['Branch Name']}*)")
+                    for course, count in recommendations.head(5).itertuples(index=False):
+                        st.markdown(f"- **{course}** (*Taken by {count} students in {student_data['Branch Name']}*)")
     
     with tab2:
         st.header("Top Performers Leaderboard")
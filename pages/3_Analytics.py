@@ -5,6 +5,11 @@ import plotly.graph_objects as go
 import altair as alt
 import numpy as np
 
+from utils.analytics import performance_categories
+from utils.coenrollment import MEASURES
+from utils.course_block import BUCKET_LABELS
+from utils.session import get_session_dataset
+
 st.set_page_config(page_title="Analytics", page_icon="📈", layout="wide")
 
 data_mode = st.session_state.get("data_mode", None)
@@ -19,12 +24,12 @@ if data_mode is None:
 if data_mode == "assessment":
     st.title("📈 Section-wise Performance Analysis")
     
-    if "assessment_df" not in st.session_state:
+    dataset = get_session_dataset("assessment")
+    if dataset is None:
         st.warning("Please upload assessment data on the Home page.")
         st.stop()
+    df, score_columns = dataset.df, dataset.columns
     
-    df = st.session_state["assessment_df"]
-    score_columns = st.session_state.get("score_columns", {})
     
     if not score_columns:
         st.error("No score columns detected in the data.")
@@ -93,15 +98,7 @@ if data_mode == "assessment":
     with col2:
         st.subheader("📈 Performance Categories")
         
-        def categorize(score):
-            pct = (score / max_score) * 100
-            if pct >= 80: return "Excellent (≥80%)"
-            elif pct >= 65: return "Good (65-79%)"
-            elif pct >= 50: return "Average (50-64%)"
-            else: return "Below Average (<50%)"
-        
-        df['_Category'] = df[selected_col].apply(categorize)
-        category_counts = df['_Category'].value_counts()
+        category_counts = performance_categories(df[selected_col] / max_score * 100)
         
         fig = px.pie(values=category_counts.values, names=category_counts.index,
                      title=f"{section_name} Categories")
@@ -152,36 +149,18 @@ if data_mode == "assessment":
 elif data_mode == "course":
     st.title("📊 Course-Level Analytics")
     
-    if "df" not in st.session_state:
+    dataset = get_session_dataset("course")
+    if dataset is None:
         st.warning("Please upload course data on the Home page.")
         st.stop()
-    
-    df = st.session_state["df"]
-    course_columns = st.session_state.get("course_columns", [])
+    df, course_columns = dataset.df, dataset.columns
     
     if not course_columns:
         st.error("No course columns detected in the data.")
         st.stop()
     
-    # Calculate course stats with new thresholds: >=10% started, >=90% completed
-    @st.cache_data
-    def calculate_course_stats(_df, _course_columns):
-        stats = []
-        for course in _course_columns:
-            course_data = pd.to_numeric(_df[course], errors='coerce').fillna(0)
-            enrolled = (course_data >= 10).sum()  # >=10% considered as started/enrolled
-            completed = (course_data >= 90).sum()  # >=90% considered as completed
-            
-            stats.append({
-                'Course Name': course,
-                'Total Enrollment': enrolled,
-                'Total Completed': completed,
-                'Completion Rate (%)': (completed / enrolled * 100) if enrolled > 0 else 0,
-                'Average Completion %': course_data[course_data >= 10].mean() if enrolled > 0 else 0
-            })
-        return pd.DataFrame(stats)
-    
-    all_course_stats = calculate_course_stats(df, course_columns)
+    # Course stats with thresholds: >=10% started, >=90% completed
+    all_course_stats = dataset.course_stats()
     
     # Tabs
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -220,10 +199,25 @@ elif data_mode == "course":
             col2.metric("Completion Rate (≥90%)", f"{course_data['Completion Rate (%)']:.2f}%")
             col3.metric("Avg Completion (enrolled)", f"{course_data['Average Completion %']:.2f}%")
             
+            st.subheader("Progress Distribution")
+            bucket_counts = pd.DataFrame({
+                'Progress': BUCKET_LABELS,
+                'Student Count': [int(course_data[label]) for label in BUCKET_LABELS]
+            })
+            
+            chart = alt.Chart(bucket_counts).mark_bar().encode(
+                x=alt.X('Progress', sort=None),
+                y='Student Count',
+                tooltip=['Progress', 'Student Count']
+            ).interactive()
+            st.altair_chart(chart, use_container_width=True)
+            
             if 'Branch Name' in df.columns and course_data['Total Enrollment'] > 0:
                 st.subheader("Enrollment by Branch (≥10%)")
                 enrolled_df = df[df[selected_course] >= 10]  # >=10% as enrolled
-                branch_counts = enrolled_df['Branch Name'].value_counts().reset_index()
+                branch_counts = enrolled_df['Branch Name'].value_counts()
+                # Categorical branches keep zero-count entries; drop them from the chart
+                branch_counts = branch_counts[branch_counts > 0].reset_index()
                 branch_counts.columns = ['Branch Name', 'Student Count']
                 
                 chart = alt.Chart(branch_counts).mark_bar().encode(
@@ -258,29 +252,38 @@ elif data_mode == "course":
         st.write("Shows which courses are most frequently taken together (≥10% enrollment).")
         st.info("Only courses with > 10 students are included.")
         
-        # Calculate co-enrollment (>=10% as enrolled)
-        enrolled_df = (df[course_columns] >= 10).astype(int)
-        popular_courses = enrolled_df.sum()[enrolled_df.sum() > 10].index.tolist()
+        # Co-enrollment (>=10% as enrolled) between courses with >10 students
+        co_enrollment = dataset.co_enrollment(min_students=10)
         
-        if len(popular_courses) > 1:
-            enrolled_popular = enrolled_df[popular_courses]
-            co_occurrence = enrolled_popular.T.dot(enrolled_popular)
+        if len(co_enrollment.courses) > 1:
+            col1, col2 = st.columns(2)
+            measure = col1.selectbox("Measure:", options=MEASURES,
+                                     help="Jaccard: shared / combined students. Lift: how much more often than chance.")
+            if len(co_enrollment.courses) > 2:
+                n_courses = col2.slider("Courses in heatmap:", 2, min(40, len(co_enrollment.courses)),
+                                        min(15, len(co_enrollment.courses)))
+            else:
+                # A slider needs min < max
+                n_courses = len(co_enrollment.courses)
             
-            co_df = co_occurrence.stack().reset_index()
-            co_df.columns = ['Course 1', 'Course 2', 'Student Count']
-            co_df = co_df[co_df['Course 1'] != co_df['Course 2']]
+            # Clustered submatrix of the most co-enrolled courses, not every pair
+            course_order, co_df = co_enrollment.heatmap_frame(n_courses, measure)
             
             heatmap = alt.Chart(co_df).mark_rect().encode(
-                x=alt.X('Course 1', sort=popular_courses[:15]),
-                y=alt.Y('Course 2', sort=popular_courses[:15]),
-                color=alt.Color('Student Count', scale=alt.Scale(scheme='viridis')),
-                tooltip=['Course 1', 'Course 2', 'Student Count']
+                x=alt.X('Course 1', sort=course_order),
+                y=alt.Y('Course 2', sort=course_order),
+                color=alt.Color(measure, scale=alt.Scale(scheme='viridis')),
+                tooltip=['Course 1', 'Course 2', alt.Tooltip(measure, format='.3~f')]
             ).properties(
-                title="Course Co-Enrollment",
+                title=f"Course Co-Enrollment ({measure})",
                 width=600,
                 height=600
             ).interactive()
             
             st.altair_chart(heatmap, use_container_width=True)
+            
+            st.subheader("🔗 Top Course Pairs")
+            top_pairs = co_enrollment.top_pairs(20, measure)
+            st.dataframe(top_pairs.style.format({'Jaccard': '{:.3f}', 'Lift': '{:.2f}'}), use_container_width=True)
         else:
             st.warning("Not enough courses with >10 enrollments for co-enrollment analysis.")
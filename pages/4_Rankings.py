@@ -1,10 +1,13 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import altair as alt
 import numpy as np
 
+from utils.analytics import branch_year_stats, branch_stats, filter_students
+from utils.fingerprint import filter_fingerprint
+from utils.session import get_session_dataset
+
 st.set_page_config(page_title="Rankings", page_icon="🏆", layout="wide")
 
 data_mode = st.session_state.get("data_mode", None)
@@ -19,12 +22,12 @@ if data_mode is None:
 if data_mode == "assessment":
     st.title("🏆 Rankings & Leaderboard")
     
-    if "assessment_df" not in st.session_state:
+    dataset = get_session_dataset("assessment")
+    if dataset is None:
         st.warning("Please upload assessment data on the Home page.")
         st.stop()
+    df, score_columns = dataset.df, dataset.columns
     
-    df = st.session_state["assessment_df"]
-    score_columns = st.session_state.get("score_columns", {})
     
     # Filters
     st.subheader("🔍 Filters")
@@ -48,11 +51,7 @@ if data_mode == "assessment":
             branch_filter = "All"
     
     # Apply filters
-    filtered_df = df.copy()
-    if batch_filter != "All" and 'Batch' in df.columns:
-        filtered_df = filtered_df[filtered_df['Batch'].astype(str) == batch_filter]
-    if branch_filter != "All" and 'Branch' in df.columns:
-        filtered_df = filtered_df[filtered_df['Branch'] == branch_filter]
+    filtered_df = filter_students(df, batch_filter, branch_filter).copy()
     
     filtered_df['Filtered_Rank'] = filtered_df['Score'].rank(method='dense', ascending=False).fillna(0).astype(int)
     
@@ -131,41 +130,21 @@ if data_mode == "assessment":
 elif data_mode == "course":
     st.title("🏛️ Branch & Cohort Analytics")
     
-    if "df" not in st.session_state:
+    dataset = get_session_dataset("course")
+    if dataset is None:
         st.warning("Please upload course data on the Home page.")
         st.stop()
+    df, course_columns = dataset.df, dataset.columns
     
-    df = st.session_state["df"]
-    course_columns = st.session_state.get("course_columns", [])
+    fingerprint = st.session_state.get("dataset_fingerprint")
     
     if 'Branch Name' not in df.columns:
         st.error("Branch Name column not found in data.")
         st.stop()
     
     @st.cache_data
-    def get_branch_year_stats(_df):
-        stats = _df.groupby(['Branch Name', 'Year of Passing']).agg(
-            Avg_Overall_Completion=('Overall Completion %', 'mean'),
-            Avg_Courses_Started=('Courses Started', 'mean'),
-            Avg_Courses_Completed=('Courses Completed', 'mean')
-        ).reset_index()
-        return stats
-    
-    @st.cache_data
-    def get_top_courses_by_branch(_df, _course_columns):
-        branches = _df['Branch Name'].unique()
-        all_top_courses = []
-        
-        for branch in branches:
-            branch_df = _df[_df['Branch Name'] == branch]
-            branch_enrollment = (branch_df[_course_columns] >= 10).sum().sort_values(ascending=False)  # >=10% as enrolled
-            
-            top_10 = branch_enrollment.head(10).reset_index()
-            top_10.columns = ['Course Name', 'Student Count']
-            top_10['Branch Name'] = branch
-            all_top_courses.append(top_10)
-        
-        return pd.concat(all_top_courses)
+    def get_branch_year_stats(_df, fingerprint, filter_key):
+        return branch_year_stats(_df)
     
     tab1, tab2, tab3 = st.tabs(["**Branch Comparison**", "**Top Courses by Branch**", "**Progress Distribution**"])
     
@@ -187,12 +166,11 @@ elif data_mode == "course":
             st.info("Please select at least one Branch.")
             st.stop()
         
-        filtered_df = df[df['Branch Name'].isin(selected_branches)]
-        if selected_years and 'Year of Passing' in df.columns:
-            filtered_df = filtered_df[filtered_df['Year of Passing'].isin(selected_years)]
+        filtered_df = dataset.filter_cohort(selected_branches, selected_years)
         
         if 'Year of Passing' in filtered_df.columns and len(selected_years) > 0:
-            branch_year_stats = get_branch_year_stats(filtered_df)
+            filter_key = filter_fingerprint(branches=selected_branches, years=selected_years)
+            branch_year_stats = get_branch_year_stats(filtered_df, fingerprint, filter_key)
             
             st.subheader("Average Overall Completion %")
             
@@ -206,12 +184,7 @@ elif data_mode == "course":
             
             st.altair_chart(chart, use_container_width=True)
         else:
-            branch_stats = filtered_df.groupby('Branch Name').agg({
-                'Overall Completion %': 'mean',
-                'Courses Started': 'mean'
-            }).reset_index()
-            
-            fig = px.bar(branch_stats, x='Branch Name', y='Overall Completion %',
+            fig = px.bar(branch_stats(filtered_df), x='Branch Name', y='Overall Completion %',
                         title="Average Completion by Branch")
             st.plotly_chart(fig, use_container_width=True)
     
@@ -219,7 +192,7 @@ elif data_mode == "course":
         st.header("Top 10 Popular Courses by Branch")
         
         if course_columns:
-            top_courses_df = get_top_courses_by_branch(df, course_columns)
+            top_courses_df = dataset.top_courses_by_branch()  # >=10% as enrolled
             top_courses_filtered = top_courses_df[top_courses_df['Branch Name'].isin(selected_branches)]
             
             for branch in selected_branches[:3]:
@@ -241,9 +214,7 @@ elif data_mode == "course":
             st.info("Please select filters on the 'Branch Comparison' tab.")
             st.stop()
         
-        filtered_df = df[df['Branch Name'].isin(selected_branches)]
-        if selected_years and 'Year of Passing' in df.columns:
-            filtered_df = filtered_df[filtered_df['Year of Passing'].isin(selected_years)]
+        filtered_df = dataset.filter_cohort(selected_branches, selected_years)
         
         st.write(f"Showing distribution for {len(filtered_df)} selected students.")
         
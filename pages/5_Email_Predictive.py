@@ -1,10 +1,23 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import io
+import os
+import uuid
 from datetime import datetime
 
+from utils.analytics import filter_students, student_name as get_student_name
+from utils.bulk_send import BulkSendJob, bulk_job_id
+from utils.dispatcher import (DEFAULT_MAX_RETRIES, DEFAULT_PER_HOUR, DEFAULT_PER_MINUTE,
+                              EmailDispatcher, RateLimiter)
+from utils.pdf_archive import archive_dir, write_report_archive
+from utils.pdf_pool import PdfRenderPool, default_workers
+from utils.pdf_report import report_filename
+from utils.session import get_job_registry, get_session_dataset, get_session_handle
+from utils.smtp_pool import DEFAULT_HOST, DEFAULT_MAX_MESSAGES, DEFAULT_PORT, SmtpPool, build_message
+from utils.throughput import format_duration
+
 st.set_page_config(page_title="Email / Predictive", page_icon="📧", layout="wide")
 
 data_mode = st.session_state.get("data_mode", None)
@@ -13,339 +26,18 @@ if data_mode is None:
     st.warning("⚠️ Please upload a data file on the Home page to begin.")
     st.stop()
 
-# ============================================
-# PDF REPORT GENERATION
-# ============================================
-def generate_student_pdf_report(student_data, df, score_columns, logo_path="logo.png"):
-    """Generate a professional PDF report for a student."""
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch, cm
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-    import os
-    
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
-    
-    styles = getSampleStyleSheet()
-    story = []
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle', parent=styles['Heading1'], fontSize=24, 
-        textColor=colors.HexColor('#1a5276'), alignment=TA_CENTER, spaceAfter=20
-    )
-    header_style = ParagraphStyle(
-        'CustomHeader', parent=styles['Heading2'], fontSize=14,
-        textColor=colors.HexColor('#2874a6'), spaceBefore=15, spaceAfter=10
-    )
-    normal_style = ParagraphStyle(
-        'CustomNormal', parent=styles['Normal'], fontSize=11, spaceAfter=6
-    )
-    
-    # Header with Logo
-    try:
-        if logo_path and os.path.exists(logo_path):
-            logo = Image(logo_path, width=1.2*inch, height=0.6*inch)
-            logo.hAlign = 'RIGHT'
-            
-            # Create header table with title on left and logo on right
-            header_title = Paragraph("Student Assessment Report", title_style)
-            header_table = Table(
-                [[header_title, logo]],
-                colWidths=[5.5*inch, 1.5*inch]
-            )
-            header_table.setStyle(TableStyle([
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-                ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-            ]))
-            story.append(header_table)
-        else:
-            story.append(Paragraph("Student Assessment Report", title_style))
-    except Exception:
-        story.append(Paragraph("Student Assessment Report", title_style))
-    
-    story.append(Spacer(1, 10))
-    
-    # Student Info Box
-    student_name = student_data.get('Student_Name', 'N/A')
-    total_max = student_data.get('Total_Max', 480)
-    total_pct = student_data['Total_Percentage']
-    rank = int(student_data['Rank'])
-    
-    # Performance status
-    if total_pct >= 80:
-        status = "EXCELLENT"
-        status_color = colors.HexColor('#27ae60')
-    elif total_pct >= 65:
-        status = "GOOD"
-        status_color = colors.HexColor('#3498db')
-    elif total_pct >= 50:
-        status = "AVERAGE"
-        status_color = colors.HexColor('#f39c12')
-    else:
-        status = "NEEDS IMPROVEMENT"
-        status_color = colors.HexColor('#e74c3c')
-    
-    # Student details table
-    story.append(Paragraph("Student Information", header_style))
-    
-    info_data = [
-        ['Name:', student_name, 'Registration:', student_data.get('College_Reg', 'N/A')],
-        ['Email:', student_data.get('Email', 'N/A'), 'Batch:', str(student_data.get('Batch', 'N/A'))],
-        ['Branch:', student_data.get('Branch', 'N/A'), 'Report Date:', datetime.now().strftime('%d %b %Y')]
-    ]
-    
-    info_table = Table(info_data, colWidths=[1.2*inch, 2.3*inch, 1.2*inch, 2.3*inch])
-    info_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#2c3e50')),
-        ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#2c3e50')),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-    ]))
-    story.append(info_table)
-    story.append(Spacer(1, 15))
-
-    # Performance Summary Box
-    story.append(Paragraph("Performance Summary", header_style))
-    
-    perf_data = [
-        ['Overall Score', 'Percentage', 'Rank', 'Status'],
-        [f"{int(student_data['Score'])}/{total_max}", f"{total_pct:.1f}%", 
-         f"{rank} of {len(df)}", status]
-    ]
-    
-    perf_table = Table(perf_data, colWidths=[1.5*inch, 1.5*inch, 1.4*inch, 2.4*inch])
-    perf_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('FONTSIZE', (0, 1), (-1, 1), 14),
-        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2874a6')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('BACKGROUND', (3, 1), (3, 1), status_color),
-        ('TEXTCOLOR', (3, 1), (3, 1), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#bdc3c7')),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('TOPPADDING', (0, 0), (-1, -1), 12),
-    ]))
-    story.append(perf_table)
-    story.append(Spacer(1, 20))
-    
-    # Section-wise Performance
-    story.append(Paragraph("Section-wise Performance", header_style))
-    
-    # Generate comparison chart
-    sections = []
-    student_pcts = []
-    class_avgs = []
-    
-    for col_name, max_val in score_columns.items():
-        section_name = col_name.split('(')[0].strip()
-        sections.append(section_name)
-        student_pcts.append((student_data[col_name] / max_val) * 100)
-        class_avgs.append((df[col_name].mean() / max_val) * 100)
-    
-    # Create the bar chart using matplotlib (more reliable for PDF export)
-    try:
-        import matplotlib
-        matplotlib.use('Agg')  # Use non-interactive backend
-        import matplotlib.pyplot as plt
-        import numpy as np
-        
-        fig_chart, ax = plt.subplots(figsize=(7, 4))
-        
-        x = np.arange(len(sections))
-        width = 0.35
-        
-        bars1 = ax.bar(x - width/2, student_pcts, width, label=student_name, color='#3498db')
-        bars2 = ax.bar(x + width/2, class_avgs, width, label='Class Average', color='#95a5a6')
-        
-        # Add value labels on bars
-        for bar, pct in zip(bars1, student_pcts):
-            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 2, 
-                   f'{pct:.1f}%', ha='center', va='bottom', fontsize=9, color='#2c3e50')
-        for bar, pct in zip(bars2, class_avgs):
-            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 2,
-                   f'{pct:.1f}%', ha='center', va='bottom', fontsize=9, color='#7f8c8d')
-        
-        ax.set_ylabel('Percentage (%)')
-        ax.set_title('Your Performance vs Class Average', fontsize=14, color='#2c3e50', pad=20)
-        ax.set_xticks(x)
-        ax.set_xticklabels(sections)
-        ax.set_ylim(0, 110)
-        ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.1), ncol=2)
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        
-        # Save to bytes
-        chart_buffer = io.BytesIO()
-        fig_chart.savefig(chart_buffer, format='png', dpi=150, bbox_inches='tight', 
-                         facecolor='white', edgecolor='none')
-        chart_buffer.seek(0)
-        plt.close(fig_chart)
-        
-        chart_img = Image(chart_buffer, width=5.5*inch, height=3.2*inch)
-        story.append(chart_img)
-    except Exception as e:
-        # If chart generation fails, add a note
-        story.append(Paragraph(f"<i>(Chart could not be generated: {str(e)[:50]})</i>", normal_style))
-    
-    story.append(Spacer(1, 15))
-    
-    # Section details table
-    section_headers = ['Section', 'Score', 'Your %', 'Class Avg', 'Difference']
-    section_rows = [section_headers]
-    
-    for col_name, max_val in score_columns.items():
-        section_name = col_name.split('(')[0].strip()
-        score = student_data[col_name]
-        pct = (score / max_val) * 100
-        class_avg = (df[col_name].mean() / max_val) * 100
-        diff = pct - class_avg
-        diff_str = f"+{diff:.1f}%" if diff >= 0 else f"{diff:.1f}%"
-        
-        section_rows.append([
-            section_name,
-            f"{int(score)}/{max_val}",
-            f"{pct:.1f}%",
-            f"{class_avg:.1f}%",
-            diff_str
-        ])
-    
-    section_table = Table(section_rows, colWidths=[1.5*inch, 1.2*inch, 1.1*inch, 1.1*inch, 1.1*inch])
-    
-    table_style = [
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#bdc3c7')),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 10),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
-    ]
-
-    # Color code the Difference column
-    for i, row in enumerate(section_rows[1:], start=1):
-        diff_val = float(row[4].replace('%', '').replace('+', ''))
-        if diff_val >= 5:
-            table_style.append(('BACKGROUND', (4, i), (4, i), colors.HexColor('#d4edda')))
-            table_style.append(('TEXTCOLOR', (4, i), (4, i), colors.HexColor('#155724')))
-        elif diff_val <= -5:
-            table_style.append(('BACKGROUND', (4, i), (4, i), colors.HexColor('#f8d7da')))
-            table_style.append(('TEXTCOLOR', (4, i), (4, i), colors.HexColor('#721c24')))
-    
-    section_table.setStyle(TableStyle(table_style))
-    story.append(section_table)
-    story.append(Spacer(1, 20))
-    
-    # Strengths and Areas for Improvement
-    story.append(Paragraph("Analysis & Recommendations", header_style))
-    
-    strengths = []
-    improvements = []
-    
-    for col_name, max_val in score_columns.items():
-        section_name = col_name.split('(')[0].strip()
-        student_pct = (student_data[col_name] / max_val) * 100
-        class_avg = (df[col_name].mean() / max_val) * 100
-        
-        if student_pct > class_avg:
-            strengths.append(f"• {section_name}: {student_pct:.1f}% (above class average of {class_avg:.1f}%)")
-        else:
-            gap = class_avg - student_pct
-            improvements.append(f"• {section_name}: {gap:.1f}% below class average - focus on practice")
-    
-    if strengths:
-        story.append(Paragraph("<b>Strengths:</b>", normal_style))
-        for s in strengths:
-            story.append(Paragraph(f'<font color="#27ae60">{s}</font>', normal_style))
-    
-    if improvements:
-        story.append(Spacer(1, 10))
-        story.append(Paragraph("<b>Areas for Improvement:</b>", normal_style))
-        for imp in improvements:
-            story.append(Paragraph(f'<font color="#e74c3c">{imp}</font>', normal_style))
-    
-    if not improvements:
-        story.append(Paragraph('<font color="#27ae60">Excellent! Above class average in all sections.</font>', normal_style))
-    
-    story.append(Spacer(1, 20))
-    
-    # Percentile Information
-    percentile = (df['Score'] < student_data['Score']).sum() / len(df) * 100
-    
-    story.append(Paragraph("Statistical Position", header_style))
-    
-    stats_data = [
-        ['Percentile Rank', 'Top %', 'Students Scored Lower', 'Students Scored Higher'],
-        [f"{percentile:.1f}th", f"Top {100-percentile:.1f}%", 
-         str(int((df['Score'] < student_data['Score']).sum())),
-         str(int((df['Score'] > student_data['Score']).sum()))]
-    ]
-    
-    stats_table = Table(stats_data, colWidths=[1.7*inch, 1.7*inch, 1.7*inch, 1.7*inch])
-    stats_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8e44ad')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#bdc3c7')),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 10),
-    ]))
-    story.append(stats_table)
-
-    story.append(Spacer(1, 30))
-    
-    # Footer
-    footer_style = ParagraphStyle(
-        'Footer', parent=styles['Normal'], fontSize=9, 
-        textColor=colors.HexColor('#7f8c8d'), alignment=TA_CENTER
-    )
-    story.append(Paragraph("─" * 80, footer_style))
-    story.append(Paragraph(f"Report generated on {datetime.now().strftime('%d %B %Y at %H:%M')}", footer_style))
-    story.append(Paragraph("This is an automated report. For queries, contact the assessment team.", footer_style))
-    
-    # Build PDF
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
-
-
 # ============================================
 # ASSESSMENT - EMAIL REPORTS
 # ============================================
 if data_mode == "assessment":
     st.title("📧 Email Student Reports")
     
-    if "assessment_df" not in st.session_state:
+    dataset = get_session_dataset("assessment")
+    if dataset is None:
         st.warning("Please upload assessment data on the Home page.")
         st.stop()
+    df, score_columns = dataset.df, dataset.columns
     
-    df = st.session_state["assessment_df"]
-    score_columns = st.session_state.get("score_columns", {})
-    
-    import smtplib
-    from email.mime.text import MIMEText
-    from email.mime.multipart import MIMEMultipart
-    from email.mime.application import MIMEApplication
     
     # Email Configuration
     st.subheader("⚙️ Email Configuration")
@@ -370,6 +62,15 @@ if data_mode == "assessment":
             sender_name = st.text_input("Sender Name", value="Assessment Team")
             attach_pdf = st.checkbox("📎 Attach PDF Report", value=True, 
                                     help="Attach a detailed PDF report to each email")
+        
+        col3, col4, col5, col6 = st.columns(4)
+        smtp_host = col3.text_input("SMTP Host", value=DEFAULT_HOST)
+        smtp_port = col4.number_input("SMTP Port", min_value=1, max_value=65535, value=DEFAULT_PORT)
+        max_messages = col5.number_input("Emails per Connection", min_value=1, max_value=10000,
+                                         value=DEFAULT_MAX_MESSAGES,
+                                         help="Connections are reused for bulk sends, then reopened after this many emails")
+        use_starttls = col6.checkbox("Use STARTTLS", value=True,
+                                     help="Turn off for a local test server without TLS")
     
     st.write("---")
 
@@ -410,14 +111,14 @@ This is an automated email with your personalized report attached.
     # Helper Functions
     def generate_email_body(student_data, df, template, sender_name, score_columns):
         total_max = student_data.get('Total_Max', 480)
-        percentile = (df['Score'] < student_data['Score']).sum() / len(df) * 100
+        percentile = dataset.score_index().percentile(student_data['Score'])
         
         section_lines = []
         for col_name, max_val in score_columns.items():
             name = col_name.split('(')[0].strip()
             score = student_data[col_name]
             pct = (score / max_val) * 100
-            class_avg = (df[col_name].mean() / max_val) * 100
+            class_avg = dataset.class_stats().mean_pct(col_name)
             diff = pct - class_avg
             indicator = "↑" if diff >= 0 else "↓"
             section_lines.append(f"• {name}: {int(score)}/{max_val} ({pct:.1f}%) {indicator} {abs(diff):.1f}% vs class avg")
@@ -446,26 +147,20 @@ This is an automated email with your personalized report attached.
             sender_name=sender_name
         )
     
+    def open_smtp_pool(connections=1):
+        return SmtpPool(smtp_host, smtp_port, sender_email, sender_password, starttls=use_starttls,
+                        connections=connections, max_messages=max_messages)
+    
     def send_email_with_attachment(to_email, subject, body, pdf_data, pdf_filename, 
-                                   sender_email, sender_password, sender_name):
+                                   sender_email, sender_password, sender_name, pool=None):
+        # Single sends open (and quit) their own connection; bulk sends pass a shared pool
         try:
-            msg = MIMEMultipart()
-            msg['From'] = f"{sender_name} <{sender_email}>"
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Attach PDF if provided
-            if pdf_data:
-                pdf_attachment = MIMEApplication(pdf_data, _subtype='pdf')
-                pdf_attachment.add_header('Content-Disposition', 'attachment', filename=pdf_filename)
-                msg.attach(pdf_attachment)
-            
-            server = smtplib.SMTP('smtp.gmail.com', 587)
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
-            server.quit()
+            msg = build_message(sender_email, sender_name, to_email, subject, body, pdf_data, pdf_filename)
+            if pool is not None:
+                pool.send(msg)
+            else:
+                with open_smtp_pool() as single:
+                    single.send(msg)
             return True, None
         except Exception as e:
             return False, str(e)
@@ -480,52 +175,132 @@ This is an automated email with your personalized report attached.
         st.subheader("📄 Preview PDF Report")
         st.write("Preview how the PDF report will look before sending.")
         
-        if 'Student_Name' in df.columns:
-            preview_student = st.selectbox(
-                "Select Student to Preview:",
-                options=df['Student_Name'].tolist(),
-                key="preview_student"
-            )
-            preview_data = df[df['Student_Name'] == preview_student].iloc[0]
-        else:
-            preview_data = df.iloc[0]
-            preview_student = "Student 1"
-        
-        col1, col2 = st.columns([1, 1])
-        
-        with col1:
-            if st.button("🔄 Generate Preview", use_container_width=True):
-                with st.spinner("Generating PDF..."):
-                    try:
-                        pdf_bytes = generate_student_pdf_report(preview_data, df, score_columns)
-                        st.session_state['preview_pdf'] = pdf_bytes
-                        st.session_state['preview_name'] = preview_student
-                        st.success("✅ PDF generated!")
-                    except Exception as e:
-                        st.error(f"Error generating PDF: {e}")
+        preview_mode = st.radio("Mode:", ["Single student", "Download all reports"], horizontal=True,
+                                key="preview_mode")
         
-        with col2:
-            if 'preview_pdf' in st.session_state:
-                st.download_button(
-                    "📥 Download Preview PDF",
-                    data=st.session_state['preview_pdf'],
-                    file_name=f"Report_{st.session_state.get('preview_name', 'Student')}.pdf",
-                    mime="application/pdf",
-                    use_container_width=True
+        if preview_mode == "Single student":
+            if 'Student_Name' in df.columns:
+                preview_student = st.selectbox(
+                    "Select Student to Preview:",
+                    options=df['Student_Name'].tolist(),
+                    key="preview_student"
                 )
-        
-        # Show student summary
-        if preview_data is not None:
-            st.write("---")
-            st.write("**Student Summary:**")
+                preview_data = df[df['Student_Name'] == preview_student].iloc[0]
+            else:
+                preview_data = df.iloc[0]
+                preview_student = "Student 1"
+            
+            col1, col2 = st.columns([1, 1])
+            
+            with col1:
+                if st.button("🔄 Generate Preview", use_container_width=True):
+                    with st.spinner("Generating PDF..."):
+                        try:
+                            pdf_bytes = dataset.pdf_renderer().render(preview_data)
+                            st.session_state['preview_pdf'] = pdf_bytes
+                            st.session_state['preview_name'] = preview_student
+                            st.success("✅ PDF generated!")
+                        except Exception as e:
+                            st.error(f"Error generating PDF: {e}")
+            
+            with col2:
+                if 'preview_pdf' in st.session_state:
+                    st.download_button(
+                        "📥 Download Preview PDF",
+                        data=st.session_state['preview_pdf'],
+                        file_name=f"Report_{st.session_state.get('preview_name', 'Student')}.pdf",
+                        mime="application/pdf",
+                        use_container_width=True
+                    )
+            
+            # Show student summary
+            if preview_data is not None:
+                st.write("---")
+                st.write("**Student Summary:**")
+                
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Score", f"{preview_data['Score']}/{preview_data.get('Total_Max', 480)}")
+                col2.metric("Percentage", f"{preview_data['Total_Percentage']:.1f}%")
+                col3.metric("Rank", f"{int(preview_data['Rank'])}/{len(df)}")
+                
+                percentile = dataset.score_index().percentile(preview_data['Score'])
+                col4.metric("Percentile", f"{percentile:.0f}th")
+        else:
+            st.write("Render the PDF reports of many students in parallel into one ZIP archive.")
             
             col1, col2, col3, col4 = st.columns(4)
-            col1.metric("Score", f"{preview_data['Score']}/{preview_data.get('Total_Max', 480)}")
-            col2.metric("Percentage", f"{preview_data['Total_Percentage']:.1f}%")
-            col3.metric("Rank", f"{int(preview_data['Rank'])}/{len(df)}")
+            with col1:
+                batches = ["All"] + (sorted([str(b) for b in df['Batch'].dropna().unique().tolist()]) if 'Batch' in df.columns else [])
+                archive_batch = st.selectbox("Batch:", batches, key="archive_batch")
+            with col2:
+                branches = ["All"] + (sorted(df['Branch'].dropna().unique().tolist()) if 'Branch' in df.columns else [])
+                archive_branch = st.selectbox("Branch:", branches, key="archive_branch")
+            with col3:
+                archive_perf = st.selectbox("Performance:", ["All", "Top 25%", "Top 50%", "Bottom 25%"],
+                                            key="archive_perf")
+            with col4:
+                archive_workers = st.number_input("PDF render workers", min_value=1, max_value=32,
+                                                  value=default_workers(), key="archive_workers")
+            
+            archive_df = filter_students(df, archive_batch, archive_branch, archive_perf)
+            # Row positions in the full frame, which the render workers index into
+            archive_positions = np.flatnonzero(df.index.isin(archive_df.index))
+            archive_key = (get_session_handle("assessment").fingerprint, archive_batch, archive_branch, archive_perf)
+            st.info(f"📊 Filtered: {len(archive_positions)} students")
+            
+            if st.button(f"🗜️ Build ZIP of {len(archive_positions)} Reports", disabled=not len(archive_positions),
+                         use_container_width=True):
+                # One archive per session: replace the previous one
+                previous = st.session_state.pop('report_archive', None)
+                if previous is not None and os.path.exists(previous['path']):
+                    os.remove(previous['path'])
+                
+                progress_bar = st.progress(0.0)
+                progress_text = st.empty()
+                
+                def show_progress(meter):
+                    progress_bar.progress(meter.done / meter.total)
+                    progress_text.caption(meter.summary('PDFs'))
+                
+                path = os.path.join(archive_dir(), f"{uuid.uuid4().hex}.zip")
+                try:
+                    summary = write_report_archive(df, score_columns, archive_positions, path,
+                                                   workers=archive_workers, progress=show_progress)
+                    st.session_state['report_archive'] = {'path': path, 'key': archive_key, 'summary': summary}
+                except Exception as e:
+                    st.error(f"Error building archive: {e}")
             
-            percentile = (df['Score'] < preview_data['Score']).sum() / len(df) * 100
-            col4.metric("Percentile", f"{percentile:.0f}th")
+            archive = st.session_state.get('report_archive')
+            if archive is not None and os.path.exists(archive['path']):
+                summary = archive['summary']
+                if archive['key'] != archive_key:
+                    st.caption("ℹ️ This archive was built with different filters.")
+                
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Reports", summary['reports'])
+                col2.metric("Wall Time", format_duration(summary['elapsed']))
+                col3.metric("Throughput", f"{summary['rate']:.1f} PDFs/s")
+                col4.metric("Archive Size", f"{summary['bytes'] / 1e6:.1f} MB")
+                
+                render = summary['render'] or {}
+                col1, col2, col3, col4 = st.columns(4)
+                for col, p in zip((col1, col2, col3), (50, 90, 99)):
+                    col.metric(f"Render time p{p}", f"{render[p]:.2f}s" if p in render else "—")
+                col4.metric("Slowest Report", f"{render['max']:.2f}s" if render else "—")
+                
+                if summary['errors']:
+                    with st.expander(f"❌ {summary['failed']} reports failed"):
+                        for filename, error in summary['errors']:
+                            st.write(f"• {filename}: {error}")
+                
+                def read_archive(path=archive['path']):
+                    with open(path, 'rb') as f:
+                        return f.read()
+                
+                # Deferred: the archive is only read when the button is clicked, not on every rerun
+                st.download_button("📥 Download All Reports (.zip)", data=read_archive,
+                                   file_name=f"Student_Reports_{datetime.now().strftime('%Y%m%d')}.zip",
+                                   mime="application/zip", use_container_width=True)
     
     # TAB 2: TEST EMAIL
     with tab2:
@@ -570,8 +345,8 @@ This is an automated email with your personalized report attached.
                         pdf_data = None
                         pdf_filename = None
                         if attach_pdf:
-                            pdf_data = generate_student_pdf_report(sample_data, df, score_columns)
-                            pdf_filename = f"Assessment_Report_{sample_data.get('Student_Name', 'Student').replace(' ', '_')}.pdf"
+                            pdf_data = dataset.pdf_renderer().render(sample_data)
+                            pdf_filename = report_filename(sample_data)
                         
                         # Generate email body
                         body = generate_email_body(sample_data, df, email_template, sender_name, score_columns)
@@ -632,8 +407,8 @@ This is an automated email with your personalized report attached.
                                 pdf_data = None
                                 pdf_filename = None
                                 if attach_pdf:
-                                    pdf_data = generate_student_pdf_report(student_data, df, score_columns)
-                                    pdf_filename = f"Assessment_Report_{student_data['Student_Name'].replace(' ', '_')}.pdf"
+                                    pdf_data = dataset.pdf_renderer().render(student_data)
+                                    pdf_filename = report_filename(student_data)
                                 
                                 body = generate_email_body(student_data, df, email_template, sender_name, score_columns)
                                 target = sender_email if send_to_self else email_addr
@@ -659,77 +434,163 @@ This is an automated email with your personalized report attached.
         
         st.warning("⚠️ This will generate PDF reports and send emails to ALL students!")
         
-        col1, col2, col3, col4 = st.columns(4)
+        col1, col2, est_col, col4 = st.columns(4)
         col1.metric("Total Students", len(df))
         col2.metric("Valid Emails", df['Email'].notna().sum() if 'Email' in df.columns else 0)
-        
-        est_time = len(df) * 3  # ~3 seconds per student with PDF generation
-        col3.metric("Est. Time", f"{est_time//60}m {est_time%60}s")
         col4.metric("PDF Reports", "Yes" if attach_pdf else "No")
         
+        col1, col2, col3, col4, col5 = st.columns(5)
+        render_workers = col1.number_input("PDF render workers", min_value=1, max_value=32,
+                                           value=default_workers(), key="bulk_render_workers",
+                                           help="Processes rendering PDF reports in parallel while emails are sent")
+        smtp_connections = col2.number_input("SMTP connections", min_value=1, max_value=16, value=2,
+                                             key="bulk_smtp_connections",
+                                             help="Emails sent concurrently, each over its own connection")
+        per_minute = col3.number_input("Max emails / minute", min_value=0, value=DEFAULT_PER_MINUTE,
+                                       key="bulk_per_minute", help="0 for no limit")
+        per_hour = col4.number_input("Max emails / hour", min_value=0, value=DEFAULT_PER_HOUR,
+                                     key="bulk_per_hour", help="0 for no limit")
+        max_retries = col5.number_input("Retries", min_value=0, max_value=10, value=DEFAULT_MAX_RETRIES,
+                                        key="bulk_retries",
+                                        help="Retries of temporary (4xx) failures, with exponential backoff")
         send_to_self_bulk = st.checkbox("Send all to myself (test mode)", value=True, key="bulk_test_mode")
-        confirm = st.checkbox("I confirm bulk send with PDF attachments", key="bulk_confirm_pdf")
         
-        if st.button("📬 Send Reports to All Students", disabled=not confirm, use_container_width=True):
-            if not sender_email or not sender_password:
-                st.error("Configure email settings!")
-            elif 'Email' not in df.columns:
-                st.error("Email column not found!")
-            else:
-                progress = st.progress(0)
-                status = st.empty()
-                results = st.empty()
-                
-                success_count = 0
-                fail_count = 0
-                failed_students = []
-                
-                total = len(df)
-                
-                for i, (_, student_data) in enumerate(df.iterrows()):
-                    if pd.notna(student_data.get('Email')):
-                        student_name = student_data.get('Student_Name', f'Student {i+1}')
-                        status.text(f"📧 Processing {student_name} ({i+1}/{total})...")
-                        
-                        try:
-                            # Generate PDF
-                            pdf_data = None
-                            pdf_filename = None
-                            if attach_pdf:
-                                pdf_data = generate_student_pdf_report(student_data, df, score_columns)
-                                pdf_filename = f"Assessment_Report_{student_name.replace(' ', '_')}.pdf"
-                            
-                            body = generate_email_body(student_data, df, email_template, sender_name, score_columns)
-                            target = sender_email if send_to_self_bulk else student_data['Email']
-                            subj = f"[TEST] {email_subject}" if send_to_self_bulk else email_subject
-                            
-                            success, error = send_email_with_attachment(
-                                target, subj, body, pdf_data, pdf_filename,
-                                sender_email, sender_password, sender_name
-                            )
-                            
-                            if success:
-                                success_count += 1
-                            else:
-                                fail_count += 1
-                                failed_students.append(f"{student_name}: {error}")
-                        except Exception as e:
-                            fail_count += 1
-                            failed_students.append(f"{student_name}: {str(e)}")
-                    
-                    progress.progress((i + 1) / total)
-                    results.text(f"✅ Sent: {success_count} | ❌ Failed: {fail_count}")
-                
-                status.empty()
-                progress.empty()
-                results.empty()
-                
-                st.success(f"✅ Bulk send complete! Sent: {success_count}/{total}")
+        def estimate_bulk_seconds(n, workers, connections, per_minute, per_hour):
+            # Rendering, sending and the minute limit run concurrently: the slowest sets the pace.
+            # Rough per-item costs: ~0.1s per PDF per worker, ~1s per email per connection
+            rates = [connections / 1.0]
+            if attach_pdf:
+                rates.append(workers / 0.1)
+            if per_minute:
+                rates.append(per_minute / 60)
+            seconds = n / min(rates)
+            if per_hour and n > per_hour:
+                # The first hour's quota goes out at once, the rest at the hourly rate
+                seconds = max(seconds, (n - per_hour) * 3600 / per_hour)
+            return seconds
+        
+        est_col.metric("Est. Time", format_duration(estimate_bulk_seconds(len(df), render_workers, smtp_connections,
+                                                                          per_minute, per_hour)),
+                       help="From the render workers, SMTP connections and rate limits below")
+        
+        # Bulk sends run as background jobs journaled per dataset and mode, so they
+        # survive reruns and closed tabs and resume without re-sending
+        jobs = get_job_registry()
+        job_id = bulk_job_id(get_session_handle("assessment").fingerprint, send_to_self_bulk)
+        job = jobs.get(job_id)
+        
+        def bulk_composer(df, score_columns, template, subject, name, from_email, test_mode):
+            # Settings are bound now; the job keeps composing after this script run ends
+            def compose(position, pdf):
+                student_data = df.iloc[position]
+                body = generate_email_body(student_data, df, template, name, score_columns)
+                target = from_email if test_mode else student_data['Email']
+                subj = f"[TEST] {subject}" if test_mode else subject
+                pdf_filename = report_filename(student_data) if pdf else None
+                return build_message(from_email, name, target, subj, body, pdf, pdf_filename)
+            return compose
+        
+        def send_latency_metrics(status):
+            latency = status['latency'] or {}
+            col1, col2, col3, col4 = st.columns(4)
+            for col, p in zip((col1, col2, col3), (50, 90, 99)):
+                col.metric(f"Send latency p{p}", f"{latency[p]:.2f}s" if p in latency else "—")
+            col4.metric("🔁 Retries", status['retries'])
+        
+        @st.fragment(run_every=2)
+        def bulk_progress(job):
+            status = job.status()
+            counts = status['counts']
+            
+            st.progress(status['done'] / status['to_send'] if status['to_send'] else 1.0)
+            st.caption(f"{'⏹️ Stopping' if status['stopping'] else '📧 Sending'}... "
+                       f"{status['done']}/{status['to_send']} this run · "
+                       f"{counts['rendered']} rendered and queued")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Throughput", f"{status['rate']:.2f}/s")
+            col2.metric("ETA", format_duration(status['eta']))
+            col3.metric("✅ Sent", f"{counts['sent']}/{status['total']}")
+            col4.metric("❌ Failed", counts['failed'])
+            send_latency_metrics(status)
+            
+            if not status['running']:
+                # Finished: rerun the page to show the summary
+                st.rerun()
+            if st.button("⏹️ Stop Bulk Send", disabled=status['stopping'], use_container_width=True):
+                job.stop()
+        
+        if job is not None and job.running:
+            st.info("📬 A bulk send is running in the background - you can leave this page and come back.")
+            bulk_progress(job)
+        else:
+            journal = jobs.journal(job_id)
+            counts = journal.counts() if journal is not None else None
+            attempted = sum(counts.values()) if counts else 0
+            remaining = counts['pending'] + counts['rendered'] + counts['failed'] if counts else 0
+            
+            if job is not None:
+                # Finished (or stopped) in this server process: show how the last run went
+                status = job.status()
+                if status['error']:
+                    st.error(f"❌ Bulk send stopped: {status['error']}")
+                st.caption(f"Last run: {status['done']} emails in {format_duration(status['elapsed'])} "
+                           f"({status['rate']:.2f}/s)")
+                send_latency_metrics(status)
+            
+            if attempted:
+                if remaining:
+                    st.info(f"📒 Previous bulk send: {counts['sent']} sent, {counts['failed']} failed, "
+                            f"{counts['pending'] + counts['rendered']} not attempted. "
+                            f"Resuming sends the remaining {remaining} only.")
+                else:
+                    st.success(f"✅ Bulk send complete! Sent: {counts['sent']}/{attempted}")
                 
-                if failed_students:
+                failures = journal.failures(limit=500)
+                if failures:
                     with st.expander("❌ Failed Emails"):
-                        for f in failed_students:
-                            st.write(f"• {f}")
+                        for name, email, error in failures:
+                            st.write(f"• {name} ({email}): {error}")
+            
+            confirm = st.checkbox("I confirm bulk send with PDF attachments", key="bulk_confirm_pdf")
+            
+            col1, col2 = st.columns([3, 1])
+            start = col1.button(f"▶️ Resume Bulk Send ({remaining} remaining)" if remaining
+                                else "📬 Send Reports to All Students",
+                                disabled=not confirm or bool(attempted and not remaining),
+                                use_container_width=True)
+            if journal is not None and col2.button("🗑️ Discard Progress", use_container_width=True,
+                                                   help="Forget which students were sent, to send to everyone again"):
+                jobs.discard(job_id)
+                st.rerun()
+            
+            if start:
+                if not sender_email or not sender_password:
+                    st.error("Configure email settings!")
+                elif 'Email' not in df.columns:
+                    st.error("Email column not found!")
+                else:
+                    journal = jobs.journal(job_id, create=True)
+                    names = df['Student_Name'] if 'Student_Name' in df.columns else pd.Series('Student', index=df.index)
+                    journal.register([
+                        (pos, str(name), str(email))
+                        for pos, (name, email) in enumerate(zip(names, df['Email']))
+                        if pd.notna(email)
+                    ])
+                    
+                    # PDFs render across worker processes while earlier emails are sent
+                    compose = bulk_composer(df, score_columns, email_template, email_subject, sender_name,
+                                            sender_email, send_to_self_bulk)
+                    render_pool = PdfRenderPool(df, score_columns, workers=render_workers) if attach_pdf else None
+                    dispatcher = EmailDispatcher(open_smtp_pool(smtp_connections), RateLimiter(per_minute, per_hour),
+                                                 max_retries=max_retries)
+                    new_job = BulkSendJob(job_id, journal, compose, dispatcher, render_pool)
+                    if jobs.start(new_job) is not new_job:
+                        # Another session started this job first
+                        dispatcher.close()
+                        if render_pool is not None:
+                            render_pool.close()
+                    st.rerun()
 
 
 # ============================================
@@ -738,35 +599,11 @@ This is an automated email with your personalized report attached.
 elif data_mode == "course":
     st.title("🔮 Predictive Features & Reports")
     
-    if "df" not in st.session_state:
+    dataset = get_session_dataset("course")
+    if dataset is None:
         st.warning("Please upload course data on the Home page.")
         st.stop()
-    
-    df = st.session_state["df"]
-    course_columns = st.session_state.get("course_columns", [])
-    
-    @st.cache_data
-    def get_at_risk_students(_df, min_courses, max_completion):
-        criteria = (_df['Courses Started'] >= min_courses) & (_df['Overall Completion %'] <= max_completion)
-        return _df[criteria]
-    
-    @st.cache_data
-    def get_recommendations(_df, _course_columns, student_reg, top_n=10):
-        student_data = _df[_df['Registration Number'] == student_reg].iloc[0]
-        student_branch = student_data['Branch Name']
-        
-        student_courses = student_data[_course_columns]
-        started_courses = set(student_courses[student_courses >= 10].index)  # >=10% as started
-        
-        branch_df = _df[_df['Branch Name'] == student_branch]
-        branch_enrollment = (branch_df[_course_columns] >= 10).sum().sort_values(ascending=False)  # >=10% as enrolled
-        top_branch_courses = set(branch_enrollment.head(top_n).index)
-        
-        recommendations = list(top_branch_courses - started_courses)
-        
-        result = branch_enrollment[recommendations].reset_index()
-        result.columns = ['Course', 'Branch Enrollment']
-        return result.sort_values('Branch Enrollment', ascending=False)
+    df, course_columns = dataset.df, dataset.columns
     
     tab1, tab2 = st.tabs(["**At-Risk Students**", "**Course Recommendations**"])
     
@@ -783,7 +620,7 @@ elif data_mode == "course":
             max_completion = st.slider("Max 'Overall Completion %':", 10, 100, 30)
         
         if 'Courses Started' in df.columns and 'Overall Completion %' in df.columns:
-            at_risk_df = get_at_risk_students(df, min_courses, max_completion)
+            at_risk_df = dataset.at_risk_students(min_courses, max_completion)
             
             st.subheader(f"Found {len(at_risk_df)} students")
             
@@ -828,33 +665,25 @@ elif data_mode == "course":
         if selected_reg:
             student_data = df[df['Registration Number'] == selected_reg].iloc[0]
             
-            # Get student name - handle different column formats
-            if 'First Name' in df.columns and 'Last Name' in df.columns:
-                student_name = f"{student_data.get('First Name', '')} {student_data.get('Last Name', '')}"
-            elif 'Full Name' in df.columns:
-                student_name = student_data.get('Full Name', 'N/A')
-            else:
-                student_name = 'N/A'
-                for col in df.columns:
-                    if 'name' in col.lower() and col.lower() not in ['branch name']:
-                        student_name = student_data.get(col, 'N/A')
-                        break
+            student_name = get_student_name(student_data, df.columns)
             
             col1, col2, col3 = st.columns(3)
             col1.info(f"**Name:** {student_name}")
             col2.info(f"**Branch:** {student_data.get('Branch Name', 'N/A')}")
             col3.info(f"**Started:** {student_data.get('Courses Started', 0)} courses")
             
-            recommendations = get_recommendations(df, course_columns, selected_reg)
+            # Item-item collaborative filtering over co-enrollment (>=10% as enrolled)
+            recommendations = dataset.cf_recommendations(selected_reg)
             
             if recommendations.empty:
                 st.success("🎉 Already enrolled in most popular courses!")
             else:
                 st.subheader("📚 Recommended Courses")
+                st.caption("Scored by how often students who took this student's courses also took each course.")
                 st.dataframe(recommendations, use_container_width=True)
                 
                 if len(recommendations) > 0:
-                    fig = px.bar(recommendations.head(10), x='Course', y='Branch Enrollment',
-                                title="Top 10 Recommendations")
+                    fig = px.bar(recommendations.head(10), x='Course', y='Score',
+                                hover_data=['Because Of'], title="Top 10 Recommendations")
                     fig.update_layout(xaxis_tickangle=-45)
                     st.plotly_chart(fig, use_container_width=True)
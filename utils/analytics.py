@@ -0,0 +1,427 @@
+"""
+Headless analytics engine for the Student Analytics Dashboard.
+
+Pure functions over processed frames for everything the pages render, plus a
+Dataset object that holds one processed upload and lazily caches what is
+derived from it. Nothing here imports streamlit, so the same computations run
+in the pages, in batch jobs and in benchmarks.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.branch_index import BranchEnrollmentIndex
+from utils.class_stats import ClassStats
+from utils.coenrollment import CoEnrollment
+from utils.pdf_report import StudentReportRenderer
+from utils.recommender import CourseRecommender
+from utils.score_index import ScoreIndex
+from utils.course_block import STARTED_THRESHOLD, COMPLETED_THRESHOLD, CourseCounters
+
+PERFORMANCE_BANDS = [
+    (80, "Excellent (≥80%)"),
+    (65, "Good (65-79%)"),
+    (50, "Average (50-64%)"),
+]
+BELOW_AVERAGE = "Below Average (<50%)"
+
+
+# ============================================
+# ASSESSMENT ANALYTICS
+# ============================================
+def performance_categories(percentages):
+    """Student counts per performance band for a series of percentages."""
+    values = np.asarray(percentages, dtype=np.float64)
+    conditions = [values >= cutoff for cutoff, _ in PERFORMANCE_BANDS]
+    labels = np.select(conditions, [label for _, label in PERFORMANCE_BANDS], default=BELOW_AVERAGE)
+    return pd.Series(labels).value_counts()
+
+
+def assessment_summary(df):
+    """Headline metrics of an assessment frame (as shown on the Home and Overview pages)."""
+    total_students = len(df)
+    total_max = df['Total_Max'].iloc[0] if 'Total_Max' in df.columns else 480
+    pass_count = int((df['Total_Percentage'] >= 50).sum())
+    excellent_count = int((df['Total_Percentage'] >= 80).sum())
+    return {
+        'total_students': total_students,
+        'total_max': total_max,
+        'avg_score': df['Score'].mean(),
+        'top_score': df['Score'].max(),
+        'pass_count': pass_count,
+        'pass_rate': pass_count / total_students * 100 if total_students else 0,
+        'excellent_count': excellent_count,
+        'excellent_rate': excellent_count / total_students * 100 if total_students else 0,
+    }
+
+
+def section_averages(df, score_columns):
+    """Average score per section, with its maximum and percentage of the maximum."""
+    rows = []
+    for col_name, max_val in score_columns.items():
+        avg = df[col_name].mean()
+        rows.append({
+            'Section': col_name.split('(')[0].strip(),
+            'Column': col_name,
+            'Average Score': avg,
+            'Max Score': max_val,
+            'Average %': avg / max_val * 100,
+        })
+    return pd.DataFrame(rows, columns=['Section', 'Column', 'Average Score', 'Max Score', 'Average %'])
+
+
+def section_toppers(df, score_columns):
+    """Top student of every section."""
+    toppers_data = []
+    for col_name, max_val in score_columns.items():
+        top_row = df.loc[df[col_name].idxmax()]
+        toppers_data.append({
+            'Section': col_name.split('(')[0].strip(),
+            'Student': top_row.get('Student_Name', 'N/A'),
+            'Score': f"{top_row[col_name]}/{max_val}",
+            'Percentage': f"{(top_row[col_name]/max_val*100):.1f}%"
+        })
+    return pd.DataFrame(toppers_data)
+
+
+def filter_students(df, batch="All", branch="All", performance="All"):
+    """Batch / branch / performance-band filter used by the export pages."""
+    filtered_df = df
+    if batch != "All" and 'Batch' in df.columns:
+        filtered_df = filtered_df[filtered_df['Batch'].astype(str) == batch]
+    if branch != "All" and 'Branch' in df.columns:
+        filtered_df = filtered_df[filtered_df['Branch'] == branch]
+    if performance == "Top 25%":
+        threshold = filtered_df['Total_Percentage'].quantile(0.75)
+        filtered_df = filtered_df[filtered_df['Total_Percentage'] >= threshold]
+    elif performance == "Top 50%":
+        threshold = filtered_df['Total_Percentage'].quantile(0.50)
+        filtered_df = filtered_df[filtered_df['Total_Percentage'] >= threshold]
+    elif performance == "Bottom 25%":
+        threshold = filtered_df['Total_Percentage'].quantile(0.25)
+        filtered_df = filtered_df[filtered_df['Total_Percentage'] <= threshold]
+    elif performance == "Above 50%":
+        filtered_df = filtered_df[filtered_df['Total_Percentage'] > 50]
+    elif performance == "Below 50%":
+        filtered_df = filtered_df[filtered_df['Total_Percentage'] <= 50]
+    return filtered_df
+
+
+# ============================================
+# COURSE ANALYTICS
+# ============================================
+def student_name(student_data, columns):
+    """Display name of one student row, whatever name columns the export has."""
+    if 'First Name' in columns and 'Last Name' in columns:
+        return f"{student_data.get('First Name', '')} {student_data.get('Last Name', '')}"
+    if 'Full Name' in columns:
+        return student_data.get('Full Name', 'N/A')
+    for col in columns:
+        if 'name' in col.lower() and col.lower() not in ['branch name']:
+            return student_data.get(col, 'N/A')
+    return 'N/A'
+
+
+def course_counters(df, course_columns):
+    """Per-course counters over the whole (already numeric) course block."""
+    return CourseCounters.from_matrix(df[course_columns].to_numpy(dtype=np.float32))
+
+
+def course_stats(df, course_columns):
+    """
+    Per-course enrollment (>=10%), completion (>=90%), completion rate, average
+    completion of enrolled and progress-bucket counts, in one pass over the block.
+    """
+    return course_counters(df, course_columns).stats_frame(course_columns)
+
+
+def top_k_courses(enrollment, k):
+    """Names of the k courses with the highest enrollment."""
+    return enrollment.nlargest(k).index.tolist()
+
+
+def branch_year_stats(df):
+    """Average completion and course counts per (branch, year of passing)."""
+    return df.groupby(['Branch Name', 'Year of Passing'], observed=True).agg(
+        Avg_Overall_Completion=('Overall Completion %', 'mean'),
+        Avg_Courses_Started=('Courses Started', 'mean'),
+        Avg_Courses_Completed=('Courses Completed', 'mean')
+    ).reset_index()
+
+
+def branch_stats(df):
+    """Average completion and courses started per branch."""
+    return df.groupby('Branch Name', observed=True).agg({
+        'Overall Completion %': 'mean',
+        'Courses Started': 'mean'
+    }).reset_index()
+
+
+def top_courses_by_branch(df, course_columns, top_n=10, index=None):
+    """The top_n most enrolled courses of every branch (long format)."""
+    if index is None:
+        index = BranchEnrollmentIndex.from_frame(df, course_columns)
+    return index.top_courses(top_n)
+
+
+def at_risk_students(df, min_courses, max_completion):
+    """Students who started at least min_courses but completed at most max_completion %."""
+    criteria = (df['Courses Started'] >= min_courses) & (df['Overall Completion %'] <= max_completion)
+    return df[criteria]
+
+
+def started_courses(student_data, course_columns):
+    """A student's started courses (>=10%) with their completion % and status."""
+    student_courses = student_data[course_columns]
+    started = student_courses[student_courses >= STARTED_THRESHOLD]
+
+    courses_df = started.reset_index()
+    courses_df.columns = ["Course Name", "Completion %"]
+    courses_df['Status'] = np.where(courses_df['Completion %'] >= COMPLETED_THRESHOLD, 'Completed', 'In Progress')
+    return courses_df.sort_values(by="Completion %", ascending=False)
+
+
+def co_enrollment(df, course_columns, min_students=10, totals=None):
+    """Bit-packed co-enrollment (>=10%) between courses with more than min_students students."""
+    matrix = df[course_columns].to_numpy(dtype=np.float32)
+    return CoEnrollment.from_matrix(matrix, course_columns, min_students, totals)
+
+
+def batch_recommendations(df, course_columns, recommender, branch_index, top_n=5):
+    """One row per student with their top_n collaborative-filtering course recommendations."""
+    matrix = df[course_columns].to_numpy(dtype=np.float32)
+    branch_codes = pd.Index(branch_index.branches).get_indexer(df['Branch Name'])
+    positions, _ = recommender.recommend_all(matrix, branch_codes, top_n)
+
+    meta_cols = [c for c in ['Registration Number', 'First Name', 'Last Name', 'Branch Name'] if c in df.columns]
+    result = df[meta_cols].reset_index(drop=True)
+    # Position -1 (no course left to recommend) maps to the trailing empty name
+    names = np.array(recommender.courses + [''], dtype=object)
+    for i in range(positions.shape[1]):
+        result[f'Recommendation {i + 1}'] = names[positions[:, i]]
+    return result
+
+
+def _with_grand_totals(table):
+    """Append a 'Grand Total' row and column to a branch pivot table."""
+    grand_total = table.select_dtypes(include='number').sum()
+    grand_total['Branch Name'] = 'Grand Total'
+    table = pd.concat([table, pd.DataFrame([grand_total])], ignore_index=True)
+    numeric_cols = table.select_dtypes(include='number').columns.tolist()
+    table['Grand Total'] = table[numeric_cols].sum(axis=1)
+    return table
+
+
+def summary_tables(df):
+    """Branch-wise course started / completed summaries with grand totals."""
+    if 'Branch Name' not in df.columns:
+        note = pd.DataFrame({'Note': ['Branch Name column not found']})
+        return note, note.copy()
+
+    # Course Started Summary: at least one course >=10%
+    started_status = np.where(df['Courses Started'] > 0, 'Course Started', 'Course Not Started')
+    started_summary = pd.pivot_table(
+        pd.DataFrame({'Branch Name': df['Branch Name'], 'Started Status': started_status}),
+        index='Branch Name', columns='Started Status', aggfunc='size', fill_value=0, observed=True).reset_index()
+
+    # Course Completed Summary: at least one course >=90%
+    completed_status = np.where(df['Courses Completed'] > 0, 'Course Completed', 'Course Not Completed')
+    completed_summary = pd.pivot_table(
+        pd.DataFrame({'Branch Name': df['Branch Name'], 'Completed Status': completed_status}),
+        index='Branch Name', columns='Completed Status', aggfunc='size', fill_value=0, observed=True).reset_index()
+
+    return _with_grand_totals(started_summary), _with_grand_totals(completed_summary)
+
+
+def course_breakdown(df, course_col):
+    """Branch-wise breakdown of one course: Not Started (<10%), Started (10-89%), Completed (>=90%)."""
+    if 'Branch Name' not in df.columns:
+        return pd.DataFrame({'Note': ['Branch Name column not found']})
+
+    values = df[course_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    status = np.select([values >= COMPLETED_THRESHOLD, values >= STARTED_THRESHOLD],
+                       ['Completed', 'Started'], default='Not Started')
+
+    breakdown = pd.pivot_table(
+        pd.DataFrame({'Branch Name': df['Branch Name'], 'Completion Status': status}),
+        index='Branch Name', columns='Completion Status', aggfunc='size', fill_value=0, observed=True).reset_index()
+
+    # Reorder columns logically
+    status_order = ['Not Started', 'Started', 'Completed']
+    existing_status = [s for s in status_order if s in breakdown.columns]
+    breakdown = breakdown[['Branch Name'] + existing_status]
+
+    return _with_grand_totals(breakdown)
+
+
+def master_report(df, top_k_courses):
+    """Master student report: S No., name, contact / progress columns and the top-k course columns."""
+    if 'First Name' in df.columns and 'Last Name' in df.columns:
+        full_name = (df['First Name'].fillna('').astype(str) + ' ' + df['Last Name'].fillna('').astype(str)).str.strip()
+    elif 'Full Name' in df.columns:
+        full_name = df['Full Name'].fillna('').astype(str)
+    else:
+        # Try to find any name-like column
+        name_col = next((c for c in df.columns if 'name' in c.lower() and 'branch' not in c.lower()), None)
+        full_name = df[name_col].fillna('').astype(str) if name_col else 'N/A'
+
+    base_cols = [c for c in ['Email', 'Branch Name', 'Registration Number', 'Courses Started', 'Courses Completed']
+                 if c in df.columns]
+    valid_top_k = [c for c in top_k_courses if c in df.columns]
+
+    report = df[base_cols + valid_top_k].copy()
+    report.insert(0, 'Full Name', full_name)
+    report.insert(0, 'S No.', range(1, len(report) + 1))
+    return report
+
+
+# ============================================
+# DATASET
+# ============================================
+class Dataset:
+    """
+    One processed upload (assessment or course) with lazily cached derived
+    tables. A Dataset is shared between sessions, so its frame is treated as
+    read-only and every derived result is built at most once.
+    """
+
+    def __init__(self, kind, df, columns, load_info=None, fingerprint=None):
+        self.kind = kind
+        self.df = df
+        self.columns = columns
+        self.load_info = load_info or {}
+        self.fingerprint = fingerprint
+        self._derived = {}
+        # Re-entrant, so a builder can depend on another derived result
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        # Derived tables and the lock stay behind when a Dataset is sent to a worker process
+        state = self.__dict__.copy()
+        del state['_derived'], state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    @property
+    def nbytes(self):
+        """Size of the frame, preferring the loader's memory report."""
+        report = self.load_info.get('memory') or {}
+        if 'bytes_after' in report:
+            return report['bytes_after']
+        return int(self.df.memory_usage(deep=True).sum())
+
+    def derived(self, name, builder):
+        """Result of builder(), built once per dataset and cached under name."""
+        if name not in self._derived:
+            with self._lock:
+                if name not in self._derived:
+                    self._derived[name] = builder()
+        return self._derived[name]
+
+    # --- Assessment ---
+    def summary(self):
+        return self.derived('summary', lambda: assessment_summary(self.df))
+
+    def section_averages(self):
+        return self.derived('section_averages', lambda: section_averages(self.df, self.columns))
+
+    def section_toppers(self):
+        return self.derived('section_toppers', lambda: section_toppers(self.df, self.columns))
+
+    def class_stats(self):
+        return self.derived('class_stats', lambda: ClassStats(self.df, self.columns))
+
+    def score_index(self, column='Score', batch="All", branch="All"):
+        """Sorted index of a score column, over the whole class or a batch / branch subset."""
+        return self.derived(('score_index', column, batch, branch),
+                            lambda: ScoreIndex(filter_students(self.df, batch, branch)[column]))
+
+    def pdf_renderer(self, logo_path="logo.png"):
+        """Renderer of the students' PDF reports, with styles, logo and class statistics prepared once."""
+        return self.derived(('pdf_renderer', logo_path),
+                            lambda: StudentReportRenderer(self.df, self.columns, logo_path,
+                                                          score_index=self.score_index(),
+                                                          class_stats=self.class_stats()))
+
+    # --- Course ---
+    def course_counters(self):
+        def build():
+            counters = self.load_info.get('course_counters')
+            if counters:
+                # Streamed ingest already accumulated the per-course counters
+                return CourseCounters.from_dict(counters)
+            return course_counters(self.df, self.columns)
+        return self.derived('course_counters', build)
+
+    def course_stats(self):
+        return self.derived('course_stats', lambda: self.course_counters().stats_frame(self.columns))
+
+    def course_enrollment(self):
+        return self.derived('course_enrollment', lambda: self.course_counters().enrollment(self.columns))
+
+    def top_k_courses(self, k):
+        return top_k_courses(self.course_enrollment(), k)
+
+    def branch_index(self):
+        return self.derived('branch_index', lambda: BranchEnrollmentIndex.from_frame(self.df, self.columns))
+
+    def student_position(self, student_reg):
+        """Row position of a registration number (first occurrence)."""
+        def build():
+            first = ~self.df['Registration Number'].duplicated().to_numpy()
+            return pd.Series(np.flatnonzero(first), index=self.df['Registration Number'].to_numpy()[first])
+        return int(self.derived('registration_index', build).loc[student_reg])
+
+    def top_courses_by_branch(self, top_n=10):
+        return self.derived(('top_courses_by_branch', top_n),
+                            lambda: top_courses_by_branch(self.df, self.columns, top_n, self.branch_index()))
+
+    def co_enrollment(self, min_students=10):
+        return self.derived(('co_enrollment', min_students),
+                            lambda: co_enrollment(self.df, self.columns, min_students,
+                                                  self.course_counters().enrolled))
+
+    def summary_tables(self):
+        return self.derived('summary_tables', lambda: summary_tables(self.df))
+
+    def course_breakdown(self, course_col):
+        return self.derived(('course_breakdown', course_col), lambda: course_breakdown(self.df, course_col))
+
+    def filter_cohort(self, branches=None, years=None):
+        """Rows of the selected branches and years of passing (None keeps all)."""
+        filtered_df = self.df
+        if branches is not None:
+            filtered_df = filtered_df[filtered_df['Branch Name'].isin(branches)]
+        if years and 'Year of Passing' in filtered_df.columns:
+            filtered_df = filtered_df[filtered_df['Year of Passing'].isin(years)]
+        return filtered_df
+
+    def at_risk_students(self, min_courses, max_completion):
+        return at_risk_students(self.df, min_courses, max_completion)
+
+    def recommender(self):
+        return self.derived('recommender', lambda: CourseRecommender(self.co_enrollment(), self.branch_index()))
+
+    def cf_recommendations(self, student_reg, top_n=10):
+        """Collaborative-filtering recommendations for one student."""
+        student_data = self.df.iloc[self.student_position(student_reg)]
+        return self.recommender().recommend(student_data[self.columns].to_numpy(dtype=np.float32),
+                                            student_data['Branch Name'], top_n)
+
+    def batch_recommendations(self, top_n=5):
+        return self.derived(('batch_recommendations', top_n),
+                            lambda: batch_recommendations(self.df, self.columns, self.recommender(),
+                                                          self.branch_index(), top_n))
+
+    def recommendations(self, student_reg, top_n=10):
+        student_data = self.df.iloc[self.student_position(student_reg)]
+        return self.branch_index().recommend(student_data['Branch Name'],
+                                             student_data[self.columns].to_numpy(dtype=np.float32), top_n)
+
+    def master_report(self, top_k_courses):
+        return master_report(self.df, top_k_courses)
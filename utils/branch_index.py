@@ -0,0 +1,160 @@
+"""
+Branch x course enrollment index for LMS course data.
+
+Enrollment (>=10%) counts of every course within every branch are built once
+per dataset, as a branch-indicator matrix times the enrollment matrix, and can
+be adjusted in place when students are added, removed or change progress.
+Top courses of a branch and course recommendations for a student are then
+lookups in one row of counts instead of a scan over the branch's students.
+
+The index cached by Dataset.branch_index() is shared by every session and
+read by other cached results (top courses by branch, the CourseRecommender's
+branch prior, batch recommendations), which copy from it when built. Apply
+add / remove / update only to an index of your own (from_frame), or drop
+those derived results too, otherwise they go stale.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.course_block import STARTED_THRESHOLD
+
+# Rows of the course matrix reduced per step (bounds the float32 temporaries)
+INDEX_BLOCK_CELLS = 8 * 1024 * 1024
+
+
+def _top_positions(counts, top_n):
+    """Positions of the top_n largest counts, highest first (ties in course order)."""
+    if top_n < len(counts):
+        candidates = np.argpartition(-counts, top_n - 1)[:top_n]
+        # Keep every course tied with the last one, so ties resolve by course order as in a stable sort
+        threshold = counts[candidates].min()
+        candidates = np.flatnonzero(counts >= threshold)
+    else:
+        candidates = np.arange(len(counts))
+    order = np.argsort(-counts[candidates], kind='stable')
+    return candidates[order][:top_n]
+
+
+class BranchEnrollmentIndex:
+    """Enrollment counts per (branch, course), with branches in order of first appearance."""
+
+    def __init__(self, branches, course_columns, counts):
+        self.branches = list(branches)
+        self.course_columns = list(course_columns)
+        self.counts = counts
+        self._branch_pos = {branch: i for i, branch in enumerate(self.branches)}
+
+    @classmethod
+    def from_frame(cls, df, course_columns):
+        codes, branches = pd.factorize(df['Branch Name'])
+        matrix = df[course_columns].to_numpy(dtype=np.float32)
+        index = cls(branches, course_columns, np.zeros((len(branches), len(course_columns)), dtype=np.int64))
+        index._accumulate(codes, matrix, 1)
+        return index
+
+    def _accumulate(self, codes, matrix, sign):
+        """Add (sign=1) or subtract (sign=-1) the enrollment of matrix rows belonging to branch codes."""
+        n_rows = matrix.shape[0]
+        step = max(1, INDEX_BLOCK_CELLS // max(matrix.shape[1], 1))
+        for start in range(0, n_rows, step):
+            block_codes = codes[start:start + step]
+            # Rows without a branch (code -1) are left out
+            valid = block_codes >= 0
+            indicator = np.zeros((len(self.branches), len(block_codes)), dtype=np.float32)
+            indicator[block_codes[valid], np.flatnonzero(valid)] = 1
+            enrolled = (matrix[start:start + step] >= STARTED_THRESHOLD).astype(np.float32)
+            # One grouped reduction per block; float32 sums are exact below 2**24 rows
+            self.counts += sign * (indicator @ enrolled).astype(np.int64)
+
+    def _known_codes(self, branches):
+        """Branch codes for labels; raises ValueError for a branch the index has not seen."""
+        codes = np.empty(len(branches), dtype=np.int64)
+        for i, branch in enumerate(branches):
+            if pd.isna(branch):
+                codes[i] = -1
+            elif branch in self._branch_pos:
+                codes[i] = self._branch_pos[branch]
+            else:
+                raise ValueError(f"Unknown branch: {branch!r}")
+        return codes
+
+    def _codes(self, branches):
+        """Branch codes for labels, registering unseen branches."""
+        codes = np.empty(len(branches), dtype=np.int64)
+        for i, branch in enumerate(branches):
+            if pd.isna(branch):
+                codes[i] = -1
+                continue
+            if branch not in self._branch_pos:
+                self._branch_pos[branch] = len(self.branches)
+                self.branches.append(branch)
+                self.counts = np.vstack([self.counts, np.zeros((1, len(self.course_columns)), dtype=np.int64)])
+            codes[i] = self._branch_pos[branch]
+        return codes
+
+    def add(self, branches, matrix):
+        """
+        Count new students: their branch labels and course matrix rows
+        (students x courses). Gives the same counts as indexing all rows at once:
+
+        >>> a = pd.DataFrame({'Branch Name': ['CSE', 'ECE'], 'C1': [50, 0], 'C2': [5, 80]})
+        >>> b = pd.DataFrame({'Branch Name': ['ME', 'CSE'], 'C1': [20, 95], 'C2': [0, 15]})
+        >>> index = BranchEnrollmentIndex.from_frame(a, ['C1', 'C2'])
+        >>> index.add(b['Branch Name'], b[['C1', 'C2']].to_numpy())
+        >>> full = BranchEnrollmentIndex.from_frame(pd.concat([a, b]), ['C1', 'C2'])
+        >>> bool(index.branches == full.branches and (index.counts == full.counts).all())
+        True
+        """
+        self._accumulate(self._codes(branches), np.atleast_2d(matrix), 1)
+
+    def remove(self, branches, matrix):
+        """
+        Uncount students previously added with the same branches and rows.
+        Raises ValueError (changing nothing) if a branch is unknown to the index.
+        """
+        self._accumulate(self._known_codes(branches), np.atleast_2d(matrix), -1)
+
+    def update(self, branch, old_values, new_values):
+        """
+        Adjust for one student whose course progress changed from old_values to
+        new_values. Raises ValueError if the branch is unknown to the index.
+        """
+        code = self._known_codes([branch])[0]
+        if code >= 0:
+            self.counts[code] += ((np.asarray(new_values) >= STARTED_THRESHOLD).astype(np.int64)
+                                  - (np.asarray(old_values) >= STARTED_THRESHOLD))
+
+    def branch_enrollment(self, branch):
+        """Enrollment count of every course in a branch (zeros for an unknown branch)."""
+        pos = self._branch_pos.get(branch)
+        if pos is None:
+            return np.zeros(len(self.course_columns), dtype=np.int64)
+        return self.counts[pos]
+
+    def top_courses(self, top_n=10):
+        """The top_n most enrolled courses of every branch (long format)."""
+        names = np.array(self.course_columns, dtype=object)
+        frames = []
+        for branch, counts in zip(self.branches, self.counts):
+            top = _top_positions(counts, top_n)
+            frames.append(pd.DataFrame({
+                'Course Name': names[top],
+                'Student Count': counts[top],
+                'Branch Name': branch,
+            }))
+        if not frames:
+            return pd.DataFrame(columns=['Course Name', 'Student Count', 'Branch Name'])
+        return pd.concat(frames)
+
+    def recommend(self, branch, course_values, top_n=10):
+        """
+        Popular courses in the branch (top_n by enrollment) that a student with
+        course_values (one row of the course matrix) has not started.
+        """
+        counts = self.branch_enrollment(branch)
+        top = _top_positions(counts, top_n)
+        top = top[np.asarray(course_values)[top] < STARTED_THRESHOLD]
+        return pd.DataFrame({
+            'Course': np.array(self.course_columns, dtype=object)[top],
+            'Branch Enrollment': counts[top],
+        })
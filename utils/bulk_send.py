@@ -0,0 +1,318 @@
+"""
+Background bulk email jobs with a persistent per-student journal.
+
+A BulkSendJob renders PDF reports and sends emails on background threads, so
+it keeps going when the browser tab closes or the page reruns; the page only
+polls its progress. Rendering (producer) and sending (consumer) overlap
+through a bounded queue, so at most QUEUE_SIZE rendered attachments wait in
+memory for the sender.
+
+Emails go out through an EmailDispatcher, one sender thread per pooled SMTP
+connection, within its rate limits and with retries of transient failures.
+
+Every student's state (pending, rendered, sent, failed) is recorded in a
+SQLite journal as it changes. A job started again for the same dataset and
+mode resumes from the journal: students already sent are skipped, everything
+else (including earlier failures) is attempted again.
+
+Journals live in DASHBOARD_JOB_DIR (default: a directory in the system temp
+dir).
+"""
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+
+from utils.dispatcher import DispatchCancelled
+from utils.pdf_pool import RenderResult
+from utils.throughput import ThroughputMeter
+
+JOB_DIR_ENV = 'DASHBOARD_JOB_DIR'
+
+STATES = ['pending', 'rendered', 'sent', 'failed']
+
+# Rendered PDFs waiting for the senders (at least; two per sender thread)
+QUEUE_SIZE = 8
+
+# How often blocked threads re-check for a stop request, in seconds
+POLL_INTERVAL = 0.5
+
+# End-of-stream marker on the queue
+_DONE = object()
+
+
+def job_dir():
+    return os.environ.get(JOB_DIR_ENV) or os.path.join(tempfile.gettempdir(), 'dashboard_jobs')
+
+
+def journal_path(job_id):
+    return os.path.join(job_dir(), f"{job_id}.sqlite")
+
+
+def bulk_job_id(fingerprint, test_mode):
+    """Job of one dataset and recipient mode; test sends never count as sent to students."""
+    return f"{fingerprint}_{'test' if test_mode else 'live'}"
+
+
+class SendJournal:
+    """Per-student send state of one bulk job, persisted in SQLite. Thread-safe."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS students ("
+            " position INTEGER PRIMARY KEY, name TEXT, email TEXT,"
+            " state TEXT NOT NULL, error TEXT, updated REAL)"
+        )
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def register(self, students):
+        """Add [(position, name, email)] as pending; students already journaled keep their state."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO students (position, name, email, state, updated) VALUES (?, ?, ?, 'pending', ?)",
+                [(int(pos), name, email, now) for pos, name, email in students],
+            )
+            self._db.commit()
+
+    def mark(self, position, state, error=None):
+        with self._lock:
+            self._db.execute("UPDATE students SET state = ?, error = ?, updated = ? WHERE position = ?",
+                             (state, error, time.time(), int(position)))
+            self._db.commit()
+
+    def unsent(self):
+        """Positions of every student not yet sent, in order."""
+        with self._lock:
+            rows = self._db.execute("SELECT position FROM students WHERE state != 'sent' ORDER BY position")
+            return [row[0] for row in rows]
+
+    def counts(self):
+        """{state: number of students} for every state."""
+        counts = dict.fromkeys(STATES, 0)
+        with self._lock:
+            for state, count in self._db.execute("SELECT state, COUNT(*) FROM students GROUP BY state"):
+                counts[state] = count
+        return counts
+
+    def failures(self, limit=None):
+        """[(name, email, error)] of failed students, most recent first."""
+        sql = "SELECT name, email, error FROM students WHERE state = 'failed' ORDER BY updated DESC"
+        with self._lock:
+            if limit:
+                return self._db.execute(sql + " LIMIT ?", (limit,)).fetchall()
+            return self._db.execute(sql).fetchall()
+
+
+class BulkSendJob:
+    """
+    Sends one email per journal position on background threads.
+
+    compose(position, pdf) builds the email.message.Message of a student;
+    render_pool (a PdfRenderPool, or None to send without attachments) and
+    dispatcher (an EmailDispatcher) are owned by the job and closed when it
+    finishes.
+    """
+
+    def __init__(self, job_id, journal, compose, dispatcher, render_pool=None, queue_size=None):
+        self.job_id = job_id
+        self.journal = journal
+        self.compose = compose
+        self.dispatcher = dispatcher
+        self.render_pool = render_pool
+        self.senders = dispatcher.connections
+        self.positions = journal.unsent()
+        self.meter = ThroughputMeter(len(self.positions))
+        self.error = None
+        self.finished = None
+
+        self._queue = queue.Queue(maxsize=queue_size or max(QUEUE_SIZE, 2 * self.senders))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"bulk-send-{job_id}", daemon=True)
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def stopping(self):
+        return self._stop.is_set() and self.running
+
+    def start(self):
+        self.meter = ThroughputMeter(len(self.positions))
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Ask the job to stop after the email in flight; unsent students stay resumable."""
+        self._stop.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _put(self, item):
+        # Blocks while the queue is full (backpressure on rendering), unless stopped
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        try:
+            if self.render_pool is not None:
+                results = self.render_pool.render(self.positions)
+            else:
+                results = (RenderResult(pos, None, None, None, 0.0) for pos in self.positions)
+
+            for result in results:
+                if self._stop.is_set():
+                    break
+                if result.error:
+                    self.journal.mark(result.position, 'failed',
+                                      f"PDF rendering failed (worker {result.worker}): {result.error}")
+                    self.meter.record(ok=False)
+                    continue
+                if result.pdf is not None:
+                    self.journal.mark(result.position, 'rendered')
+                if not self._put(result):
+                    break
+        except Exception as e:
+            self.error = f"Rendering stopped: {type(e).__name__}: {e}"
+            self._stop.set()
+        finally:
+            # The consumer exits on _DONE; on stop it exits on its own
+            self._put(_DONE)
+
+    def _consume(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            if item is _DONE:
+                # Pass the marker on to the other senders
+                self._put(_DONE)
+                return
+            if self._stop.is_set():
+                return
+
+            try:
+                latency = self.dispatcher.send(self.compose(item.position, item.pdf), stop=self._stop)
+            except DispatchCancelled:
+                # Stopped while throttled or backing off; the student stays unsent
+                return
+            except Exception as e:
+                self.journal.mark(item.position, 'failed', str(e))
+                self.meter.record(ok=False)
+            else:
+                # A crash between the server accepting and this write can repeat one email on resume
+                self.journal.mark(item.position, 'sent')
+                self.meter.record(ok=True, latency=latency)
+
+    def _sender(self):
+        try:
+            self._consume()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self._stop.set()
+
+    def _run(self):
+        producer = threading.Thread(target=self._produce, name=f"bulk-render-{self.job_id}", daemon=True)
+        senders = [threading.Thread(target=self._sender, name=f"bulk-send-{self.job_id}-{i}", daemon=True)
+                   for i in range(self.senders)]
+        producer.start()
+        for sender in senders:
+            sender.start()
+        try:
+            for sender in senders:
+                sender.join()
+        finally:
+            self._stop.set()
+            producer.join()
+            self.dispatcher.close()
+            if self.render_pool is not None:
+                self.render_pool.close()
+            self.meter.finish()
+            self.finished = time.time()
+
+    def status(self):
+        """Snapshot for the UI: journal counts plus this run's throughput and send latency."""
+        counts = self.journal.counts()
+        return {
+            'counts': counts,
+            'total': sum(counts.values()),
+            'running': self.running,
+            'stopping': self.stopping,
+            'done': self.meter.done,
+            'to_send': self.meter.total,
+            'rate': self.meter.rate,
+            'eta': self.meter.eta if self.running else 0,
+            'elapsed': self.meter.elapsed,
+            'latency': self.meter.latency_percentiles(),
+            'retries': self.dispatcher.retries,
+            'error': self.error,
+        }
+
+
+class JobRegistry:
+    """Process-wide bulk jobs and journals by id, so any session or rerun finds a running job."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._journals = {}
+        self._lock = threading.Lock()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def journal(self, job_id, create=False):
+        """The open journal of job_id; None if it has none on disk and create is False."""
+        with self._lock:
+            journal = self._journals.get(job_id)
+            if journal is None and (create or os.path.exists(journal_path(job_id))):
+                journal = self._journals[job_id] = SendJournal(journal_path(job_id))
+            return journal
+
+    def start(self, job):
+        """Start and register job, unless a job with its id is still running (returns that one)."""
+        with self._lock:
+            current = self._jobs.get(job.job_id)
+            if current is not None and current.running:
+                return current
+            self._jobs[job.job_id] = job.start()
+            return job
+
+    def discard(self, job_id):
+        """Forget a finished job and delete its journal."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.running:
+                return False
+            self._jobs.pop(job_id, None)
+            journal = self._journals.pop(job_id, None)
+        if journal is not None:
+            journal.close()
+        for suffix in ('', '-wal', '-shm'):
+            try:
+                os.remove(journal_path(job_id) + suffix)
+            except FileNotFoundError:
+                pass
+        return True
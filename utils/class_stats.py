@@ -0,0 +1,52 @@
+"""
+Class-level statistics of an assessment dataset.
+
+Mean, standard deviation, quantiles and extremes of every section and of the
+total score, computed once per dataset and read by the Student Reports page,
+the email bodies and the PDF reports instead of re-scanning the columns for
+every student.
+"""
+import pandas as pd
+
+QUANTILES = [0.25, 0.5, 0.75, 0.9]
+
+
+class ClassStats:
+    """Per-column statistics of the score columns plus 'Score'."""
+
+    def __init__(self, df, score_columns):
+        self.score_columns = dict(score_columns)
+        max_marks = dict(self.score_columns)
+        max_marks['Score'] = sum(self.score_columns.values())
+
+        rows = {}
+        for col, marks in max_marks.items():
+            values = df[col]
+            quantiles = values.quantile(QUANTILES)
+            rows[col] = {
+                'Mean': values.mean(),
+                'Std': values.std(),
+                'Min': values.min(),
+                **{f"Q{int(q * 100)}": quantiles[q] for q in QUANTILES},
+                'Max': values.max(),
+                'Max Marks': marks,
+            }
+        self.table = pd.DataFrame.from_dict(rows, orient='index')
+        self.table['Mean %'] = self.table['Mean'] / self.table['Max Marks'] * 100
+        self._mean = self.table['Mean'].to_dict()
+        self._mean_pct = self.table['Mean %'].to_dict()
+
+    def mean(self, col='Score'):
+        return self._mean[col]
+
+    def mean_pct(self, col):
+        """Class average of a section (or 'Score') as a percentage of its maximum marks."""
+        return self._mean_pct[col]
+
+    def section_mean_pcts(self):
+        """Class average percentage of every section, in score column order."""
+        return [self._mean_pct[col] for col in self.score_columns]
+
+    def get(self, col, stat):
+        """Any other statistic of a column, e.g. get('Quants (160)', 'Q75')."""
+        return self.table.at[col, stat]
@@ -0,0 +1,157 @@
+"""
+Co-enrollment engine for LMS course data.
+
+Enrollment (>=10%) is stored bit-packed, one row of 64-bit words per course,
+so 100k students take ~12 KB per course instead of an int64 column each. Pair
+counts are popcounts of AND-ed rows, computed for the upper triangle only.
+From the counts follow normalised measures (Jaccard, lift), the top-K pairs
+and a small clustered submatrix for the heatmap.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.course_block import STARTED_THRESHOLD
+
+MEASURES = ['Student Count', 'Jaccard', 'Lift']
+
+# uint64 words AND-ed per popcount step (32 MB of temporaries)
+POPCOUNT_BLOCK_WORDS = 4 * 1024 * 1024
+
+# Matrix cells thresholded per packing step
+PACK_BLOCK_CELLS = 8 * 1024 * 1024
+
+if hasattr(np, 'bitwise_count'):
+    _popcount = np.bitwise_count
+else:
+    # numpy < 2.0: count bits byte by byte through a lookup table
+    _POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words):
+        return _POPCOUNT8[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=-1)
+
+
+def pack_enrollment(matrix, positions):
+    """Bit-pack the courses at positions of a course matrix (students x courses) into (courses x words) uint64 rows."""
+    n_rows = matrix.shape[0]
+    n_bytes = -(-n_rows // 64) * 8
+    packed = np.zeros((len(positions), n_bytes), dtype=np.uint8)
+    step = max(1, PACK_BLOCK_CELLS // max(n_rows, 1))
+    for start in range(0, len(positions), step):
+        block = positions[start:start + step]
+        enrolled = matrix[:, block].T >= STARTED_THRESHOLD
+        packed[start:start + len(block), :-(-n_rows // 8)] = np.packbits(enrolled, axis=1)
+    return packed.view(np.uint64)
+
+
+def co_occurrence(bits):
+    """Symmetric (courses x courses) co-enrollment counts; the diagonal holds each course's enrollment."""
+    n_courses, n_words = bits.shape
+    counts = np.zeros((n_courses, n_courses), dtype=np.int64)
+    step = max(1, POPCOUNT_BLOCK_WORDS // max(n_words, 1))
+    for i in range(n_courses):
+        for start in range(i, n_courses, step):
+            stop = min(start + step, n_courses)
+            counts[i, start:stop] = _popcount(bits[i] & bits[start:stop]).sum(axis=1)
+    upper = np.triu(counts, 1)
+    return counts + upper.T
+
+
+class CoEnrollment:
+    """
+    Pairwise co-enrollment between the courses with more than min_students
+    students, with count, Jaccard and lift measures.
+    """
+
+    def __init__(self, courses, counts, n_students):
+        self.courses = list(courses)
+        self.counts = counts
+        self.n_students = n_students
+
+    @classmethod
+    def from_matrix(cls, matrix, course_columns, min_students=10, totals=None):
+        """Co-enrollment of a course matrix; totals (per-course enrollment) are counted if not given."""
+        if totals is None:
+            totals = np.count_nonzero(matrix >= STARTED_THRESHOLD, axis=0)
+        popular = np.flatnonzero(np.asarray(totals) > min_students)
+        courses = [course_columns[i] for i in popular]
+        if len(popular) < 2:
+            return cls(courses, np.diag(np.asarray(totals)[popular]).astype(np.int64), matrix.shape[0])
+        return cls(courses, co_occurrence(pack_enrollment(matrix, popular)), matrix.shape[0])
+
+    @property
+    def totals(self):
+        return np.diag(self.counts)
+
+    def measure(self, name='Student Count'):
+        """(courses x courses) matrix of one of MEASURES."""
+        counts = self.counts
+        if name == 'Student Count':
+            return counts
+        totals = self.totals.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if name == 'Jaccard':
+                # |A and B| / |A or B|
+                values = counts / (totals[:, None] + totals[None, :] - counts)
+            elif name == 'Lift':
+                # P(A and B) / (P(A) P(B))
+                values = counts * self.n_students / (totals[:, None] * totals[None, :])
+            else:
+                raise ValueError(f"Unknown co-enrollment measure: {name}")
+        return np.nan_to_num(values, nan=0.0, posinf=0.0)
+
+    def top_pairs(self, k=20, measure='Student Count', min_count=1):
+        """The k course pairs ranked highest by measure, with all measures, as a frame."""
+        columns = ['Course 1', 'Course 2'] + MEASURES
+        if len(self.courses) < 2:
+            return pd.DataFrame(columns=columns)
+
+        rows, cols = np.triu_indices(len(self.courses), 1)
+        keep = self.counts[rows, cols] >= min_count
+        rows, cols = rows[keep], cols[keep]
+        scores = self.measure(measure)[rows, cols]
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, cols, scores = rows[top], cols[top], scores[top]
+        order = np.argsort(-scores, kind='stable')
+        rows, cols = rows[order], cols[order]
+
+        names = np.array(self.courses, dtype=object)
+        pairs = pd.DataFrame({'Course 1': names[rows], 'Course 2': names[cols]})
+        for name in MEASURES:
+            pairs[name] = self.measure(name)[rows, cols]
+        return pairs[columns]
+
+    def cluster_order(self, n=15, measure='Jaccard'):
+        """
+        Up to n courses with the most co-enrollment, ordered so that similar
+        courses sit next to each other (spectral ordering of the measure matrix).
+        """
+        counts = self.counts
+        off_diagonal = counts.sum(axis=1) - self.totals
+        chosen = np.sort(np.argsort(-off_diagonal, kind='stable')[:n])
+        if len(chosen) < 3:
+            return [self.courses[i] for i in chosen]
+
+        similarity = self.measure(measure)[np.ix_(chosen, chosen)].astype(np.float64)
+        np.fill_diagonal(similarity, 0)
+        # Fiedler vector of the graph Laplacian
+        laplacian = np.diag(similarity.sum(axis=1)) - similarity
+        _, vectors = np.linalg.eigh(laplacian)
+        order = np.argsort(vectors[:, 1], kind='stable')
+        return [self.courses[i] for i in chosen[order]]
+
+    def heatmap_frame(self, n=15, measure='Student Count'):
+        """
+        Long-format (Course 1, Course 2, measure) frame for the clustered
+        n x n submatrix, plus the course order for the chart axes.
+        """
+        if len(self.courses) < 2:
+            return [], pd.DataFrame(columns=['Course 1', 'Course 2', measure])
+
+        order = self.cluster_order(n)
+        index = [self.courses.index(course) for course in order]
+        values = self.measure(measure)[np.ix_(index, index)]
+
+        frame = pd.DataFrame(values, index=order, columns=order).stack().reset_index()
+        frame.columns = ['Course 1', 'Course 2', measure]
+        return order, frame[frame['Course 1'] != frame['Course 2']]
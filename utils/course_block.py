@@ -0,0 +1,165 @@
+"""
+Course block helpers for LMS course progress data.
+
+The course columns of an LMS export (everything after 'Overall Completion %')
+are converted once into a single contiguous float32 matrix, and the per-student
+started / completed counts are derived from that matrix in the same pass.
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+# >=10% is considered started/enrolled, >=90% completed
+STARTED_THRESHOLD = 10
+COMPLETED_THRESHOLD = 90
+
+# Progress buckets per course: [0, 10), [10, 25), [25, 50), [50, 75), [75, 90), [90, 100]
+BUCKET_EDGES = np.array([STARTED_THRESHOLD, 25, 50, 75, COMPLETED_THRESHOLD], dtype=np.float32)
+BUCKET_LABELS = ['Not Started (<10%)', '10-25%', '25-50%', '50-75%', '75-90%', 'Completed (≥90%)']
+
+# Cells per sorted column block in CourseCounters.update (32 MB of float32)
+SORT_BLOCK_CELLS = 8 * 1024 * 1024
+
+
+def find_course_columns(df):
+    """Course columns are the columns after 'Overall Completion %' (or after index 11)."""
+    if 'Overall Completion %' in df.columns:
+        idx = df.columns.get_loc('Overall Completion %')
+        return df.columns[idx + 1:].tolist()
+    # Fallback: assume columns after index 11 are courses
+    return df.columns[11:].tolist()
+
+
+def to_course_matrix(course_block):
+    """
+    Convert a block of course columns to a float32 matrix (students x courses).
+    Unparseable values and NaN become 0. The matrix is column-major so it can
+    back a DataFrame without another copy and each course is contiguous.
+    """
+    n_rows, n_cols = course_block.shape
+    matrix = np.empty((n_rows, n_cols), dtype=np.float32, order='F')
+
+    numeric_mask = np.array([is_numeric_dtype(dtype) for dtype in course_block.dtypes], dtype=bool)
+    if numeric_mask.all():
+        matrix[:] = course_block.to_numpy(dtype=np.float32, na_value=np.nan)
+    else:
+        if numeric_mask.any():
+            matrix[:, numeric_mask] = course_block.iloc[:, numeric_mask].to_numpy(dtype=np.float32, na_value=np.nan)
+        # Only text columns (e.g. '-' placeholders) need element-wise parsing
+        for pos in np.flatnonzero(~numeric_mask):
+            matrix[:, pos] = pd.to_numeric(course_block.iloc[:, pos], errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+
+    matrix[np.isnan(matrix)] = 0
+    return matrix
+
+
+def course_counts(matrix):
+    """Per-student (started, completed) counts from a course matrix."""
+    started = np.count_nonzero(matrix >= STARTED_THRESHOLD, axis=1)
+    completed = np.count_nonzero(matrix >= COMPLETED_THRESHOLD, axis=1)
+    return started, completed
+
+
+def build_course_block(df, course_columns):
+    """
+    Replace the course columns of `df` with one float32 block and recalculate
+    'Courses Started' / 'Courses Completed' from it.
+    Returns (df, matrix).
+    """
+    matrix = to_course_matrix(df[course_columns])
+
+    meta_columns = [c for c in df.columns if c not in set(course_columns)]
+    course_df = pd.DataFrame(matrix, index=df.index, columns=course_columns, copy=False)
+    df = pd.concat([df[meta_columns], course_df], axis=1)
+
+    if course_columns:
+        started, completed = course_counts(matrix)
+        df['Courses Started'] = started.astype(int)
+        df['Courses Completed'] = completed.astype(int)
+
+    return df, matrix
+
+
+class CourseCounters:
+    """
+    Per-course progress-bucket counts and the sum of enrolled completion,
+    from which enrollment, completion, completion rate and average completion
+    of enrolled students follow. Accumulated chunk by chunk, so course
+    statistics do not need the whole course matrix at once.
+    """
+
+    def __init__(self, n_courses):
+        self.buckets = np.zeros((len(BUCKET_LABELS), n_courses), dtype=np.int64)
+        self.enrolled_sum = np.zeros(n_courses, dtype=np.float64)
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """Counters for a whole course matrix (students x courses, no NaN)."""
+        counters = cls(matrix.shape[1])
+        counters.update(matrix)
+        return counters
+
+    @property
+    def enrolled(self):
+        return self.buckets[1:].sum(axis=0)
+
+    @property
+    def completed(self):
+        return self.buckets[-1]
+
+    def update(self, matrix):
+        """Add one chunk (students x courses) of the course matrix."""
+        n_rows, n_courses = matrix.shape
+        block_cols = max(1, SORT_BLOCK_CELLS // max(n_rows, 1))
+        at_least = np.empty((len(BUCKET_EDGES), n_courses), dtype=np.int64)
+
+        # Sort each course once; every bucket boundary and the enrolled sum are
+        # then binary searches and one contiguous tail sum per course, instead
+        # of a full comparison pass over the matrix per threshold
+        for start in range(0, n_courses, block_cols):
+            block = np.sort(matrix[:, start:start + block_cols], axis=0)
+            for offset in range(block.shape[1]):
+                column = block[:, offset]
+                positions = np.searchsorted(column, BUCKET_EDGES)
+                at_least[:, start + offset] = n_rows - positions
+                self.enrolled_sum[start + offset] += column[positions[0]:].sum(dtype=np.float64)
+
+        self.buckets[0] += n_rows - at_least[0]
+        self.buckets[1:-1] += at_least[:-1] - at_least[1:]
+        self.buckets[-1] += at_least[-1]
+
+    def to_dict(self):
+        """JSON-serialisable form, stored in load_info."""
+        return {
+            'buckets': self.buckets.tolist(),
+            'enrolled_sum': self.enrolled_sum.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        counters = cls(len(data['enrolled_sum']))
+        counters.buckets[:] = data['buckets']
+        counters.enrolled_sum[:] = data['enrolled_sum']
+        return counters
+
+    def stats_frame(self, course_columns):
+        """Course stats in the shape of the Analytics page table, followed by one column per progress bucket."""
+        enrolled = self.enrolled
+        completed = self.completed
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where(enrolled > 0, completed / enrolled * 100, 0.0)
+            avg = np.where(enrolled > 0, self.enrolled_sum / enrolled, 0.0)
+        stats = pd.DataFrame({
+            'Course Name': course_columns,
+            'Total Enrollment': enrolled,
+            'Total Completed': completed,
+            'Completion Rate (%)': rate,
+            'Average Completion %': avg,
+        })
+        for label, counts in zip(BUCKET_LABELS, self.buckets):
+            stats[label] = counts
+        return stats
+
+    def enrollment(self, course_columns):
+        """Number of students enrolled (>=10%) in each course, as a Series indexed by course."""
+        return pd.Series(self.enrolled, index=course_columns, name='Students Enrolled')
@@ -4,7 +4,6 @@ Shared data helper functions for the Student Analytics Dashboard.
 import pandas as pd
 import numpy as np
 import re
-import streamlit as st
 
 
 def detect_score_columns(df):
@@ -18,13 +17,19 @@ def detect_score_columns(df):
         col_lower = col.lower()
         # Look for patterns like "Quants (160)" or score-related columns
         if any(keyword in col_lower for keyword in ['quants', 'logical', 'verbal', 'english', 'technical', 'coding', 'mcq']):
+            # Check if column has any valid (non-NaN) data
+            col_data = pd.to_numeric(df[col], errors='coerce')
+            if col_data.isna().all():
+                # Skip columns that are entirely empty/NaN
+                continue
+            
             # Try to extract max score from column name (e.g., "Quants (160)")
             match = re.search(r'\((\d+)\)', col)
             if match:
                 max_score = int(match.group(1))
             else:
                 # Estimate from data
-                max_val = df[col].max()
+                max_val = col_data.max()
                 if max_val <= 100:
                     max_score = 100
                 elif max_val <= 160:
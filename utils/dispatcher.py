@@ -0,0 +1,144 @@
+"""
+Rate-limited email dispatch.
+
+EmailDispatcher sends messages through an SmtpPool on behalf of any number of
+sender threads (one per pooled connection). Every attempt first takes a token
+from a per-minute and a per-hour token bucket, so bursts stay within the
+provider's quota, and transient failures (4xx replies, dropped connections,
+timeouts) are retried with exponential backoff. Permanent (5xx) failures are
+raised immediately.
+"""
+import smtplib
+import threading
+import time
+
+from utils.smtp_pool import DISCONNECT_ERRORS
+
+# Conservative defaults for a personal Gmail account
+DEFAULT_PER_MINUTE = 60
+DEFAULT_PER_HOUR = 1000
+DEFAULT_MAX_RETRIES = 3
+# Seconds before the first retry; doubled for every further attempt
+DEFAULT_BACKOFF = 2.0
+MAX_BACKOFF = 120.0
+
+# How often waiting senders re-check for a stop request, in seconds
+POLL_INTERVAL = 0.5
+
+
+class DispatchCancelled(Exception):
+    """The dispatcher was asked to stop before the message was sent."""
+
+
+def is_transient(error):
+    """Whether a send error is worth retrying later (4xx reply, dropped connection, timeout)."""
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return bool(error.recipients) and all(400 <= code < 500 for code, _ in error.recipients.values())
+    return isinstance(error, DISCONNECT_ERRORS + (TimeoutError,))
+
+
+class TokenBucket:
+    """`rate` tokens per `per` seconds, holding at most `capacity` (default: rate). Not thread-safe."""
+
+    def __init__(self, rate, per, capacity=None):
+        self.capacity = capacity or rate
+        self.fill_rate = rate / per
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until a token is available."""
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.fill_rate)
+
+    def take(self):
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """
+    Per-minute and per-hour token buckets; a limit of 0 or None is unlimited.
+    The minute bucket holds a tenth of its quota, so sends are paced evenly
+    instead of bursting a full minute's worth at once. Thread-safe.
+    """
+
+    def __init__(self, per_minute=None, per_hour=None):
+        self.buckets = []
+        if per_minute:
+            self.buckets.append(TokenBucket(per_minute, 60, capacity=max(1, per_minute // 10)))
+        if per_hour:
+            self.buckets.append(TokenBucket(per_hour, 3600))
+        self._lock = threading.Lock()
+
+    def acquire(self, stop=None):
+        """Block until every bucket has a token and take them. Returns False if stop is set first."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max((bucket.wait_time(now) for bucket in self.buckets), default=0.0)
+                if wait <= 0:
+                    for bucket in self.buckets:
+                        bucket.take()
+                    return True
+            if _sleep(min(wait, POLL_INTERVAL), stop):
+                return False
+
+
+def _sleep(seconds, stop):
+    """Sleep, waking early if stop is set. Returns whether stop is set."""
+    if stop is None:
+        time.sleep(seconds)
+        return False
+    return stop.wait(seconds)
+
+
+class EmailDispatcher:
+    """Rate-limited, retrying sends over an SmtpPool, safe to call from `connections` threads."""
+
+    def __init__(self, smtp_pool, limiter=None, max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF):
+        self.smtp_pool = smtp_pool
+        self.limiter = limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    @property
+    def connections(self):
+        return self.smtp_pool.connections
+
+    def close(self):
+        self.smtp_pool.close()
+
+    def send(self, msg, stop=None):
+        """
+        Send msg, retrying transient failures up to max_retries times. Returns
+        the send latency: seconds from the first attempt until the server
+        accepted the message (waiting for the first token is not included).
+        Raises the last error once retries run out or on a permanent failure,
+        and DispatchCancelled if stop is set while waiting for a token or a
+        retry.
+        """
+        attempt = 0
+        started = None
+        while True:
+            if not self.limiter.acquire(stop):
+                raise DispatchCancelled()
+            attempt += 1
+            started = started or time.perf_counter()
+            try:
+                self.smtp_pool.send(msg)
+                return time.perf_counter() - started
+            except Exception as e:
+                if attempt > self.max_retries or not is_transient(e):
+                    raise
+            with self._lock:
+                self.retries += 1
+            if _sleep(min(MAX_BACKOFF, self.backoff * 2 ** (attempt - 1)), stop):
+                raise DispatchCancelled()
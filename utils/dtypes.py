@@ -0,0 +1,142 @@
+"""
+Compact dtype plan for processed course and assessment frames.
+
+Percentages are stored as float32 (or uint8 when every value is a whole number),
+repeated metadata such as branch, batch and year as categoricals, and counts as
+nullable small integers. apply_dtype_plan also returns a memory report so the
+saving can be shown in the sidebar.
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_float_dtype, is_numeric_dtype
+
+CATEGORY_COLUMNS = ['Branch Name', 'Year of Passing', 'Batch', 'Branch']
+COUNT_COLUMNS = ['Courses Started', 'Courses Completed', 'Rank']
+PERCENT_COLUMNS = ['Overall Completion %', 'Total_Percentage']
+
+
+def _is_whole(values):
+    """True when a float array holds only whole numbers (NaN not allowed)."""
+    return bool(np.all(np.isfinite(values)) and np.array_equal(values, np.floor(values)))
+
+
+def compact_percentages(series):
+    """uint8 when all values are whole numbers within 0-100, float32 otherwise."""
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    if len(values) and _is_whole(values) and values.min() >= 0 and values.max() <= 100:
+        return pd.Series(values.astype(np.uint8), index=series.index, name=series.name)
+    return series.astype(np.float32)
+
+
+def compact_course_block(df, course_columns):
+    """
+    Store the whole course block as uint8 when every completion value is a
+    whole number, keeping it a single matrix. Float32 blocks are left as is.
+    """
+    if not course_columns:
+        return df
+    matrix = df[course_columns].to_numpy()
+    if matrix.dtype == np.uint8 or not _is_whole(matrix) or matrix.min() < 0 or matrix.max() > 100:
+        return df
+    compact = np.asfortranarray(matrix.astype(np.uint8))
+    course_df = pd.DataFrame(compact, index=df.index, columns=course_columns, copy=False)
+    meta_columns = [c for c in df.columns if c not in set(course_columns)]
+    return pd.concat([df[meta_columns], course_df], axis=1)[df.columns]
+
+
+def compact_scores(series):
+    """Smallest unsigned integer dtype for whole-number scores, float32 otherwise."""
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    if len(values) and _is_whole(values) and values.min() >= 0:
+        return pd.to_numeric(series.astype(np.int64), downcast='unsigned')
+    return series.astype(np.float32)
+
+
+def to_category(series):
+    """Categorical for low-cardinality metadata columns (branch, batch, year)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    if series.nunique(dropna=True) > max(len(series) // 2, 1):
+        return series
+    return series.astype('category')
+
+
+def to_count(series):
+    """Nullable small integer for counts such as Courses Started or Rank."""
+    if not is_numeric_dtype(series):
+        return series
+    max_val = series.max()
+    dtype = 'UInt16' if pd.isna(max_val) or max_val <= np.iinfo(np.uint16).max else 'UInt32'
+    return series.astype(dtype)
+
+
+def memory_report(before, after):
+    """
+    Summarise df.memory_usage(deep=True) before/after the dtype plan.
+    Returns a JSON-serialisable dict with totals and per-column rows.
+    """
+    columns = []
+    for col in after.index:
+        if col == 'Index':
+            continue
+        columns.append({
+            'column': str(col),
+            'bytes_before': int(before.get(col, 0)),
+            'bytes_after': int(after[col]),
+        })
+    return {
+        'bytes_before': int(before.sum()),
+        'bytes_after': int(after.sum()),
+        'columns': columns,
+    }
+
+
+def apply_dtype_plan(df, course_columns=None, score_columns=None):
+    """
+    Apply the compact dtype plan to a processed frame.
+    Returns (df, memory_report).
+    """
+    course_columns = course_columns or []
+    score_columns = score_columns or {}
+    before = df.memory_usage(deep=True)
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = to_category(df[col])
+
+    for col in COUNT_COLUMNS:
+        if col in df.columns:
+            df[col] = to_count(df[col])
+
+    pct_columns = PERCENT_COLUMNS + [c for c in df.columns if str(c).endswith('_Percentage')]
+    for col in dict.fromkeys(pct_columns):
+        if col in df.columns and is_float_dtype(df[col]):
+            df[col] = compact_percentages(df[col])
+
+    for col in list(score_columns) + ['Score', 'Total_Max']:
+        if col in df.columns and is_numeric_dtype(df[col]):
+            df[col] = compact_scores(df[col])
+
+    df = compact_course_block(df, course_columns)
+
+    return df, memory_report(before, df.memory_usage(deep=True))
+
+
+def widen_floats(df, decimals=4):
+    """
+    Widen float32 columns to float64 for export, rounded so values read back
+    as written (94.1 rather than 94.0999985) in Excel and JSON.
+    """
+    narrow = [c for c in df.columns if df[c].dtype == np.float32]
+    if not narrow:
+        return df
+    df = df.copy()
+    df[narrow] = df[narrow].astype(np.float64).round(decimals)
+    return df
+
+
+def format_bytes(num_bytes):
+    """Human-readable byte count in MB (or KB for small frames)."""
+    if num_bytes < 1024 * 1024:
+        return f"{num_bytes / 1024:.1f} KB"
+    return f"{num_bytes / (1024 * 1024):.1f} MB"
@@ -0,0 +1,235 @@
+"""
+Excel workbook exports for the Downloads page and the command-line batch job.
+
+Each function writes the workbook through utils.workbook (streaming by
+default) to a temporary file and returns it as bytes, or, given path=, writes
+straight to that file and returns the path. Float32 columns are widened
+before writing so values read back as written.
+"""
+import os
+import tempfile
+
+import pandas as pd
+
+from utils.dtypes import widen_floats
+from utils.workbook import open_workbook
+
+
+def _build(write, *args, path=None):
+    """Run write(book, *args) on a workbook at path, or on a temporary file whose bytes are returned."""
+    target = path
+    if target is None:
+        fd, target = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+    try:
+        with open_workbook(target) as book:
+            write(book, *args)
+        if path is not None:
+            return path
+        with open(target, 'rb') as f:
+            return f.read()
+    finally:
+        if path is None:
+            os.remove(target)
+
+
+def create_excel_report(df, score_columns, path=None):
+    """Assessment workbook: student data, rankings, section toppers and statistics."""
+    return _build(_write_excel_report, widen_floats(df), score_columns, path=path)
+
+
+def _write_excel_report(book, df, score_columns):
+    book.write_frame(df, 'Student_Data')
+
+    # Rankings
+    rankings = df.sort_values('Score', ascending=False)
+    cols = ['Rank', 'Student_Name', 'College_Reg', 'Score', 'Total_Percentage'] if 'Student_Name' in df.columns else ['Rank', 'Score', 'Total_Percentage']
+    cols = [c for c in cols if c in rankings.columns]
+    book.write_frame(rankings[cols], 'Rankings')
+
+    # Section toppers
+    for col_name, max_val in score_columns.items():
+        section = col_name.split('(')[0].strip()[:20]
+        top_20 = df.nlargest(20, col_name)
+        cols = ['Student_Name', col_name] if 'Student_Name' in df.columns else [col_name]
+        cols = [c for c in cols if c in top_20.columns]
+        book.write_frame(top_20[cols], f'Top_{section}')
+
+    # Statistics
+    total_max = df['Total_Max'].iloc[0] if 'Total_Max' in df.columns else 480
+    stats = pd.DataFrame({
+        'Metric': ['Total Students', 'Average Score', 'Highest Score', 'Pass Rate (≥50%)'],
+        'Value': [len(df), f"{df['Score'].mean():.2f}/{total_max}",
+                 f"{df['Score'].max()}/{total_max}",
+                 f"{len(df[df['Total_Percentage'] >= 50])/len(df)*100:.1f}%"]
+    })
+    book.write_frame(stats, 'Statistics')
+
+
+def create_student_assessment_report(df, score_columns, path=None):
+    """Generate Student Assessment Report with multiple sheets:
+    Student_Data, Summary_Statistics, Rankings, Top_<Section> for each section"""
+    return _build(_write_student_assessment_report, widen_floats(df), score_columns, path=path)
+
+
+def _write_student_assessment_report(book, df, score_columns):
+    # === Sheet 1: Student_Data ===
+    student_data = pd.DataFrame()
+
+    # Basic info columns
+    for col in ['Student_Name', 'Email', 'College_Reg', 'Batch', 'Branch']:
+        if col in df.columns:
+            student_data[col] = df[col]
+
+    # Score columns with max values
+    for col_name, max_val in score_columns.items():
+        student_data[col_name] = df[col_name]
+
+    # Total Score
+    if 'Score' in df.columns:
+        student_data['Score'] = df['Score']
+
+    # Additional columns if present
+    for extra_col in ['English', 'Technical MCQ', 'Coding']:
+        if extra_col in df.columns:
+            student_data[extra_col] = df[extra_col]
+
+    # Individual percentage columns for each score column
+    for col_name, max_val in score_columns.items():
+        section_name = col_name.split('(')[0].strip()
+        pct_col = f"{section_name}_Percentage"
+        if pct_col in df.columns:
+            student_data[pct_col] = df[pct_col]
+        elif max_val > 0:
+            student_data[pct_col] = (df[col_name] / max_val * 100).round(2)
+
+    # Total percentage and Rank
+    if 'Total_Percentage' in df.columns:
+        student_data['Total_Percentage'] = df['Total_Percentage']
+    if 'Rank' in df.columns:
+        student_data['Rank'] = df['Rank']
+
+    # Sort by Rank
+    if 'Rank' in student_data.columns:
+        student_data = student_data.sort_values('Rank')
+
+    # === Sheet 2: Summary_Statistics ===
+    stats_data = []
+
+    # General stats
+    stats_data.append({'Metric': 'Total Students', 'Value': str(len(df)), 'Category': 'General'})
+    if 'Score' in df.columns:
+        stats_data.append({'Metric': 'Average Total Score', 'Value': f"{df['Score'].mean():.2f}", 'Category': 'General'})
+    if 'Total_Percentage' in df.columns:
+        stats_data.append({'Metric': 'Average Percentage', 'Value': f"{df['Total_Percentage'].mean():.2f}%", 'Category': 'General'})
+
+    # Section-wise stats
+    for col_name, max_val in score_columns.items():
+        section_name = col_name.split('(')[0].strip()
+        avg_score = df[col_name].mean()
+        max_score = df[col_name].max()
+        std_dev = df[col_name].std()
+
+        stats_data.append({'Metric': f'{section_name} - Average Score', 'Value': f"{avg_score:.2f}/{max_val}", 'Category': section_name})
+        stats_data.append({'Metric': f'{section_name} - Highest Score', 'Value': f"{int(max_score)}/{max_val}", 'Category': section_name})
+        stats_data.append({'Metric': f'{section_name} - Standard Deviation', 'Value': f"{std_dev:.2f}", 'Category': section_name})
+
+    summary_stats = pd.DataFrame(stats_data)
+
+    # === Sheet 3: Rankings ===
+    rankings = df.sort_values('Score', ascending=False).copy()
+    ranking_cols = ['Rank', 'Student_Name', 'College_Reg', 'Score', 'Total_Percentage']
+    ranking_cols = [c for c in ranking_cols if c in rankings.columns]
+    rankings_sheet = rankings[ranking_cols].copy()
+
+    # === Write all sheets ===
+    book.write_frame(student_data, 'Student_Data')
+    book.write_frame(summary_stats, 'Summary_Statistics')
+    book.write_frame(rankings_sheet, 'Rankings')
+
+    # Top performers for each section
+    for col_name, max_val in score_columns.items():
+        section_name = col_name.split('(')[0].strip()
+        pct_col = f"{section_name}_Percentage"
+
+        # Get top 20 for this section
+        top_section = df.nlargest(20, col_name).copy()
+
+        # Build columns for this sheet
+        top_cols = ['Student_Name', col_name]
+        if pct_col in df.columns:
+            top_cols.append(pct_col)
+        elif max_val > 0:
+            top_section[pct_col] = (top_section[col_name] / max_val * 100).round(2)
+            top_cols.append(pct_col)
+
+        top_cols = [c for c in top_cols if c in top_section.columns]
+        book.write_frame(top_section[top_cols], f'Top_{section_name}'[:31])
+
+
+def create_full_student_report(dataset, top_k_courses, path=None):
+    """Generate Full Student Report with all tables in a single sheet"""
+    return _build(_write_full_student_report, dataset, top_k_courses, path=path)
+
+
+def _write_full_student_report(book, dataset, top_k_courses):
+    # Master Student Report
+    master_report = widen_floats(dataset.master_report(top_k_courses))
+
+    # Summary tables
+    started_summary, completed_summary = dataset.summary_tables()
+
+    # Create single sheet with all data
+    current_row = 0
+    sheet_name = 'Full Report'
+
+    # Section 1: Master Student Report
+    title_df = pd.DataFrame({'': ['MASTER STUDENT REPORT']})
+    book.write_frame(title_df, sheet_name, startrow=current_row, header=False)
+    current_row += 1
+
+    book.write_frame(master_report, sheet_name, startrow=current_row)
+    current_row += len(master_report) + 2  # +1 for header, +1 for spacing
+
+    # Section 2: Course Started Summary
+    current_row += 1  # Extra spacing
+    title_df = pd.DataFrame({'': ['COURSE STARTED SUMMARY']})
+    book.write_frame(title_df, sheet_name, startrow=current_row, header=False)
+    current_row += 1
+
+    book.write_frame(started_summary, sheet_name, startrow=current_row)
+    current_row += len(started_summary) + 2
+
+    # Section 3: Course Completed Summary
+    current_row += 1
+    title_df = pd.DataFrame({'': ['COURSE COMPLETED SUMMARY']})
+    book.write_frame(title_df, sheet_name, startrow=current_row, header=False)
+    current_row += 1
+
+    book.write_frame(completed_summary, sheet_name, startrow=current_row)
+    current_row += len(completed_summary) + 2
+
+    # Section 4+: Individual course breakdowns
+    if 'Branch Name' in dataset.df.columns:
+        for course_col in top_k_courses:
+            current_row += 1
+            title_df = pd.DataFrame({'': [f'COURSE: {course_col}']})
+            book.write_frame(title_df, sheet_name, startrow=current_row, header=False)
+            current_row += 1
+
+            course_breakdown = dataset.course_breakdown(course_col)
+            book.write_frame(course_breakdown, sheet_name, startrow=current_row)
+            current_row += len(course_breakdown) + 2
+
+
+def create_recommendations_report(dataset, top_n, path=None):
+    """Course workbook: every student's top_n collaborative-filtering recommendations."""
+    return _build(lambda book: book.write_frame(dataset.batch_recommendations(top_n), 'Recommendations'), path=path)
+
+
+def to_excel(dfs_dict, path=None):
+    """One sheet per {sheet name: frame} entry (names truncated to Excel's 31 characters)."""
+    def write(book):
+        for sheet_name, df_sheet in dfs_dict.items():
+            book.write_frame(df_sheet, sheet_name[:31])
+    return _build(write, path=path)
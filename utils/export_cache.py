@@ -0,0 +1,89 @@
+"""
+Process-wide cache of built download artifacts (workbooks, CSV, JSON, text).
+
+The Downloads page builds an export only when it is asked for and keeps the
+result under (dataset fingerprint, export name, filter / format parameters),
+so the same export of the same data is built once and served to every session
+and rerun. Once the cached artifacts exceed the byte budget, the least
+recently used are evicted.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+DEFAULT_MAX_BYTES = int(float(os.environ.get('DASHBOARD_EXPORT_CACHE_MB', 256)) * 1024 * 1024)
+
+# data is always bytes; seconds is the build time
+Export = namedtuple('Export', ['data', 'nbytes', 'seconds'])
+
+
+def format_size(nbytes):
+    """'12.3 MB', '45.6 KB' or '789 B'."""
+    if nbytes >= 1024 * 1024:
+        return f"{nbytes / (1024 * 1024):.1f} MB"
+    if nbytes >= 1024:
+        return f"{nbytes / 1024:.1f} KB"
+    return f"{nbytes} B"
+
+
+class ExportCache:
+    """Thread-safe LRU cache of built exports, bounded by their total size."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_locks = {}
+
+    def get(self, key):
+        """The cached Export under key, or None."""
+        with self._lock:
+            export = self._entries.get(key)
+            if export is not None:
+                self._entries.move_to_end(key)
+            return export
+
+    def build(self, key, builder):
+        """
+        The Export under key, calling builder() (returning str or bytes) at
+        most once per key even when several sessions ask for it concurrently.
+        """
+        export = self.get(key)
+        if export is not None:
+            return export
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            # Another session may have finished building while we waited
+            export = self.get(key)
+            if export is not None:
+                return export
+
+            start = time.perf_counter()
+            data = builder()
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            export = Export(data, len(data), time.perf_counter() - start)
+
+            with self._lock:
+                self._entries[key] = export
+                self._build_locks.pop(key, None)
+                self._evict()
+            return export
+
+    def _evict(self):
+        """Evict least recently used exports while over budget (caller holds the lock)."""
+        while self._entries and self.total_bytes() > self.max_bytes:
+            self._entries.popitem(last=False)
+
+    def total_bytes(self):
+        return sum(export.nbytes for export in self._entries.values())
+
+    def stats(self):
+        """Snapshot of cache contents: key, size and build time per export."""
+        with self._lock:
+            return [{'key': key, 'bytes': export.nbytes, 'seconds': export.seconds}
+                    for key, export in self._entries.items()]
@@ -0,0 +1,32 @@
+"""
+Dataset fingerprints used as cache keys for derived artifacts.
+
+Cached helpers take their DataFrame as an unhashed `_df` argument, so they key
+on these short hex digests instead: one content hash per upload, computed once
+at load time, plus one hash per filter selection.
+"""
+import hashlib
+import json
+
+FINGERPRINT_BYTES = 16
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+def content_fingerprint(uploaded_file):
+    """Hash the raw bytes of an uploaded file (blake2b, read in 1 MB chunks)."""
+    digest = hashlib.blake2b(digest_size=FINGERPRINT_BYTES)
+    uploaded_file.seek(0)
+    for chunk in iter(lambda: uploaded_file.read(READ_CHUNK_BYTES), b''):
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def filter_fingerprint(**selections):
+    """
+    Hash a filter selection, e.g. filter_fingerprint(branches=[...], years=[...]).
+    Values are serialised with str() so numpy scalars and categories hash stably.
+    """
+    payload = json.dumps(selections, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=FINGERPRINT_BYTES).hexdigest()
+
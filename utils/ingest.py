@@ -0,0 +1,177 @@
+"""
+File ingest helpers for the Student Analytics Dashboard.
+
+Uploaded CSVs are checked for valid UTF-8 (falling back to latin1) before they
+are parsed, so each file is parsed exactly once instead of re-parsing the full
+file for every candidate encoding.
+"""
+import codecs
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.course_block import (CourseCounters, build_course_block,
+                                find_course_columns)
+
+# Used when the bytes are not valid UTF-8; latin1 decodes any byte sequence.
+FALLBACK_ENCODING = 'latin1'
+
+# Bytes validated per step when checking an upload for UTF-8.
+DECODE_BLOCK_BYTES = 1024 * 1024
+
+# Course CSVs larger than this are ingested in row chunks (see stream_course_csv).
+STREAMING_THRESHOLD_BYTES = int(float(os.environ.get('DASHBOARD_STREAM_THRESHOLD_MB', 50)) * 1024 * 1024)
+STREAM_CHUNK_ROWS = 20_000
+
+# Metadata columns coerced to numbers by the course loader
+COURSE_NUMERIC_COLUMNS = ['Courses Started', 'Overall Completion %', 'Courses Completed']
+
+
+def sniff_upload(uploaded_file):
+    """
+    Detect the encoding of an upload: UTF-8 (utf-8-sig with a BOM) if every
+    byte decodes as UTF-8, else latin1. The whole upload is validated, as that
+    is much cheaper than a parse that fails late. Returns (encoding, seconds).
+    """
+    uploaded_file.seek(0)
+    start = time.perf_counter()
+    head = uploaded_file.read(len(codecs.BOM_UTF8))
+    encoding = 'utf-8-sig' if head == codecs.BOM_UTF8 else 'utf-8'
+
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        decoder.decode(head)
+        while True:
+            block = uploaded_file.read(DECODE_BLOCK_BYTES)
+            if not block:
+                break
+            decoder.decode(block)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        encoding = FALLBACK_ENCODING
+
+    uploaded_file.seek(0)
+    return encoding, time.perf_counter() - start
+
+
+def read_csv_once(uploaded_file, **read_kwargs):
+    """
+    Read an uploaded CSV with a single parse.
+    Returns (df, load_info) where load_info records the chosen encoding and
+    the detection / parsing times in seconds.
+    """
+    encoding, detect_seconds = sniff_upload(uploaded_file)
+
+    start = time.perf_counter()
+    uploaded_file.seek(0)
+    df = pd.read_csv(uploaded_file, encoding=encoding, **read_kwargs)
+    parse_seconds = time.perf_counter() - start
+
+    load_info = {
+        'encoding': encoding,
+        'detect_seconds': detect_seconds,
+        'parse_seconds': parse_seconds,
+    }
+    return df, load_info
+
+
+def read_excel_timed(uploaded_file, **read_kwargs):
+    """Read an uploaded Excel workbook, returning (df, load_info) like read_csv_once."""
+    uploaded_file.seek(0)
+    start = time.perf_counter()
+    df = pd.read_excel(uploaded_file, **read_kwargs)
+
+    load_info = {
+        'encoding': None,
+        'detect_seconds': 0.0,
+        'parse_seconds': time.perf_counter() - start,
+    }
+    return df, load_info
+
+
+def format_load_info(load_info):
+    """One-line summary of how a file was ingested, for the sidebar."""
+    if not load_info:
+        return ""
+    encoding = load_info.get('encoding') or 'xlsx'
+    if load_info.get('source') == 'snapshot':
+        return f"Loaded from snapshot ({encoding}) in {load_info.get('parse_seconds', 0):.2f} s"
+    if load_info.get('streamed_chunks'):
+        return (f"Encoding: {encoding} · streamed {load_info['streamed_chunks']} chunks"
+                f" in {load_info.get('parse_seconds', 0):.2f} s")
+    return (f"Encoding: {encoding} · detect {load_info.get('detect_seconds', 0) * 1000:.1f} ms"
+            f" · parse {load_info.get('parse_seconds', 0):.2f} s")
+
+
+def should_stream(uploaded_file):
+    """Large CSV uploads are ingested in row chunks."""
+    size = getattr(uploaded_file, 'size', None)
+    if size is None:
+        return False
+    return not uploaded_file.name.endswith('.xlsx') and size > STREAMING_THRESHOLD_BYTES
+
+
+def _coerce_course_chunk(chunk, course_columns):
+    """Numeric coercion and float32 course block for one chunk of an LMS export."""
+    for col in COURSE_NUMERIC_COLUMNS:
+        if col in chunk.columns:
+            chunk[col] = pd.to_numeric(chunk[col], errors='coerce').fillna(0)
+    return build_course_block(chunk, course_columns)
+
+
+def stream_course_csv(uploaded_file, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    Ingest a large LMS course CSV in row chunks.
+    Each chunk is coerced into a float32 course block and thresholded on its
+    own, and the per-course counters are accumulated as chunks arrive, so the
+    raw text frame and the full-size boolean masks are never materialised.
+    Returns (df, course_columns, load_info); load_info['course_counters']
+    holds the accumulated per-course counters.
+    """
+    encoding, detect_seconds = sniff_upload(uploaded_file)
+
+    start = time.perf_counter()
+    meta_parts = []
+    matrices = []
+    course_columns = None
+    column_order = None
+    counters = None
+    n_chunks = 0
+    # The encoding is settled before streaming, so no chunk is ever parsed twice
+    for chunk in pd.read_csv(uploaded_file, encoding=encoding, chunksize=chunk_rows):
+        if course_columns is None:
+            course_columns = find_course_columns(chunk)
+            counters = CourseCounters(len(course_columns))
+        chunk, matrix = _coerce_course_chunk(chunk, course_columns)
+        counters.update(matrix)
+        column_order = column_order or chunk.columns.tolist()
+        meta_parts.append(chunk.drop(columns=course_columns))
+        matrices.append(matrix)
+        n_chunks += 1
+
+    # Stitch the chunk matrices into one column-major course block
+    n_rows = sum(len(m) for m in matrices)
+    matrix = np.empty((n_rows, len(course_columns or [])), dtype=np.float32, order='F')
+    row = 0
+    while matrices:
+        part = matrices.pop(0)
+        matrix[row:row + len(part)] = part
+        row += len(part)
+
+    meta = pd.concat(meta_parts, ignore_index=True)
+    del meta_parts
+    course_df = pd.DataFrame(matrix, index=meta.index, columns=course_columns, copy=False)
+    df = pd.concat([meta, course_df], axis=1)
+    if df.columns.tolist() != column_order:
+        df = df[column_order]
+
+    load_info = {
+        'encoding': encoding,
+        'detect_seconds': detect_seconds,
+        'parse_seconds': time.perf_counter() - start,
+        'streamed_chunks': n_chunks,
+        'course_counters': counters.to_dict() if counters is not None else None,
+    }
+    return df, course_columns or [], load_info
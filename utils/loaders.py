@@ -0,0 +1,124 @@
+"""
+Load and process uploaded assessment / course files into Datasets.
+
+These loaders take any file-like object with a name (a Streamlit upload or an
+open file) and do not depend on the Streamlit runtime; errors are raised to
+the caller.
+"""
+import io
+import os
+
+import pandas as pd
+
+from utils.analytics import Dataset
+from utils.course_block import find_course_columns, build_course_block
+from utils.data_helpers import detect_score_columns, get_percentage_column
+from utils.dtypes import apply_dtype_plan
+from utils.ingest import read_csv_once, read_excel_timed, should_stream, stream_course_csv
+from utils.snapshot import load_snapshot, save_snapshot
+
+
+class NoScoreColumnsError(ValueError):
+    """Raised when an assessment file has no recognisable score columns."""
+
+
+class LocalFile(io.BufferedReader):
+    """A file on disk opened like a Streamlit upload: binary, with .name and .size."""
+
+    def __init__(self, path):
+        super().__init__(io.FileIO(path, 'rb'))
+        self.size = os.path.getsize(path)
+
+
+def load_assessment_data(uploaded_file, fingerprint):
+    """Load and process assessment/test results data."""
+    # Reuse a processed snapshot of the same upload if one exists
+    snapshot = load_snapshot('assessment', fingerprint)
+    if snapshot is not None:
+        return Dataset('assessment', *snapshot, fingerprint=fingerprint)
+
+    # Choose the encoding by checking the whole upload, then parse the file once
+    df, load_info = read_csv_once(uploaded_file)
+
+    # Detect score columns
+    score_columns = detect_score_columns(df)
+
+    if not score_columns:
+        raise NoScoreColumnsError("No score columns detected. Looking for columns with 'Quants', 'Logical', 'Verbal', etc.")
+
+    # Convert score columns to numeric and fill NaN with 0
+    for col in score_columns.keys():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    # Calculate total score
+    total_max = sum(score_columns.values())
+    df['Score'] = df[list(score_columns.keys())].sum(axis=1).fillna(0)
+    df['Total_Max'] = total_max
+
+    # Calculate percentages (handle division safely)
+    for col, max_val in score_columns.items():
+        df[get_percentage_column(col)] = (df[col] / max_val * 100).fillna(0).round(2)
+
+    df['Total_Percentage'] = (df['Score'] / total_max * 100).fillna(0).round(2)
+
+    # Calculate rank - handle NaN by filling with 0 first, then rank
+    df['Rank'] = df['Score'].rank(method='dense', ascending=False).fillna(0).astype(int)
+
+    # Clean student names if column exists
+    if 'Student_Name' in df.columns:
+        df['Student_Name'] = df['Student_Name'].fillna('Unknown').astype(str).str.title()
+
+    # Compact dtypes: float32/uint8 percentages, categorical metadata, small int counts
+    df, load_info['memory'] = apply_dtype_plan(df, score_columns=score_columns)
+
+    save_snapshot('assessment', fingerprint, df, score_columns, load_info)
+
+    return Dataset('assessment', df, score_columns, load_info, fingerprint)
+
+
+def load_course_data(uploaded_file, fingerprint):
+    """Load and process LMS course progress data."""
+    # Reuse a processed snapshot of the same upload if one exists
+    snapshot = load_snapshot('course', fingerprint)
+    if snapshot is not None:
+        return Dataset('course', *snapshot, fingerprint=fingerprint)
+
+    if should_stream(uploaded_file):
+        # Large CSV exports: coerce and threshold chunk by chunk to bound peak memory
+        df, course_columns, load_info = stream_course_csv(uploaded_file)
+    else:
+        # Check file type
+        if uploaded_file.name.endswith('.xlsx'):
+            df, load_info = read_excel_timed(uploaded_file)
+        else:
+            df, load_info = read_csv_once(uploaded_file)
+
+        # Convert numeric columns
+        numeric_cols = ['Courses Started', 'Overall Completion %', 'Courses Completed']
+        for col in numeric_cols:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+        # Convert the whole course block to one float32 matrix in a single pass
+        # and recalculate Courses Started (>=10%) / Courses Completed (>=90%)
+        course_columns = find_course_columns(df)
+        df, _ = build_course_block(df, course_columns)
+
+    # Compact dtypes: float32/uint8 percentages, categorical metadata, small int counts
+    df, load_info['memory'] = apply_dtype_plan(df, course_columns=course_columns)
+
+    save_snapshot('course', fingerprint, df, course_columns, load_info)
+
+    return Dataset('course', df, course_columns, load_info, fingerprint)
+
+
+LOADERS = {
+    'assessment': load_assessment_data,
+    'course': load_course_data,
+}
+
+
+def load_dataset(kind, uploaded_file, fingerprint):
+    """Load an upload of the given kind ('assessment' or 'course') into a Dataset."""
+    return LOADERS[kind](uploaded_file, fingerprint)
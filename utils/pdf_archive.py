@@ -0,0 +1,113 @@
+"""
+ZIP archives of many students' PDF reports.
+
+Reports are rendered across a PdfRenderPool and written into a ZIP file on
+disk as each one completes, so the archive never has to fit in memory; only
+the PDFs currently in flight between the workers and the writer are held.
+Archives live in DASHBOARD_ARCHIVE_DIR (default: a directory in the system
+temp dir). Whoever builds an archive may remove it; anything left behind (e.g.
+by sessions that ended) is deleted once older than
+DASHBOARD_ARCHIVE_MAX_AGE_HOURS (default 24) the next time an archive is built.
+"""
+import os
+import tempfile
+import time
+import zipfile
+
+from utils.pdf_pool import PdfRenderPool
+from utils.pdf_report import report_filename
+from utils.throughput import ThroughputMeter
+
+ARCHIVE_DIR_ENV = 'DASHBOARD_ARCHIVE_DIR'
+ARCHIVE_MAX_AGE = float(os.environ.get('DASHBOARD_ARCHIVE_MAX_AGE_HOURS', 24)) * 3600
+
+
+def archive_dir():
+    return os.environ.get(ARCHIVE_DIR_ENV) or os.path.join(tempfile.gettempdir(), 'dashboard_archives')
+
+
+def remove_stale_archives(max_age=ARCHIVE_MAX_AGE):
+    """Delete archives in archive_dir() last modified more than max_age seconds ago. Returns how many."""
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(archive_dir()))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.name.endswith('.zip') and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            # Removed concurrently by another session
+            pass
+    return removed
+
+
+def pdf_tasks(df, positions=None):
+    """(row position, unique file name) for every student at positions (default: all)."""
+    if positions is None:
+        positions = range(len(df))
+    names = df['Student_Name'].tolist() if 'Student_Name' in df.columns else ['Student'] * len(df)
+    seen = {}
+    tasks = []
+    for pos in positions:
+        filename = report_filename({'Student_Name': str(names[pos]).replace(os.sep, '_')})
+        count = seen.get(filename, 0)
+        seen[filename] = count + 1
+        if count:
+            # Students sharing a name get numbered files instead of overwriting each other
+            stem, ext = os.path.splitext(filename)
+            filename = f"{stem}_{count + 1}{ext}"
+        tasks.append((int(pos), filename))
+    return tasks
+
+
+def write_report_archive(df, score_columns, positions, path, workers=None, logo_path="logo.png", progress=None):
+    """
+    Render the reports of the students at row positions into a ZIP file at
+    path. progress(meter) is called after every report. Returns a summary
+    dict: reports, failed, errors [(file name, error)], bytes, elapsed, rate,
+    and render time per report (p50 / p90 / p99 / max seconds, or None).
+    """
+    filenames = dict(pdf_tasks(df, positions))
+    meter = ThroughputMeter(len(filenames))
+    render_seconds = []
+    errors = []
+
+    remove_stale_archives()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    try:
+        # PDF streams are already compressed; storing them skips a second, futile deflate pass
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED) as archive, \
+                PdfRenderPool(df, score_columns, workers, logo_path) as pool:
+            for result in pool.render(filenames):
+                if result.error:
+                    errors.append((filenames[result.position], result.error))
+                else:
+                    archive.writestr(filenames[result.position], result.pdf)
+                    render_seconds.append(result.seconds)
+                meter.record(ok=not result.error, latency=result.seconds if not result.error else None)
+                if progress is not None:
+                    progress(meter)
+    except BaseException:
+        # Do not leave a truncated archive behind
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    meter.finish()
+
+    render = None
+    if render_seconds:
+        render = meter.latency_percentiles()
+        render['max'] = max(render_seconds)
+    return {
+        'reports': meter.succeeded,
+        'failed': meter.failed,
+        'errors': errors,
+        'bytes': os.path.getsize(path),
+        'elapsed': meter.elapsed,
+        'rate': meter.rate,
+        'render': render,
+    }
@@ -0,0 +1,108 @@
+"""
+Parallel PDF report rendering.
+
+Student PDF reports are rendered across a pool of worker processes and
+streamed back as they complete, so a sender can start on the first reports
+while the rest are still rendering. Each worker receives the frame once (in
+its initializer) and builds one StudentReportRenderer - styles, logo, class
+statistics and score index - for all its reports; a failure is captured per
+student together with the worker that hit it.
+"""
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from utils.pdf_report import StudentReportRenderer
+
+# Students per task: small enough for results to stream, large enough to amortise IPC
+CHUNK_SIZE = 4
+
+RenderResult = namedtuple('RenderResult', ['position', 'pdf', 'error', 'worker', 'seconds'])
+
+# Per-worker state set by _init_worker
+_worker = {}
+
+
+def default_workers():
+    return max(1, os.cpu_count() or 1)
+
+
+def _mp_context():
+    # Streamlit runs scripts on threads; forking a threaded server is unsafe, so
+    # start workers from a clean process where the platform allows it
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _init_worker(df, score_columns, logo_path):
+    _worker.update(df=df, renderer=StudentReportRenderer(df, score_columns, logo_path))
+
+
+def _render_chunk(positions):
+    """Render the reports of the students at positions. Returns [RenderResult]."""
+    df, renderer = _worker['df'], _worker['renderer']
+    pid = os.getpid()
+    results = []
+    for pos in positions:
+        start = time.perf_counter()
+        try:
+            pdf = renderer.render(df.iloc[pos])
+            results.append(RenderResult(pos, pdf, None, pid, time.perf_counter() - start))
+        except Exception as e:
+            results.append(RenderResult(pos, None, f"{type(e).__name__}: {e}", pid, time.perf_counter() - start))
+    return results
+
+
+class PdfRenderPool:
+    """
+    A process pool rendering student PDF reports of one assessment frame.
+    Use as a context manager; render() yields RenderResults in completion order.
+    """
+
+    def __init__(self, df, score_columns, workers=None, logo_path="logo.png", chunk_size=CHUNK_SIZE):
+        self.workers = max(1, workers or default_workers())
+        self.chunk_size = max(1, chunk_size)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context(),
+                                             initializer=_init_worker,
+                                             initargs=(df, score_columns, logo_path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def render(self, positions, max_pending=None):
+        """
+        Render the reports of the students at row positions, yielding a
+        RenderResult per student as chunks complete. At most max_pending
+        chunks (default: two per worker) are queued at once, so finished PDFs
+        do not pile up ahead of a slow consumer.
+        """
+        positions = list(positions)
+        chunks = [positions[i:i + self.chunk_size] for i in range(0, len(positions), self.chunk_size)]
+        max_pending = max_pending or 2 * self.workers
+        pending = {}
+        next_chunk = 0
+
+        while next_chunk < len(chunks) or pending:
+            while next_chunk < len(chunks) and len(pending) < max_pending:
+                chunk = chunks[next_chunk]
+                pending[self._executor.submit(_render_chunk, chunk)] = chunk
+                next_chunk += 1
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    # The worker died (or the pool broke) before returning the chunk
+                    results = [RenderResult(pos, None, f"worker failed: {type(e).__name__}: {e}", None, 0.0)
+                               for pos in chunk]
+                yield from results
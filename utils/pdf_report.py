@@ -0,0 +1,408 @@
+"""
+Per-student PDF assessment reports (ReportLab, with a vector comparison chart).
+
+StudentReportRenderer prepares everything a dataset's reports share - styles,
+table styles, the logo header, section names and class averages - once, and
+render() fills in one student's content. The section comparison chart is
+drawn with ReportLab graphics, so it stays vector in the PDF instead of an
+embedded raster image. Used by the Email page, the PDF
+render pool and the command-line batch job; nothing here depends on the
+Streamlit runtime.
+"""
+import io
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from reportlab import rl_config
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.shapes import Drawing, Group, String
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from utils.class_stats import ClassStats
+from utils.score_index import ScoreIndex
+
+# ReportLab only has a process-wide ASCII85 switch; it is turned off just while
+# reports build (see _binary_streams) and restored for any other ReportLab code
+_a85_lock = threading.Lock()
+_a85_builds = 0
+_a85_saved = None
+
+# Size of the section comparison chart on the page
+CHART_WIDTH = 5.5 * inch
+CHART_HEIGHT = 3.2 * inch
+
+@contextmanager
+def _binary_streams():
+    """
+    Embed streams as binary while a report builds: ASCII85 only matters for
+    7-bit transports, makes every stream 25% larger and, without ReportLab's C
+    accelerator, its pure-Python encoder is a large share of the render time.
+    Overlapping builds share the override; the last one restores the setting.
+    """
+    global _a85_builds, _a85_saved
+    with _a85_lock:
+        if _a85_builds == 0:
+            _a85_saved = rl_config.useA85
+            rl_config.useA85 = 0
+        _a85_builds += 1
+    try:
+        yield
+    finally:
+        with _a85_lock:
+            _a85_builds -= 1
+            if _a85_builds == 0:
+                rl_config.useA85 = _a85_saved
+
+
+# (minimum Total_Percentage, status, colour), best first
+STATUS_LEVELS = [
+    (80, "EXCELLENT", '#27ae60'),
+    (65, "GOOD", '#3498db'),
+    (50, "AVERAGE", '#f39c12'),
+    (None, "NEEDS IMPROVEMENT", '#e74c3c'),
+]
+
+# Table styles shared by every report; per-student cells are styled on top
+INFO_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#2c3e50')),
+    ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#2c3e50')),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+])
+
+PERF_TABLE_COMMANDS = [
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('FONTSIZE', (0, 1), (-1, 1), 14),
+    ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2874a6')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('TEXTCOLOR', (3, 1), (3, 1), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#bdc3c7')),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ('TOPPADDING', (0, 0), (-1, -1), 12),
+]
+
+SECTION_TABLE_COMMANDS = [
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#bdc3c7')),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
+]
+
+STATS_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8e44ad')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#bdc3c7')),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+])
+
+HEADER_TABLE_STYLE = TableStyle([
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+    ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+])
+
+
+def _status(total_pct):
+    for minimum, status, color in STATUS_LEVELS:
+        if minimum is None or total_pct >= minimum:
+            return status, colors.HexColor(color)
+
+
+class StudentReportRenderer:
+    """
+    Renders the PDF reports of one assessment dataset. Build it once (pass the
+    dataset's ScoreIndex of 'Score' and ClassStats if already at hand) and
+    call render() per student.
+    """
+
+    def __init__(self, df, score_columns, logo_path="logo.png", score_index=None, class_stats=None):
+        self.df = df
+        self.score_columns = score_columns
+        self.n_students = len(df)
+        self.class_stats = class_stats if class_stats is not None else ClassStats(df, score_columns)
+        self.score_index = score_index if score_index is not None else ScoreIndex(df['Score'])
+
+        # Section names and class averages, in score column order
+        self.sections = [col_name.split('(')[0].strip() for col_name in score_columns]
+        self.max_marks = list(score_columns.values())
+        self.class_avgs = self.class_stats.section_mean_pcts()
+
+        styles = getSampleStyleSheet()
+        self.title_style = ParagraphStyle(
+            'CustomTitle', parent=styles['Heading1'], fontSize=24,
+            textColor=colors.HexColor('#1a5276'), alignment=TA_CENTER, spaceAfter=20
+        )
+        self.header_style = ParagraphStyle(
+            'CustomHeader', parent=styles['Heading2'], fontSize=14,
+            textColor=colors.HexColor('#2874a6'), spaceBefore=15, spaceAfter=10
+        )
+        self.normal_style = ParagraphStyle(
+            'CustomNormal', parent=styles['Normal'], fontSize=11, spaceAfter=6
+        )
+        self.footer_style = ParagraphStyle(
+            'Footer', parent=styles['Normal'], fontSize=9,
+            textColor=colors.HexColor('#7f8c8d'), alignment=TA_CENTER
+        )
+
+        # The logo is read from disk once; the header flowable is reused by every report
+        self.header = self._header(logo_path)
+        # Shared flowables are laid out during build, so one report at a time per renderer
+        self._lock = threading.Lock()
+
+    def _header(self, logo_path):
+        """Title with the logo on the right, or just the title without a (readable) logo."""
+        try:
+            if logo_path and os.path.exists(logo_path):
+                with open(logo_path, 'rb') as f:
+                    logo = Image(io.BytesIO(f.read()), width=1.2*inch, height=0.6*inch)
+                logo.hAlign = 'RIGHT'
+
+                header_title = Paragraph("Student Assessment Report", self.title_style)
+                header_table = Table([[header_title, logo]], colWidths=[5.5*inch, 1.5*inch])
+                header_table.setStyle(HEADER_TABLE_STYLE)
+                return header_table
+        except Exception:
+            pass
+        return Paragraph("Student Assessment Report", self.title_style)
+
+    def _chart(self, student_name, student_pcts):
+        """Section comparison bar chart (student vs class average) as vector graphics."""
+        drawing = Drawing(CHART_WIDTH, CHART_HEIGHT)
+        drawing.add(String(CHART_WIDTH / 2, CHART_HEIGHT - 14, 'Your Performance vs Class Average',
+                           textAnchor='middle', fontName='Helvetica', fontSize=13,
+                           fillColor=colors.HexColor('#2c3e50')))
+
+        chart = VerticalBarChart()
+        chart.x, chart.y = 48, 50
+        chart.width, chart.height = CHART_WIDTH - 64, CHART_HEIGHT - 90
+        chart.data = [student_pcts, self.class_avgs]
+        chart.groupSpacing = 12
+        chart.barSpacing = 2
+        chart.bars.strokeColor = None
+        chart.bars[0].fillColor = colors.HexColor('#3498db')
+        chart.bars[1].fillColor = colors.HexColor('#95a5a6')
+
+        # Value labels above the bars
+        chart.barLabelFormat = '%.1f%%'
+        chart.barLabels.nudge = 6
+        chart.barLabels.fontName = 'Helvetica'
+        chart.barLabels.fontSize = 7
+        chart.barLabels[0].fillColor = colors.HexColor('#2c3e50')
+        chart.barLabels[1].fillColor = colors.HexColor('#7f8c8d')
+
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.valueMax = 110
+        chart.valueAxis.valueSteps = [0, 20, 40, 60, 80, 100]
+        chart.valueAxis.labels.fontName = 'Helvetica'
+        chart.valueAxis.labels.fontSize = 8
+        chart.valueAxis.visibleGrid = True
+        chart.valueAxis.gridStrokeColor = colors.HexColor('#e5e8e8')
+        chart.valueAxis.strokeColor = colors.HexColor('#7f8c8d')
+
+        chart.categoryAxis.categoryNames = self.sections
+        chart.categoryAxis.labels.fontName = 'Helvetica'
+        chart.categoryAxis.labels.fontSize = 9
+        chart.categoryAxis.labels.dy = -4
+        chart.categoryAxis.strokeColor = colors.HexColor('#7f8c8d')
+        drawing.add(chart)
+
+        # Rotated y-axis title
+        y_title = Group(String(0, 0, 'Percentage (%)', textAnchor='middle', fontName='Helvetica', fontSize=9))
+        y_title.transform = (0, 1, -1, 0, 14, chart.y + chart.height / 2)
+        drawing.add(y_title)
+
+        legend = Legend()
+        legend.x, legend.y = CHART_WIDTH / 2, 10
+        legend.boxAnchor = 's'
+        legend.alignment = 'right'
+        legend.columnMaximum = 1
+        legend.deltax = 110
+        legend.dx = legend.dy = 8
+        legend.fontName = 'Helvetica'
+        legend.fontSize = 9
+        legend.strokeColor = None
+        legend.colorNamePairs = [(chart.bars[0].fillColor, str(student_name)),
+                                 (chart.bars[1].fillColor, 'Class Average')]
+        drawing.add(legend)
+        return drawing
+
+    def render(self, student_data):
+        """PDF report of one student (a row of the dataset), as bytes."""
+        header_style, normal_style = self.header_style, self.normal_style
+
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
+        story = [self.header, Spacer(1, 10)]
+
+        # Student Info Box
+        student_name = student_data.get('Student_Name', 'N/A')
+        total_max = student_data.get('Total_Max', 480)
+        total_pct = student_data['Total_Percentage']
+        rank = int(student_data['Rank'])
+        status, status_color = _status(total_pct)
+
+        # Student details table
+        story.append(Paragraph("Student Information", header_style))
+
+        info_data = [
+            ['Name:', student_name, 'Registration:', student_data.get('College_Reg', 'N/A')],
+            ['Email:', student_data.get('Email', 'N/A'), 'Batch:', str(student_data.get('Batch', 'N/A'))],
+            ['Branch:', student_data.get('Branch', 'N/A'), 'Report Date:', datetime.now().strftime('%d %b %Y')]
+        ]
+
+        info_table = Table(info_data, colWidths=[1.2*inch, 2.3*inch, 1.2*inch, 2.3*inch])
+        info_table.setStyle(INFO_TABLE_STYLE)
+        story.append(info_table)
+        story.append(Spacer(1, 15))
+
+        # Performance Summary Box
+        story.append(Paragraph("Performance Summary", header_style))
+
+        perf_data = [
+            ['Overall Score', 'Percentage', 'Rank', 'Status'],
+            [f"{int(student_data['Score'])}/{total_max}", f"{total_pct:.1f}%",
+             f"{rank} of {self.n_students}", status]
+        ]
+
+        perf_table = Table(perf_data, colWidths=[1.5*inch, 1.5*inch, 1.4*inch, 2.4*inch])
+        perf_table.setStyle(TableStyle(PERF_TABLE_COMMANDS + [('BACKGROUND', (3, 1), (3, 1), status_color)]))
+        story.append(perf_table)
+        story.append(Spacer(1, 20))
+
+        # Section-wise Performance
+        story.append(Paragraph("Section-wise Performance", header_style))
+
+        scores = [student_data[col_name] for col_name in self.score_columns]
+        student_pcts = [(score / max_val) * 100 for score, max_val in zip(scores, self.max_marks)]
+
+        try:
+            story.append(self._chart(student_name, student_pcts))
+        except Exception as e:
+            # If chart generation fails, add a note
+            story.append(Paragraph(f"<i>(Chart could not be generated: {str(e)[:50]})</i>", normal_style))
+
+        story.append(Spacer(1, 15))
+
+        # Section details table
+        section_rows = [['Section', 'Score', 'Your %', 'Class Avg', 'Difference']]
+        table_style = list(SECTION_TABLE_COMMANDS)
+
+        for i, (section_name, score, max_val, pct, class_avg) in enumerate(
+                zip(self.sections, scores, self.max_marks, student_pcts, self.class_avgs), start=1):
+            diff = pct - class_avg
+            diff_str = f"+{diff:.1f}%" if diff >= 0 else f"{diff:.1f}%"
+            section_rows.append([section_name, f"{int(score)}/{max_val}", f"{pct:.1f}%", f"{class_avg:.1f}%", diff_str])
+
+            # Color code the Difference column
+            diff_val = float(diff_str.replace('%', '').replace('+', ''))
+            if diff_val >= 5:
+                table_style.append(('BACKGROUND', (4, i), (4, i), colors.HexColor('#d4edda')))
+                table_style.append(('TEXTCOLOR', (4, i), (4, i), colors.HexColor('#155724')))
+            elif diff_val <= -5:
+                table_style.append(('BACKGROUND', (4, i), (4, i), colors.HexColor('#f8d7da')))
+                table_style.append(('TEXTCOLOR', (4, i), (4, i), colors.HexColor('#721c24')))
+
+        section_table = Table(section_rows, colWidths=[1.5*inch, 1.2*inch, 1.1*inch, 1.1*inch, 1.1*inch])
+        section_table.setStyle(TableStyle(table_style))
+        story.append(section_table)
+        story.append(Spacer(1, 20))
+
+        # Strengths and Areas for Improvement
+        story.append(Paragraph("Analysis & Recommendations", header_style))
+
+        strengths = []
+        improvements = []
+
+        for section_name, student_pct, class_avg in zip(self.sections, student_pcts, self.class_avgs):
+            if student_pct > class_avg:
+                strengths.append(f"• {section_name}: {student_pct:.1f}% (above class average of {class_avg:.1f}%)")
+            else:
+                gap = class_avg - student_pct
+                improvements.append(f"• {section_name}: {gap:.1f}% below class average - focus on practice")
+
+        if strengths:
+            story.append(Paragraph("<b>Strengths:</b>", normal_style))
+            for s in strengths:
+                story.append(Paragraph(f'<font color="#27ae60">{s}</font>', normal_style))
+
+        if improvements:
+            story.append(Spacer(1, 10))
+            story.append(Paragraph("<b>Areas for Improvement:</b>", normal_style))
+            for imp in improvements:
+                story.append(Paragraph(f'<font color="#e74c3c">{imp}</font>', normal_style))
+
+        if not improvements:
+            story.append(Paragraph('<font color="#27ae60">Excellent! Above class average in all sections.</font>', normal_style))
+
+        story.append(Spacer(1, 20))
+
+        # Percentile Information
+        percentile = self.score_index.percentile(student_data['Score'])
+
+        story.append(Paragraph("Statistical Position", header_style))
+
+        stats_data = [
+            ['Percentile Rank', 'Top %', 'Students Scored Lower', 'Students Scored Higher'],
+            [f"{percentile:.1f}th", f"Top {100-percentile:.1f}%",
+             str(self.score_index.count_below(student_data['Score'])),
+             str(self.score_index.count_above(student_data['Score']))]
+        ]
+
+        stats_table = Table(stats_data, colWidths=[1.7*inch, 1.7*inch, 1.7*inch, 1.7*inch])
+        stats_table.setStyle(STATS_TABLE_STYLE)
+        story.append(stats_table)
+
+        story.append(Spacer(1, 30))
+
+        # Footer
+        story.append(Paragraph("─" * 80, self.footer_style))
+        story.append(Paragraph(f"Report generated on {datetime.now().strftime('%d %B %Y at %H:%M')}", self.footer_style))
+        story.append(Paragraph("This is an automated report. For queries, contact the assessment team.", self.footer_style))
+
+        # Build PDF
+        with self._lock, _binary_streams():
+            doc.build(story)
+        return buffer.getvalue()
+
+
+def generate_student_pdf_report(student_data, df, score_columns, logo_path="logo.png",
+                                score_index=None, class_stats=None):
+    """
+    Generate a professional PDF report for a student. One-off convenience
+    around StudentReportRenderer; when rendering many reports, build the
+    renderer once (Dataset.pdf_renderer()) and call its render().
+    """
+    renderer = StudentReportRenderer(df, score_columns, logo_path, score_index=score_index, class_stats=class_stats)
+    return renderer.render(student_data)
+
+
+def report_filename(student_data):
+    """Attachment / file name of a student's PDF report."""
+    student_name = str(student_data.get('Student_Name', 'Student'))
+    return f"Assessment_Report_{student_name.replace(' ', '_')}.pdf"
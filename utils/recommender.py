@@ -0,0 +1,110 @@
+"""
+Item-based collaborative-filtering course recommender.
+
+Course-to-course cosine similarity is derived once per dataset from the
+co-enrollment counts. A student's unseen courses are scored by the summed
+similarity to the courses they started, plus a small branch-popularity prior
+that breaks ties and covers students with no started courses yet. Scoring
+every student at once is a blocked (students x courses) @ (courses x courses)
+matrix product.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.course_block import STARTED_THRESHOLD
+
+# Weight of the branch-popularity prior relative to one unit of similarity
+PRIOR_WEIGHT = 1e-3
+
+# Students scored per block in batch mode (bounds the float32 score matrix)
+SCORE_BLOCK_CELLS = 8 * 1024 * 1024
+
+
+class CourseRecommender:
+    """
+    Item-item recommender over the courses of a CoEnrollment. Only those
+    (popular) courses are recommended or used as evidence. Student rows are
+    given over all course columns of the branch index.
+    """
+
+    def __init__(self, co_enrollment, branch_index):
+        self.courses = co_enrollment.courses
+        column_pos = {course: i for i, course in enumerate(branch_index.course_columns)}
+        self.positions = np.array([column_pos[course] for course in self.courses], dtype=np.int64)
+        totals = co_enrollment.totals.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarity = co_enrollment.counts / np.sqrt(np.outer(totals, totals))
+        similarity = np.nan_to_num(similarity, nan=0.0, posinf=0.0)
+        np.fill_diagonal(similarity, 0)
+        self.similarity = similarity.astype(np.float32)
+
+        # Branch enrollment of the same courses, scaled to [0, 1] per branch
+        branch_counts = branch_index.counts[:, self.positions].astype(np.float32)
+        peak = branch_counts.max(axis=1, keepdims=True) if len(self.positions) else np.ones((len(branch_counts), 1))
+        self.prior = np.divide(branch_counts, peak, out=np.zeros_like(branch_counts), where=peak > 0) * PRIOR_WEIGHT
+        self._branch_pos = {branch: i for i, branch in enumerate(branch_index.branches)}
+
+    def _branch_prior(self, branch):
+        pos = self._branch_pos.get(branch)
+        if pos is None:
+            return np.zeros(len(self.courses), dtype=np.float32)
+        return self.prior[pos]
+
+    def recommend(self, course_values, branch, top_n=10):
+        """
+        Top_n unseen courses for one student, given their row of the course
+        matrix. Returns a frame of Course, Score and the started course that
+        contributed most ('Because Of').
+        """
+        started = np.asarray(course_values)[self.positions] >= STARTED_THRESHOLD
+        evidence = self.similarity[started]
+        scores = evidence.sum(axis=0) + self._branch_prior(branch)
+        scores[started] = -np.inf
+
+        n = min(top_n, int((~started).sum()))
+        top = np.argpartition(-scores, n - 1)[:n] if n else np.empty(0, dtype=int)
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        names = np.array(self.courses, dtype=object)
+        if evidence.shape[0]:
+            because = names[np.flatnonzero(started)][evidence[:, top].argmax(axis=0)]
+            because = np.where(evidence[:, top].max(axis=0) > 0, because, 'Popular in branch')
+        else:
+            because = np.full(len(top), 'Popular in branch', dtype=object)
+        return pd.DataFrame({
+            'Course': names[top],
+            'Score': scores[top].round(4),
+            'Because Of': because,
+        })
+
+    def recommend_all(self, matrix, branch_codes, top_n=5):
+        """
+        Top_n unseen courses for every student of a course matrix (students x
+        all course columns); branch_codes index the branch index's branches
+        (-1 for none). Returns (positions in self.courses, scores), both
+        (students x top_n), with -1 / -inf where fewer courses remain.
+        """
+        n_rows, n_courses = matrix.shape[0], len(self.courses)
+        top_n = min(top_n, n_courses)
+        positions = np.full((n_rows, top_n), -1, dtype=np.int64)
+        scores = np.full((n_rows, top_n), -np.inf, dtype=np.float32)
+        if not top_n:
+            return positions, scores
+
+        prior = np.vstack([self.prior, np.zeros((1, n_courses), dtype=np.float32)])
+        step = max(1, SCORE_BLOCK_CELLS // n_courses)
+        for start in range(0, n_rows, step):
+            started = matrix[start:start + step][:, self.positions] >= STARTED_THRESHOLD
+            block = started.astype(np.float32) @ self.similarity
+            block += prior[branch_codes[start:start + step]]
+            block[started] = -np.inf
+
+            top = np.argpartition(-block, top_n - 1, axis=1)[:, :top_n]
+            top_scores = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            positions[start:start + step] = np.where(np.isfinite(top_scores), top, -1)
+            scores[start:start + step] = top_scores
+        return positions, scores
@@ -0,0 +1,157 @@
+"""
+Process-wide registry of processed datasets shared across browser sessions.
+
+Each processed Dataset is held once, keyed by (kind, content fingerprint), and
+sessions keep only a DatasetHandle. Entries are reference counted by the
+handles pointing at them; unreferenced entries stay cached until the registry
+exceeds its entry or byte budget, then the least recently used are evicted.
+
+Registered frames are shared between sessions and must be treated as
+read-only - derive new frames instead of assigning columns in place.
+"""
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get('DASHBOARD_REGISTRY_MAX_DATASETS', 8))
+DEFAULT_MAX_BYTES = int(float(os.environ.get('DASHBOARD_REGISTRY_MAX_MB', 2048)) * 1024 * 1024)
+
+
+class _Entry:
+    """One registered dataset and its size."""
+
+    def __init__(self, value, nbytes):
+        self.value = value
+        self.nbytes = nbytes
+        self.refcount = 0
+
+
+class DatasetHandle:
+    """
+    A session's reference to a registered dataset. Released explicitly when the
+    session switches datasets, or automatically when the handle is collected.
+    """
+
+    def __init__(self, registry, key):
+        self.key = key
+        self._registry = registry
+        self._finalizer = weakref.finalize(self, registry.release, key)
+
+    @property
+    def kind(self):
+        return self.key[0]
+
+    @property
+    def fingerprint(self):
+        return self.key[1]
+
+    @property
+    def alive(self):
+        return self._finalizer.alive
+
+    @property
+    def value(self):
+        """The shared Dataset."""
+        return self._registry._entry(self.key).value
+
+    def release(self):
+        """Drop this handle's reference (idempotent)."""
+        self._finalizer()
+
+
+class DatasetRegistry:
+    """Thread-safe LRU registry of processed datasets with reference counting."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> [lock, number of threads holding or waiting on it]
+        self._load_locks = {}
+
+    def _entry(self, key):
+        with self._lock:
+            return self._entries[key]
+
+    def acquire(self, key):
+        """Handle to an already registered dataset, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.refcount += 1
+            self._entries.move_to_end(key)
+        return DatasetHandle(self, key)
+
+    def get_or_load(self, key, loader, sizeof=None):
+        """
+        Handle to the dataset under `key`. Concurrent callers for the same key
+        run `loader()` one at a time, and once a load succeeds the others reuse
+        it. The loader returns a Dataset; None is not registered and
+        get_or_load returns None. A load that returns None or raises is not
+        remembered, so the next waiting caller tries its own loader.
+        """
+        handle = self.acquire(key)
+        if handle is not None:
+            return handle
+
+        with self._lock:
+            slot = self._load_locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+
+        try:
+            with slot[0]:
+                # Another session may have finished loading while we waited
+                handle = self.acquire(key)
+                if handle is not None:
+                    return handle
+
+                value = loader()
+                if value is None:
+                    return None
+                nbytes = sizeof(value) if sizeof else value.nbytes
+
+                # Registered already referenced, so no concurrent eviction can drop it
+                entry = _Entry(value, nbytes)
+                entry.refcount = 1
+                with self._lock:
+                    self._entries[key] = entry
+                    handle = DatasetHandle(self, key)
+        finally:
+            # The last caller to leave removes the lock, so everyone else shares it
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    del self._load_locks[key]
+        self._evict()
+        return handle
+
+    def release(self, key):
+        """Drop one reference; called by DatasetHandle."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.refcount > 0:
+                entry.refcount -= 1
+        self._evict()
+
+    def _evict(self):
+        """Evict least recently used unreferenced entries while over budget."""
+        with self._lock:
+            for key in list(self._entries):
+                if len(self._entries) <= self.max_entries and self.total_bytes() <= self.max_bytes:
+                    break
+                if self._entries[key].refcount == 0:
+                    del self._entries[key]
+
+    def total_bytes(self):
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def stats(self):
+        """Snapshot of registry contents: key, refcount and size per entry."""
+        with self._lock:
+            return [
+                {'kind': key[0], 'fingerprint': key[1], 'refcount': entry.refcount, 'bytes': entry.nbytes}
+                for key, entry in self._entries.items()
+            ]
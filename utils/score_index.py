@@ -0,0 +1,51 @@
+"""
+Sorted score index for assessment data.
+
+One score column (the total or a section) of a dataset, or of a batch /
+branch subset of it, is sorted once; percentile, rank and "top X%" lookups
+for any score are then binary searches instead of a comparison over the
+whole column.
+"""
+import math
+
+import numpy as np
+
+
+class ScoreIndex:
+    """Sorted copy of one score column."""
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.sorted = np.sort(values[~np.isnan(values)])
+        # Missing scores count towards the population, as in (df[col] < x).sum() / len(df)
+        self.n = len(values)
+
+    def __len__(self):
+        return self.n
+
+    def count_below(self, score):
+        """Number of students who scored strictly lower."""
+        return int(np.searchsorted(self.sorted, score, side='left'))
+
+    def count_above(self, score):
+        """Number of students who scored strictly higher."""
+        return len(self.sorted) - int(np.searchsorted(self.sorted, score, side='right'))
+
+    def percentile(self, score):
+        """Percentage of students who scored strictly lower."""
+        return self.count_below(score) / self.n * 100 if self.n else 0.0
+
+    def top_percent(self, score):
+        """The 'Top X%' a score falls in (100 - percentile)."""
+        return 100 - self.percentile(score)
+
+    def rank(self, score):
+        """Competition rank (1 + number of students who scored higher)."""
+        return self.count_above(score) + 1
+
+    def cutoff(self, top_pct):
+        """Lowest score that is still within the top top_pct% of students."""
+        if not len(self.sorted):
+            return None
+        count = min(max(math.ceil(self.n * top_pct / 100), 1), len(self.sorted))
+        return float(self.sorted[-count])
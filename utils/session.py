@@ -0,0 +1,71 @@
+"""
+Session-side access to datasets held in the shared registry.
+
+app.py loads uploads through load_session_dataset(); pages read the current
+Dataset back with get_session_dataset(). The session itself only stores a
+DatasetHandle under st.session_state["dataset_handle"].
+"""
+import streamlit as st
+
+from utils.bulk_send import JobRegistry
+from utils.export_cache import ExportCache
+from utils.registry import DatasetRegistry
+
+
+@st.cache_resource
+def get_registry():
+    """The process-wide dataset registry (one per server process)."""
+    return DatasetRegistry()
+
+
+@st.cache_resource
+def get_job_registry():
+    """The process-wide registry of background bulk email jobs."""
+    return JobRegistry()
+
+
+@st.cache_resource
+def get_export_cache():
+    """The process-wide cache of built Downloads-page exports."""
+    return ExportCache()
+
+
+def load_session_dataset(kind, fingerprint, loader):
+    """
+    Point this session at the dataset (kind, fingerprint), loading it through
+    the shared registry if no session has yet. Returns the Dataset, or None if
+    loading failed.
+    """
+    key = (kind, fingerprint)
+    handle = st.session_state.get("dataset_handle")
+    if handle is not None and handle.alive and handle.key == key:
+        return handle.value
+
+    new_handle = get_registry().get_or_load(key, loader)
+    if new_handle is None:
+        return None
+
+    if handle is not None:
+        handle.release()
+    st.session_state["dataset_handle"] = new_handle
+    st.session_state["data_mode"] = kind
+    st.session_state["dataset_fingerprint"] = fingerprint
+    return new_handle.value
+
+
+def get_session_handle(kind=None):
+    """The session's DatasetHandle (optionally only if it is of `kind`), or None."""
+    handle = st.session_state.get("dataset_handle")
+    if handle is None or not handle.alive:
+        return None
+    if kind is not None and handle.kind != kind:
+        return None
+    return handle
+
+
+def get_session_dataset(kind):
+    """The session's Dataset if it is of `kind`, else None."""
+    handle = get_session_handle(kind)
+    if handle is None:
+        return None
+    return handle.value
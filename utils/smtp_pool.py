@@ -0,0 +1,153 @@
+"""
+Pooled SMTP sessions for sending many emails.
+
+Opening an SMTP connection costs a TCP connect, EHLO, STARTTLS and a login,
+which is more than sending one message. SmtpPool keeps authenticated
+connections open and hands them out to senders (up to `connections` at once,
+from any thread), retires a connection after `max_messages` messages, and
+reconnects transparently when the server has dropped an idle one.
+"""
+import smtplib
+import threading
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+DEFAULT_HOST = 'smtp.gmail.com'
+DEFAULT_PORT = 587
+# Providers typically cap messages per session (Gmail closes after ~100)
+DEFAULT_MAX_MESSAGES = 100
+DEFAULT_TIMEOUT = 30
+
+# Errors meaning the connection itself is gone, as opposed to a rejected message
+DISCONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+
+def build_message(sender_email, sender_name, to_email, subject, body, pdf_data=None, pdf_filename=None):
+    """Plain-text email with an optional PDF attachment."""
+    msg = MIMEMultipart()
+    msg['From'] = f"{sender_name} <{sender_email}>"
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+
+    if pdf_data:
+        pdf_attachment = MIMEApplication(pdf_data, _subtype='pdf')
+        pdf_attachment.add_header('Content-Disposition', 'attachment', filename=pdf_filename)
+        msg.attach(pdf_attachment)
+    return msg
+
+
+class _Session:
+    """One open SMTP connection and the number of messages sent over it."""
+
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.sent = 0
+
+    def close(self):
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self.smtp.close()
+
+
+class SmtpPool:
+    """
+    Thread-safe pool of authenticated SMTP connections. Connections are opened
+    lazily by send(); use as a context manager (or call close()) to quit them.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, username=None, password=None,
+                 starttls=True, connections=1, max_messages=DEFAULT_MAX_MESSAGES, timeout=DEFAULT_TIMEOUT):
+        self.host, self.port = host, int(port)
+        self.username, self.password = username, password
+        self.starttls = starttls
+        self.connections = max(1, int(connections))
+        self.max_messages = max(1, int(max_messages))
+        self.timeout = timeout
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.connections)
+        self._closed = False
+        # Counters, e.g. to compare handshakes against messages sent
+        self.opened = 0
+        self.reconnects = 0
+        self.sent = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls()
+                smtp.ehlo()
+            # Local relays and test servers often take mail without authentication
+            if self.password and smtp.has_extn('auth'):
+                smtp.login(self.username, self.password)
+        except BaseException:
+            smtp.close()
+            raise
+        with self._lock:
+            self.opened += 1
+        return _Session(smtp)
+
+    def _checkout(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SMTP pool is closed")
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def _checkin(self, session):
+        with self._lock:
+            if not self._closed and session.sent < self.max_messages:
+                self._idle.append(session)
+                return
+        session.close()
+
+    def send(self, msg):
+        """
+        Send one email.message.Message over a pooled connection. Blocks while
+        all connections are busy. If the connection turns out to have been
+        dropped, it is replaced and the message is sent once more; any other
+        SMTP error is raised to the caller.
+        """
+        with self._slots:
+            session = self._checkout()
+            try:
+                try:
+                    session.smtp.send_message(msg)
+                except DISCONNECT_ERRORS:
+                    session.smtp.close()
+                    session = self._connect()
+                    with self._lock:
+                        self.reconnects += 1
+                    session.smtp.send_message(msg)
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # The server refused this message; the connection is still usable
+                self._checkin(session)
+                raise
+            except BaseException:
+                session.smtp.close()
+                raise
+            session.sent += 1
+            with self._lock:
+                self.sent += 1
+            self._checkin(session)
+
+    def close(self):
+        """Quit every idle connection; connections in use are quit when returned."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for session in idle:
+            session.close()
@@ -0,0 +1,104 @@
+"""
+Optional on-disk snapshots of processed datasets.
+
+After a loader has finished coercing and recalculating a frame, it can be saved
+as an uncompressed Arrow IPC (Feather v2) file keyed by the upload's content
+fingerprint. A repeat upload of the same file, or a server restart, then
+memory-maps the snapshot instead of re-running the CSV/Excel path.
+
+Snapshots are enabled by setting DASHBOARD_SNAPSHOT_DIR and require pyarrow.
+"""
+import json
+import os
+import time
+
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+SNAPSHOT_DIR_ENV = 'DASHBOARD_SNAPSHOT_DIR'
+
+# Bump whenever the loaders change how a processed frame is built, so stale
+# snapshots are ignored instead of served.
+SNAPSHOT_VERSION = 4
+
+METADATA_KEY = b'dashboard_snapshot'
+
+
+def get_snapshot_dir():
+    """Configured snapshot directory, or None when snapshots are disabled."""
+    if not HAS_PYARROW:
+        return None
+    return os.environ.get(SNAPSHOT_DIR_ENV) or None
+
+
+def snapshot_path(kind, fingerprint, snapshot_dir):
+    """Path of the snapshot for a dataset kind ('assessment' / 'course') and fingerprint."""
+    return os.path.join(snapshot_dir, f"{kind}_{fingerprint}.arrow")
+
+
+def save_snapshot(kind, fingerprint, df, columns, load_info=None):
+    """
+    Write a processed frame plus its detected columns to the snapshot store.
+    Returns the snapshot path, or None if snapshots are disabled or the frame
+    cannot be represented in Arrow (e.g. mixed-type object columns).
+    """
+    snapshot_dir = get_snapshot_dir()
+    if snapshot_dir is None or not fingerprint:
+        return None
+
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[METADATA_KEY] = json.dumps({
+            'version': SNAPSHOT_VERSION,
+            'columns': columns,
+            'load_info': load_info or {},
+        }, default=str).encode('utf-8')
+        table = table.replace_schema_metadata(metadata)
+
+        path = snapshot_path(kind, fingerprint, snapshot_dir)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        # Atomic rename so concurrent sessions never see a half-written file
+        os.replace(tmp_path, path)
+        return path
+    except Exception:
+        return None
+
+
+def load_snapshot(kind, fingerprint):
+    """
+    Memory-map a snapshot written by save_snapshot.
+    Returns (df, columns, load_info) or None when there is no usable snapshot.
+    """
+    snapshot_dir = get_snapshot_dir()
+    if snapshot_dir is None or not fingerprint:
+        return None
+
+    path = snapshot_path(kind, fingerprint, snapshot_dir)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        start = time.perf_counter()
+        with pa.memory_map(path, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+        info = json.loads(table.schema.metadata[METADATA_KEY])
+        if info.get('version') != SNAPSHOT_VERSION:
+            return None
+
+        # split_blocks keeps numeric columns as zero-copy views of the mapped buffers
+        df = table.to_pandas(split_blocks=True)
+        load_info = dict(info.get('load_info') or {})
+        load_info['source'] = 'snapshot'
+        load_info['detect_seconds'] = 0.0
+        load_info['parse_seconds'] = time.perf_counter() - start
+        return df, info['columns'], load_info
+    except Exception:
+        return None
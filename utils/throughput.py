@@ -0,0 +1,82 @@
+"""
+Throughput / ETA meter for long-running batch work (PDF rendering, bulk email).
+"""
+import threading
+import time
+
+import numpy as np
+
+
+def format_duration(seconds):
+    """'1h 02m', '3m 05s' or '12s'."""
+    if seconds is None:
+        return "—"
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ThroughputMeter:
+    """
+    Counts finished items of a batch of known size and derives rate and ETA,
+    plus latency percentiles of the items recorded with a latency. Thread-safe.
+    """
+
+    def __init__(self, total):
+        self.total = total
+        self.succeeded = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+        self.finished = None
+        self._latencies = []
+        self._lock = threading.Lock()
+
+    def record(self, ok=True, latency=None):
+        with self._lock:
+            if ok:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            if latency is not None:
+                self._latencies.append(latency)
+
+    def finish(self):
+        """Stop the clock, so rate and elapsed time stay those of the finished batch."""
+        self.finished = time.perf_counter()
+
+    def latency_percentiles(self, percentiles=(50, 90, 99)):
+        """{percentile: seconds} of the recorded latencies, or None before the first one."""
+        with self._lock:
+            if not self._latencies:
+                return None
+            values = np.percentile(self._latencies, percentiles)
+        return dict(zip(percentiles, values.tolist()))
+
+    @property
+    def done(self):
+        return self.succeeded + self.failed
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rate(self):
+        """Items finished per second so far."""
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Seconds until the batch finishes at the current rate (None before the first item)."""
+        rate = self.rate
+        if not rate:
+            return None
+        return (self.total - self.done) / rate
+
+    def summary(self, unit="items"):
+        return (f"{self.done}/{self.total} · {self.rate:.1f} {unit}/s · "
+                f"elapsed {format_duration(self.elapsed)} · ETA {format_duration(self.eta)}")
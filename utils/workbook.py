@@ -0,0 +1,103 @@
+"""
+Writing data frames into .xlsx files.
+
+The default engine streams rows through xlsxwriter's constant-memory mode:
+each row goes to a temporary file as soon as the next one is started, so
+memory stays flat however many rows a sheet has. pandas' to_excel writes
+cells column by column, which that mode cannot take, so rows are written
+here directly. The price is that every sheet must be written top to bottom.
+
+DASHBOARD_EXCEL_ENGINE=openpyxl switches back to pandas with openpyxl, which
+builds every cell of the workbook in memory before saving (kept for
+comparison and as a fallback).
+"""
+import os
+
+import pandas as pd
+import xlsxwriter
+
+DEFAULT_ENGINE = os.environ.get('DASHBOARD_EXCEL_ENGINE', 'xlsxwriter')
+
+# Rows converted to Python values at a time
+CHUNK_ROWS = 10_000
+
+# The header style pandas uses, so both engines produce the same look
+HEADER_FORMAT = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+
+
+class StreamingWorkbook:
+    """An .xlsx file at path written row by row in xlsxwriter's constant-memory mode."""
+
+    def __init__(self, path):
+        self._book = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            # Cell text is data: no formulas, hyperlinks or numbers inferred from strings
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+            'nan_inf_to_errors': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        })
+        self._header_format = self._book.add_format(HEADER_FORMAT)
+        self._sheets = {}
+        # Next row that may be written, per sheet
+        self._next_row = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._book.close()
+
+    def write_frame(self, df, sheet_name, startrow=0, header=True):
+        """Write df (without its index) starting at startrow, which must be below anything already written."""
+        sheet = self._sheets.get(sheet_name)
+        if sheet is None:
+            sheet = self._sheets[sheet_name] = self._book.add_worksheet(sheet_name)
+            self._next_row[sheet_name] = 0
+        if startrow < self._next_row[sheet_name]:
+            raise ValueError(f"Sheet '{sheet_name}' is written top to bottom; row {startrow} is already past")
+
+        row = startrow
+        if header:
+            sheet.write_row(row, 0, [str(col) for col in df.columns], self._header_format)
+            row += 1
+        for start in range(0, len(df), CHUNK_ROWS):
+            block = df.iloc[start:start + CHUNK_ROWS].astype(object)
+            # Missing values become empty cells, as with to_excel
+            block = block.where(block.notna(), None)
+            for values in block.itertuples(index=False, name=None):
+                sheet.write_row(row, 0, values)
+                row += 1
+        self._next_row[sheet_name] = row
+
+
+class PandasWorkbook:
+    """An .xlsx file at path written with pandas and openpyxl (whole workbook in memory)."""
+
+    def __init__(self, path):
+        self._writer = pd.ExcelWriter(path, engine='openpyxl')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._writer.close()
+
+    def write_frame(self, df, sheet_name, startrow=0, header=True):
+        df.to_excel(self._writer, sheet_name=sheet_name, startrow=startrow, index=False, header=header)
+
+
+def open_workbook(path, engine=None):
+    """Workbook writer for path: 'xlsxwriter' (streaming, the default) or 'openpyxl'."""
+    engine = engine or DEFAULT_ENGINE
+    if engine == 'xlsxwriter':
+        return StreamingWorkbook(path)
+    if engine == 'openpyxl':
+        return PandasWorkbook(path)
+    raise ValueError(f"Unknown Excel engine: {engine}")